@@ -329,6 +329,17 @@ class AnimationManager:
         if self.dialog and dataManager.currentTool:
             dataManager.currentTool=Tools.Selection
 
+    def mark_dirty(self, dirty):
+        """Signale à `dirty` ce qui change sans entrée utilisateur : timeline en lecture, menu, boîte de dialogue."""
+        anim = self.get_current_anim()
+        if anim and anim.timeline.playing:
+            dirty.mark(anim.timeline.rect)
+        dirty.markMenu(self.anim_menu)
+        # curseur clignotant des champs de saisie
+        dirty.track("animation_dialog", self.dialog.rect if self.dialog else None)
+        if self.dialog:
+            dirty.mark(self.dialog.rect)
+
     def draw(self):
         if self.current_name:
             self.animations[self.current_name].draw(self.screen)
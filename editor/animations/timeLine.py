@@ -1,6 +1,7 @@
 import pygame
 import math
 from typing import List, Dict, Tuple, Union
+from editor.core.asset_manager import AssetManager
 from editor.core.utils import AnimatedTile
 
 class Timeline:
@@ -62,8 +63,8 @@ class Timeline:
         self.images = {}
         for name in ("record", "playing", "loop"):
             self.images[name] = {
-                False: pygame.image.load(f"./Assets/ui/icones/{name}_off.png").convert_alpha(),
-                True:  pygame.image.load(f"./Assets/ui/icones/{name}_on.png").convert_alpha()
+                False: AssetManager().load(f"./Assets/ui/icones/{name}_off.png"),
+                True:  AssetManager().load(f"./Assets/ui/icones/{name}_on.png")
             }
         btn_w, btn_h = self.images["playing"][False].get_size()
         gap = 16
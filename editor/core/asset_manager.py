@@ -0,0 +1,118 @@
+import glob
+import hashlib
+import io
+import json
+import os
+
+import pygame
+
+
+# manifeste des images chargées au démarrage (motifs glob relatifs au dossier de l'éditeur)
+PRELOAD_MANIFEST = "./Assets/ui/preload.json"
+
+
+class AssetManager:
+    """
+    Cache unique des images de l'éditeur et du moteur.
+    - une image est identifiée par son chemin et la date / taille du fichier : un fichier modifié
+      sur le disque est relu, sinon la même surface est rendue à chaque appel ;
+    - deux fichiers au contenu identique partagent une seule surface (empreinte du contenu) ;
+    - les surfaces sont converties au format de l'écran (convert / convert_alpha) dès qu'il existe.
+    Les surfaces rendues sont partagées : les appelants qui les modifient doivent travailler sur une copie.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._init()
+        return cls._instance
+
+    def _init(self):
+        # (chemin normalisé, alpha) -> (mtime, taille du fichier, empreinte)
+        self.paths = {}
+        # (empreinte, alpha) -> surface
+        self.images = {}
+        self.hits = 0
+        self.loads = 0
+
+    @staticmethod
+    def _key(path) -> str:
+        return os.path.normcase(os.path.abspath(os.fspath(path)))
+
+    @staticmethod
+    def _convert(surface: pygame.Surface, alpha: bool) -> pygame.Surface:
+        if pygame.display.get_surface() is None:
+            return surface  # pas encore d'écran (ou mode sans affichage) : format d'origine
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def load(self, path, alpha: bool = True) -> pygame.Surface:
+        """Surface de l'image `path` (lue une seule fois tant que le fichier ne change pas)."""
+        key = (self._key(path), alpha)
+        stat = os.stat(key[0])
+        entry = self.paths.get(key)
+        if entry is not None and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+            surface = self.images.get((entry[2], alpha))
+            if surface is not None:
+                self.hits += 1
+                return surface
+
+        with open(key[0], "rb") as f:
+            data = f.read()
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        self.paths[key] = (stat.st_mtime, stat.st_size, digest)
+        surface = self.images.get((digest, alpha))
+        if surface is None:
+            surface = pygame.image.load(io.BytesIO(data), os.path.basename(key[0]))
+            surface = self.images[(digest, alpha)] = self._convert(surface, alpha)
+            self.loads += 1
+        else:
+            self.hits += 1
+        return surface
+
+    def preload(self, manifest=PRELOAD_MANIFEST) -> int:
+        """
+        Charge d'avance les images d'un manifeste : chemin d'un fichier JSON {"images": [motifs]}
+        ou liste de chemins / motifs glob. Retourne le nombre d'images chargées.
+        """
+        if isinstance(manifest, (str, os.PathLike)):
+            try:
+                with open(manifest, "r", encoding="utf-8") as f:
+                    patterns = json.load(f).get("images", [])
+            except (OSError, ValueError) as e:
+                print(f"[Assets] Manifeste illisible ({manifest}): {e}")
+                return 0
+        else:
+            patterns = manifest
+        count = 0
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern)) or [pattern]:
+                try:
+                    self.load(path)
+                    count += 1
+                except (OSError, pygame.error) as e:
+                    print(f"[Assets] Impossible de charger {path}: {e}")
+        return count
+
+    def release(self, path, alpha: bool = True):
+        """Oublie une image (la surface reste en mémoire tant qu'un autre chemin la référence)."""
+        entry = self.paths.pop((self._key(path), alpha), None)
+        if entry is not None and not any(e[2] == entry[2] for (_, a), e in self.paths.items() if a == alpha):
+            self.images.pop((entry[2], alpha), None)
+
+    def clear(self):
+        self.paths.clear()
+        self.images.clear()
+
+    def memory_usage(self) -> int:
+        """Mémoire occupée par les surfaces en cache (octets)."""
+        return sum(s.get_height() * s.get_pitch() for s in self.images.values())
+
+    def stats(self) -> dict:
+        return {
+            "paths": len(self.paths),
+            "images": len(self.images),
+            "bytes": self.memory_usage(),
+            "loads": self.loads,
+            "hits": self.hits,
+        }
@@ -1,11 +1,12 @@
 import copy
 import json
 from pathlib import Path
-import re
 import time
 from editor.animations.animation import AnimationManager
 from editor.core.history_manager import HistoryManager
-from editor.core.utils import AnimatedTile, Layer, Light, LocationPoint,Tile,Tools,Axis,CollisionRect
+from editor.core.region_ops import FloodFillLimit, erase_region, erase_tiles, fill_region, flood_fill, place_tiles, random_fill_region
+from editor.core.spatial_index import SpatialIndex
+from editor.core.utils import ActionType, AnimatedTile, Layer, Light, LocationPoint, NameRegistry,Tile,Tools,Axis,CollisionRect
 import random
 from typing import List
 import pygame
@@ -17,6 +18,7 @@ from editor.vfx.vfx import ParticleEmitter
 class DataManager():
     def __init__(self,history : HistoryManager,settings,animation : AnimationManager):
         self.history=history
+        self.history.data_manager=self
         self.layers=[Layer() for _ in range(9)]
         self.collisionRects: list[CollisionRect]=[]
         self.locationPoints: list[LocationPoint]=[]
@@ -31,6 +33,7 @@ class DataManager():
         self.lastAddTime = 0
         self.show_settings=False
         self.backgrounds: list[dict] = []
+        self.backgroundNames = NameRegistry()
         self.settings=settings
         self.animation=animation
         self.load_backgrounds("./Assets/backgrounds.json")
@@ -38,11 +41,17 @@ class DataManager():
         self.emitters: list[ParticleEmitter] = []
         self.show_vfx_placement_tip = False
         self.show_collision_placement_tip = False
+        # index spatial (coordonnées carte) des éléments, par liste
+        self.elementIndex = {name: SpatialIndex() for name in ("collisionRects", "lights", "locationPoints", "emitters")}
+        # et registres nom -> élément, tenus à jour en même temps
+        self.elementNames = {name: NameRegistry() for name in self.elementIndex}
+        self._elementIndexKey = None
 
     def load_backgrounds(self, json_path: str):
         try:
             data = json.load(Path(json_path).open(encoding="utf-8"))
             self.backgrounds = data.get("backgrounds", [])
+            self.backgroundNames = NameRegistry(self.backgrounds)
             # trouver l’index du default
             default_name = data.get("default")
             self.settings.backgrounds=[]
@@ -54,6 +63,7 @@ class DataManager():
         except Exception as e:
             print(f"Erreur de chargement des backgrounds: {e}")
             self.backgrounds = []
+            self.backgroundNames = NameRegistry()
             self.settings.parallax_index = 0
 
     def get_current_background(self) -> dict | None:
@@ -78,15 +88,12 @@ class DataManager():
             y=y,
             radius=radius
         )
-        self.lights.append(new_light)
+        self.addElement("lights", new_light)
         self.selectedElement=self.lights[-1]
         self.history.RegisterAddLight(self.lights[-1])
 
     def get_background_by_name(self, name: str) -> dict | None:
-        for bg in self.backgrounds:
-            if bg.get("name") == name:
-                return bg
-        return None
+        return self.backgroundNames.get(name)
 
 
     def get_scaled_collision_rects(self,a) -> list[pygame.Rect]:
@@ -98,27 +105,99 @@ class DataManager():
             yield location.name
 
     def get_spawn_point(self,viewport):
-        map_offset,zoom=viewport.panningOffset,viewport.zoom
-        for location_point in self.locationPoints:
-            if location_point.name==self.settings.player_spawn_point:
-                return (location_point.rect.x,location_point.rect.y)
-                #return (int(map_offset[0] + location_point.rect.x * zoom),int(map_offset[1] + location_point.rect.y * zoom + 30))
+        location_point = self.getElementByName("locationPoints", self.settings.player_spawn_point)
+        if location_point:
+            return (location_point.rect.x,location_point.rect.y)
         return (0,0)
 
 
+    @staticmethod
+    def elementBounds(element):
+        """Boîte (x0, y0, x1, y1) en coordonnées carte couvrant la zone cliquable/dessinée d'un élément."""
+        if isinstance(element, Light):
+            return (element.x - element.radius, element.y - element.radius,
+                    element.x + element.radius, element.y + element.radius)
+        if isinstance(element, ParticleEmitter):
+            return (element.x, element.y, element.x, element.y)
+        rect = element.rect
+        if isinstance(element, LocationPoint):
+            # l'icône est dessinée au-dessus et à gauche du point
+            return (rect.centerx - 2 * rect.width, rect.bottom - 3 * rect.height, rect.right, rect.bottom)
+        return (rect.left, rect.top, rect.right, rect.bottom)
+
+    def invalidateElementIndex(self):
+        self._elementIndexKey = None
+
+    def _elementListsKey(self):
+        return tuple((id(getattr(self, name)), len(getattr(self, name))) for name in self.elementIndex)
+
+    def syncElementIndex(self):
+        """Reconstruit index et registres si une liste d'éléments a été remplacée, agrandie ou réduite."""
+        key = self._elementListsKey()
+        if key == self._elementIndexKey:
+            return
+        for name, index in self.elementIndex.items():
+            index.clear()
+            elements = getattr(self, name)
+            for element in elements:
+                index.insert(element, self.elementBounds(element))
+            self.elementNames[name] = NameRegistry(elements)
+        self._elementIndexKey = key
+
+    def addElement(self, name, element):
+        """Ajoute un élément à sa liste en tenant l'index et le registre à jour (sans reconstruction)."""
+        self.syncElementIndex()
+        getattr(self, name).append(element)
+        self.elementIndex[name].insert(element, self.elementBounds(element))
+        self.elementNames[name].add(element)
+        self._elementIndexKey = self._elementListsKey()
+
+    def getElementByName(self, name, element_name):
+        """Élément d'une liste ("locationPoints", "collisionRects", ...) par son nom, en O(1)."""
+        self.syncElementIndex()
+        return self.elementNames[name].get(element_name)
+
+    def renameElement(self, element, new_name):
+        self.syncElementIndex()
+        for registry in self.elementNames.values():
+            if registry.owns(element):
+                registry.rename(element, new_name)
+                return
+        element.name = new_name
+
+    def updateElement(self, element):
+        """À appeler après avoir déplacé/redimensionné un élément."""
+        for name, index in self.elementIndex.items():
+            if id(element) in index.entries:
+                index.update(element, self.elementBounds(element))
+                return
+        self.invalidateElementIndex()
+
+    def elementsInRect(self, name, box):
+        self.syncElementIndex()
+        return self.elementIndex[name].queryRect(box)
+
+    def elementsAt(self, name, viewport, pos, margin=16):
+        """Candidats sous une position écran (marge en pixels écran)."""
+        x = (pos[0] - viewport.panningOffset[0]) / viewport.zoom
+        y = (pos[1] - 30 - viewport.panningOffset[1]) / viewport.zoom
+        self.syncElementIndex()
+        return self.elementIndex[name].queryPoint(x, y, margin / viewport.zoom)
+
     def ChangeSelectedCollisionRect(self,viewport,locationPointImage):
         self.selectedElement=None
-        for rect in self.collisionRects:
-            if rect.collidePoint(pygame.mouse.get_pos(),viewport.panningOffset,viewport.zoom):
+        pos = pygame.mouse.get_pos()
+        for rect in self.elementsAt("collisionRects", viewport, pos):
+            if rect.collidePoint(pos,viewport.panningOffset,viewport.zoom):
                 self.selectedElement=rect
-        for light in self.lights:
-            if light.collidePoint(pygame.mouse.get_pos(),viewport.panningOffset,viewport.zoom):
+        for light in self.elementsAt("lights", viewport, pos):
+            if light.collidePoint(pos,viewport.panningOffset,viewport.zoom):
                 self.selectedElement=light
-        for point in self.locationPoints:
-            if point.collidePoint(pygame.mouse.get_pos(),viewport.panningOffset,viewport.zoom,locationPointImage):
+        for point in self.elementsAt("locationPoints", viewport, pos):
+            if point.collidePoint(pos,viewport.panningOffset,viewport.zoom,locationPointImage):
                 self.selectedElement=point
-        for emitter in self.emitters:
-            if emitter.collidePoint(pygame.mouse.get_pos(),viewport.panningOffset,viewport.zoom):
+        for emitter in self.elementsAt("emitters", viewport, pos):
+            if emitter.collidePoint(pos,viewport.panningOffset,viewport.zoom):
                 self.selectedElement=emitter
 
 
@@ -173,7 +252,7 @@ class DataManager():
     def AddVFXEmitter(self, viewport):
         x, y = viewport.toMapCoords(pygame.mouse.get_pos())
         new_emitter = ParticleEmitter(x, y, f"vfx_{len(self.emitters)}")
-        self.emitters.append(new_emitter)
+        self.addElement("emitters", new_emitter)
         self.selectedElement = new_emitter
         self.history.RegisterAddElement(new_emitter)
         
@@ -189,8 +268,9 @@ class DataManager():
                 pass
 
     def ChangeSelectedVFX(self, viewport):
-        for emitter in self.emitters:
-            if emitter.collidePoint(pygame.mouse.get_pos(), viewport.panningOffset, viewport.zoom):
+        pos = pygame.mouse.get_pos()
+        for emitter in self.elementsAt("emitters", viewport, pos):
+            if emitter.collidePoint(pos, viewport.panningOffset, viewport.zoom):
                 self.selectedElement = emitter
                 return True
         return False
@@ -218,7 +298,7 @@ class DataManager():
                 self.currentTiles.append(tile)
 
         
-    def RemoveCurrentTilesSelection(self, viewport):
+    def getSelectionBounds(self, viewport):
         # calcul de la sélection en coordonnées grille
         self.relativeStart = viewport.toGrid(self.selectionViewPort[0])
         self.relativeEnd   = viewport.toGrid(self.selectionViewPort[1])
@@ -226,22 +306,23 @@ class DataManager():
         y_min = min(self.relativeStart[1], self.relativeEnd[1])
         x_max = max(self.relativeStart[0], self.relativeEnd[0])
         y_max = max(self.relativeStart[1], self.relativeEnd[1])
-        Tiles=[]
-        for y in range(y_min, y_max + 1):
-            for x in range(x_min, x_max + 1):
-                Tiles.append((x,y))
-        self.history.RegisterRemoveTiles(self.currentLayer,Tiles,self)
-        for x,y in Tiles:
-            self.RemoveTile(x,y,register=False)
+        return x_min, y_min, x_max, y_max
+
+    def RemoveCurrentTilesSelection(self, viewport):
+        x_min, y_min, x_max, y_max = self.getSelectionBounds(viewport)
+
+        # mode record ? chaque case devient une keyframe de suppression
+        if getattr(self.animation.get_current_anim().timeline, "record", False):
+            for y in range(y_min, y_max + 1):
+                for x in range(x_min, x_max + 1):
+                    self.RemoveTile(x, y, register=False)
+            return
+
+        delta = erase_region(self.layers, self.currentLayer, x_min, y_min, x_max, y_max)
+        self.history.RegisterDelta(delta)
 
     def FillCurrentTilesSelection(self, viewport):
-        # calcul de la sélection
-        self.relativeStart = viewport.toGrid(self.selectionViewPort[0])
-        self.relativeEnd   = viewport.toGrid(self.selectionViewPort[1])
-        x_min = min(self.relativeStart[0], self.relativeEnd[0])
-        y_min = min(self.relativeStart[1], self.relativeEnd[1])
-        x_max = max(self.relativeStart[0], self.relativeEnd[0])
-        y_max = max(self.relativeStart[1], self.relativeEnd[1])
+        x_min, y_min, x_max, y_max = self.getSelectionBounds(viewport)
 
         # mode record ? on enregistre juste les AnimatedTile
         if getattr(self.animation.get_current_anim().timeline, "record", False):
@@ -258,28 +339,13 @@ class DataManager():
                     self.animation.get_current_anim().record(anim_tile, self)
             return
 
-        # sinon, remplissage statique + historisation
-        new_tiles = []; old_tiles = []
-        for y in range(y_min, y_max + 1):
-            for x in range(x_min, x_max + 1):
-                new = copy.deepcopy(self.currentTiles[0])
-                new.x = x; new.y = y
-                old = self.getCurrentLayer().addOrReplaceTile(new)
-                if old != "":
-                    new_tiles.append(new)
-                    old_tiles.append(old)
-        if new_tiles:
-            self.history.RegisterAddTiles(self.currentLayer, new_tiles, old_tiles)
+        # sinon, remplissage statique en une passe + une seule entrée d'historique
+        delta = fill_region(self.layers, self.currentLayer, x_min, y_min, x_max, y_max, self.currentTiles[0])
+        self.history.RegisterDelta(delta)
 
 
     def RandomCurrentTilesSelection(self, viewport):
-        # calcul de la sélection
-        self.relativeStart = viewport.toGrid(self.selectionViewPort[0])
-        self.relativeEnd   = viewport.toGrid(self.selectionViewPort[1])
-        x_min = min(self.relativeStart[0], self.relativeEnd[0])
-        y_min = min(self.relativeStart[1], self.relativeEnd[1])
-        x_max = max(self.relativeStart[0], self.relativeEnd[0])
-        y_max = max(self.relativeStart[1], self.relativeEnd[1])
+        x_min, y_min, x_max, y_max = self.getSelectionBounds(viewport)
 
         # mode record ? on enregistre juste les AnimatedTile
         if getattr(self.animation.get_current_anim().timeline, "record", False):
@@ -296,21 +362,38 @@ class DataManager():
                     self.animation.get_current_anim().record(anim_tile, self)
             return
 
-        # sinon, remplissage aléatoire statique + historisation
-        new_tiles = []; old_tiles = []
-        for y in range(y_min, y_max + 1):
-            for x in range(x_min, x_max + 1):
-                new = copy.deepcopy(random.choice(self.currentTiles))
-                new.x = x; new.y = y
-                old = self.getCurrentLayer().addOrReplaceTile(new)
-                if old != "":
-                    new_tiles.append(new)
-                    old_tiles.append(old)
-        if new_tiles:
-            self.history.RegisterAddTiles(self.currentLayer, new_tiles, old_tiles)
+        # sinon, remplissage aléatoire pondéré en une passe + une seule entrée d'historique
+        delta = random_fill_region(self.layers, self.currentLayer, x_min, y_min, x_max, y_max, self.currentTiles)
+        self.history.RegisterDelta(delta)
 
 
 
+    def getLevelBounds(self, viewport) -> pygame.Rect:
+        """Zone (coordonnées grille) couverte par les tuiles du niveau et la vue courante."""
+        x_min, y_min, x_max, y_max = viewport.visibleGridRect()
+        bounds = pygame.Rect(x_min, y_min, x_max - x_min + 1, y_max - y_min + 1)
+        for layer in self.layers:
+            layer_bounds = layer.bounds()
+            if layer_bounds:
+                bounds.union_ip(layer_bounds)
+        return bounds
+
+    def BucketFill(self, viewport):
+        if not self.currentTiles:
+            return
+        if getattr(self.animation.get_current_anim().timeline, "record", False):
+            self.settings.nm.notify('warning', 'Attention', 'Le pot de peinture est indisponible en mode record.', duration=1.5)
+            return
+        x, y = viewport.toGrid(pygame.mouse.get_pos())
+        try:
+            delta = flood_fill(self.layers, self.currentLayer, x, y, self.currentTiles[0],
+                               self.getLevelBounds(viewport), int(self.settings.bucket_fill_cap))
+        except FloodFillLimit:
+            self.settings.nm.notify('warning', 'Attention', 'Zone trop grande pour le pot de peinture.', duration=1.5)
+            return
+        if delta:
+            self.history.RegisterDelta(delta)
+
     def UpdateCurrentTiles(self, viewport):
         if not self.currentTiles:
             return
@@ -390,14 +473,8 @@ class DataManager():
         self.lastAddTime = current_time
         self.lastAddedTileState = current_tile_state
 
-        oldTiles = []
-        newTiles = []
-        for tile in self.currentTiles:
-            oldTile = self.getCurrentLayer().addOrReplaceTile(tile)
-            if oldTile != "":
-                oldTiles.append(oldTile)
-                newTiles.append(tile)
-        self.history.RegisterAddTiles(self.currentLayer, newTiles, oldTiles)
+        delta = place_tiles(self.layers, self.currentLayer, self.currentTiles)
+        self.history.RegisterDelta(delta, ActionType.AddTile)
 
 
     def getCurrentLayer(self) -> Layer:
@@ -415,8 +492,8 @@ class DataManager():
             #self.getCurrentLayer().removeTile((tile.x, tile.y))
             self.animation.get_current_anim().record(anim_tile,self)
         else:
-            self.history.RegisterAddTiles(self.currentLayer, [tile])
-            self.getCurrentLayer().addOrReplaceTile(tile)
+            delta = place_tiles(self.layers, self.currentLayer, [tile])
+            self.history.RegisterDelta(delta, ActionType.AddTile)
 
 
     def RemoveTile(self, x, y,register=True):
@@ -432,9 +509,9 @@ class DataManager():
 
             self.animation.get_current_anim().record(kf, self)
             return
-        self.getCurrentLayer().removeTile((x, y))
+        delta = erase_tiles(self.layers, self.currentLayer, [(x, y)])
         if register:
-            self.history.RegisterRemoveTiles(self.currentLayer, [(x,y)], self)
+            self.history.RegisterDelta(delta, ActionType.RemoveTile)
 
 
     def setTool(self,tool: Tools,viewport):
@@ -453,15 +530,8 @@ class DataManager():
 
     def AddLocationPoint(self, viewport, image: pygame.Surface):
         x1, y1 = viewport.toMapCoords(pygame.mouse.get_pos())
-        prefix = "point_"
-        indices = []
-        for lp in self.locationPoints:
-            m = re.match(fr"^{prefix}(\d+)$", lp.name)
-            if m:
-                indices.append(int(m.group(1)))
-
-        next_idx = max(indices) + 1 if indices else 0
-        new_name = f"{prefix}{next_idx}"
+        self.syncElementIndex()
+        new_name = self.elementNames["locationPoints"].nextName("point_")
         new_location = LocationPoint(
             type="Player",
             name=new_name,
@@ -469,8 +539,8 @@ class DataManager():
             color=(255, 0, 0)
         )
 
+        self.addElement("locationPoints", new_location)
         self.history.RegisterAddElement(new_location)
-        self.locationPoints.append(new_location)
         self.selectedElement = new_location
 
 
@@ -490,8 +560,8 @@ class DataManager():
             rect=pygame.Rect(rect_x, rect_y, rect_width, rect_height),
             color=(255, 0, 0)
         )
+        self.addElement("collisionRects", new_collision_rect)
         self.history.RegisterAddElement(new_collision_rect)
-        self.collisionRects.append(new_collision_rect)
         self.selectedElement=self.collisionRects[-1]
 
         import os
@@ -43,6 +43,7 @@ class EventHandlerManager:
 
     def HandleEvents(self):
         for event in pygame.event.get():
+            self.editor.dirty.noteEvent(event, *self.DrawManager.hoverRegions(self.viewport, self.animations))
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if getattr(self.dataManager, "show_vfx_placement_tip", False):
                     self.dataManager.show_vfx_placement_tip = False
@@ -133,11 +134,11 @@ class EventHandlerManager:
             self.DrawManager.viewportSelectionPreview=False
             self.dataManager.selectionViewPort=[]
             self.viewport.Zoom(event.y)
-            self.DrawManager.tile_cache.clear()
             self.dataManager.UpdateCurrentTiles(self.viewport)
 
     def HandleMouseButtonDown(self, event):
         if event.button == 1:  # Clic gauche
+            self.HistoryManager.beginStroke()
             self.LeftClickStartPos = event.pos
             self.LeftTempPos = event.pos
             self.MapDragActive = self.tilePalette.InRegion()
@@ -197,6 +198,7 @@ class EventHandlerManager:
 
     def HandleMouseUp(self, event):
         if event.button == 1:
+            self.HistoryManager.endStroke()
             if self.LeftDragging:
                 self.Handledragclick()
             else:
@@ -226,12 +228,13 @@ class EventHandlerManager:
             if self.dataManager.currentTool == Tools.Draw and not self.MapDragActive:
                 self.dataManager.AddCurrentTiles()
             if self.dataManager.currentTool == Tools.Rubber:
-                self.HistoryManager.RegisterRemoveTiles(self.dataManager.currentLayer,[self.viewport.toGrid(pygame.mouse.get_pos())],self.dataManager)
                 x,y=self.viewport.toGrid(pygame.mouse.get_pos())
                 self.dataManager.RemoveTile(x,y)
 
     def Handleclick(self,event):
         self.HandleAction()
+        if self.dataManager.currentTool == Tools.Bucket and not self.DrawManager.viewportSelectionPreview and self.viewport.InRegion():
+            self.dataManager.BucketFill(self.viewport)
         if self.tilePalette.GetCurrentTileMap() and self.tilePalette.InRegion():
             grid_x, grid_y = self.tilePalette.toGrid(pygame.mouse.get_pos(), self.tilePalette.GetCurrentTileMap().tileSize)
             self.dataManager.currentTiles = [Tile(self.tilePalette.GetCurrentTileMap().name, 0, 0, grid_x, grid_y)]
@@ -283,6 +286,8 @@ class EventHandlerManager:
             self.HistoryManager.Undo(self.dataManager)
         elif event.key == pygame.K_y and event.mod & pygame.KMOD_LCTRL:
             self.HistoryManager.Redo(self.dataManager)
+        elif event.key == pygame.K_b and not self.dataManager.show_settings:
+            self.dataManager.setTool(Tools.Bucket,self.viewport)
         elif event.key == pygame.K_h:
             self.settings.is_grid_visible = not self.settings.is_grid_visible
             for widget in self.settings.widgets[Section.ADVANCED]:
@@ -0,0 +1,57 @@
+import time
+
+import pygame
+
+
+class FrameScheduler:
+    """
+    Cadence de la boucle de l'éditeur.
+    - jeu lancé : 60 images par seconde ;
+    - éditeur actif (entrée utilisateur, animation, caches en préparation) : pleine vitesse, comme avant ;
+    - caches en préparation sans entrée ni animation : pleine vitesse au plus `WARM_MAX_S` secondes
+      après la dernière activité (une préparation qui n'aboutit pas n'empêche pas la veille) ;
+    - rien n'a bougé depuis `IDLE_DELAY` secondes : la boucle se bloque sur pygame.event.wait
+      (au plus `IDLE_TIMEOUT_MS`) au lieu de redessiner en boucle, et repart à pleine vitesse
+      dès le premier événement ou la première animation.
+    """
+
+    GAME_FPS = 60
+    ACTIVE_FPS = 0  # 0 : pas de limite
+    IDLE_DELAY = 0.5
+    IDLE_TIMEOUT_MS = 250
+    WARM_MAX_S = 2.0
+    # dt maximal rendu au réveil : le temps passé à attendre n'est pas une durée d'animation
+    WAKE_DT = 1 / 60
+
+    def __init__(self, clock: pygame.time.Clock):
+        self.clock = clock
+        self.last_activity = time.perf_counter()
+        # dernière image où la préparation des caches a gardé la boucle éveillée
+        self.last_warm = self.last_activity
+        self.idle = False
+
+    def notify(self, active: bool, warming: bool = False):
+        """
+        Résultat de l'image qui vient d'être présentée (voir DirtyRegions.present) ;
+        warming : des caches restent à préparer (en veille, ils continuent à chaque réveil).
+        """
+        now = time.perf_counter()
+        if active:
+            self.last_activity = now
+        elif warming and now - self.last_activity < self.WARM_MAX_S:
+            self.last_warm = now
+
+    def tick(self, game_running: bool) -> float:
+        """Attend l'image suivante ; retourne le temps écoulé (secondes) à utiliser pour les mises à jour."""
+        if game_running:
+            self.idle = False
+            return self.clock.tick(self.GAME_FPS) / 1000.0
+        self.idle = time.perf_counter() - max(self.last_activity, self.last_warm) > self.IDLE_DELAY
+        if not self.idle:
+            return self.clock.tick(self.ACTIVE_FPS) / 1000.0
+        event = pygame.event.wait(self.IDLE_TIMEOUT_MS)
+        if event.type != pygame.NOEVENT:
+            # l'événement qui a réveillé la boucle est rendu à la file pour HandleEvents
+            pygame.event.post(event)
+            self.last_activity = time.perf_counter()
+        return min(self.clock.tick() / 1000.0, self.WAKE_DT)
@@ -1,22 +1,71 @@
-from editor.core.utils import ActionType, AnimatedTile, CollisionRect, Light, LocationPoint
+from collections import deque
+from editor.core.region_ops import TileDelta
+from editor.core.utils import ActionType, AnimatedTile, CollisionRect, Light, LocationPoint, encode_tile
 from editor.vfx.vfx import ParticleEmitter
 import copy
+import sys
+
+# actions de calque : la donnée est un delta (TileDelta, RegionDelta, SpanDelta) qui s'applique lui-même
+LAYER_ACTIONS = (ActionType.AddTile, ActionType.RemoveTile, ActionType.RegionTiles)
+
+
+# budget mémoire par défaut de l'historique (Mo), si aucun réglage n'est fourni
+DEFAULT_HISTORY_BUDGET_MB = 64
+# taille estimée d'une entrée élément/keyframe (petits objets copiés)
+ELEMENT_ENTRY_BYTES = 512
+
+
+def action_size(action) -> int:
+    """Estimation en octets d'une entrée (action_type, data) de l'historique."""
+    _, data = action
+    nbytes = getattr(data, "nbytes", None)
+    if nbytes is not None:
+        return nbytes + ELEMENT_ENTRY_BYTES // 4
+    return sys.getsizeof(data) + ELEMENT_ENTRY_BYTES
+
 
 class HistoryManager:
-    def __init__(self):
-        self.undo_stack = []
+    def __init__(self, settings=None, journal=None):
+        self.undo_stack = deque()
         self.redo_stack = []
+        self.settings = settings
+        # journal sur disque (EditJournal) des actions validées, optionnel
+        self.journal = journal
+        # renseigné par DataManager : listes d'éléments et animations écrites dans le journal
+        self.data_manager = None
+        self.memory_used = 0
+        self.evicted = 0
+        # les undo_stack[:_compacted] ont déjà été compressées
+        self._compacted = 0
+        # coup de pinceau en cours : les deltas successifs fusionnent dans une seule entrée
+        self._stroke_open = False
+        self._stroke_action = None
+
+    @property
+    def budget(self) -> int:
+        mb = getattr(self.settings, "history_budget_mb", DEFAULT_HISTORY_BUDGET_MB)
+        return int(mb * 1024 * 1024)
+
+    def beginStroke(self):
+        self._stroke_open = True
+        self._stroke_action = None
+
+    def endStroke(self):
+        self._stroke_open = False
+        self._stroke_action = None
 
     def Undo(self, data_manager):
+        self.endStroke()
         if not self.undo_stack:
             return
         action = self.undo_stack.pop()
+        self._compacted = min(self._compacted, len(self.undo_stack))
         action_type, data = action
 
-        if action_type == ActionType.AddTile:
-            self._undo_add_tile(data, data_manager)
-        elif action_type == ActionType.RemoveTile:
-            self._undo_remove_tile(data, data_manager)
+        if action_type in LAYER_ACTIONS:
+            data.undo(data_manager.layers)
+            if self.journal:
+                self.journal.append(data, forward=False)
         elif action_type == ActionType.AddCollision:
             self._undo_add_collision(data, data_manager)
         elif action_type == ActionType.RemoveCollision:
@@ -27,19 +76,22 @@ class HistoryManager:
             self._undo_add_light(data, data_manager)
         elif action_type == ActionType.RemoveLight:
             self._undo_remove_light(data, data_manager)
+        if action_type not in LAYER_ACTIONS:
+            self._journal_action(action_type, data, data_manager)
 
         self.redo_stack.append(action)
 
     def Redo(self, data_manager):
+        self.endStroke()
         if not self.redo_stack:
             return
         action = self.redo_stack.pop()
         action_type, data = action
 
-        if action_type == ActionType.AddTile:
-            self._redo_add_tile(data, data_manager)
-        elif action_type == ActionType.RemoveTile:
-            self._redo_remove_tile(data, data_manager)
+        if action_type in LAYER_ACTIONS:
+            data.redo(data_manager.layers)
+            if self.journal:
+                self.journal.append(data)
         elif action_type == ActionType.AddCollision:
             self._redo_add_collision(data, data_manager)
         elif action_type == ActionType.RemoveCollision:
@@ -50,6 +102,8 @@ class HistoryManager:
             self._redo_add_light(data, data_manager)
         elif action_type == ActionType.RemoveLight:
             self._redo_remove_light(data, data_manager)
+        if action_type not in LAYER_ACTIONS:
+            self._journal_action(action_type, data, data_manager)
 
         self.undo_stack.append(action)
 
@@ -68,17 +122,6 @@ class HistoryManager:
         if replaced:
             tl.keyframes.append(replaced)
 
-    def _undo_add_tile(self, data, data_manager):
-        layer_index, new_tiles, replaced_tiles = data
-        current_tiles = data_manager.layers[layer_index].tiles
-        data_manager.layers[layer_index].tiles = [t for t in current_tiles
-                                                  if not any(t.x == nt.x and t.y == nt.y for nt in new_tiles)]
-        data_manager.layers[layer_index].tiles.extend([t for t in replaced_tiles if t])
-
-    def _undo_remove_tile(self, data, data_manager):
-        layer_index, _, replaced_tiles = data
-        data_manager.layers[layer_index].tiles.extend([t for t in replaced_tiles if t])
-
     def _undo_add_collision(self, data, data_manager):
         if isinstance(data, CollisionRect):
             data_manager.collisionRects = [c for c in data_manager.collisionRects if c != data]
@@ -104,12 +147,6 @@ class HistoryManager:
         data_manager.lights.append(data)
 
     # ----- Redo methods -----
-    def _redo_add_tile(self, data, data_manager):
-        layer_index, new_tiles, _ = data
-        current = data_manager.layers[layer_index].tiles
-        data_manager.layers[layer_index].tiles = [t for t in current if not any(t.x == nt.x and t.y == nt.y for nt in new_tiles)]
-        data_manager.layers[layer_index].tiles.extend(new_tiles)
-
     def _redo_add_keyframe(self, data, data_manager):
         anim_name, new_kf, replaced = data
         anim = data_manager.animation.animations[anim_name]
@@ -122,12 +159,6 @@ class HistoryManager:
                                     and kf.layer == replaced.layer)]
         tl.keyframes.append(copy.deepcopy(new_kf))
 
-    def _redo_remove_tile(self, data, data_manager):
-        layer_index, _, replaced_tiles = data
-        current = data_manager.layers[layer_index].tiles
-        data_manager.layers[layer_index].tiles = [t for t in current
-                                                  if not any(t.x == rt.x and t.y == rt.y for rt in replaced_tiles)]
-
     def _redo_add_collision(self, data, data_manager):
         if isinstance(data, CollisionRect):
             data_manager.collisionRects.append(data)
@@ -151,19 +182,44 @@ class HistoryManager:
         data_manager.lights = [l for l in data_manager.lights if l != data]
 
     # ----- Registration methods -----
-    def RegisterAddTiles(self, layer_index, new_tiles, replaced_tiles):
-        self._register_action(ActionType.AddTile,
-                              (layer_index, copy.deepcopy(new_tiles), copy.deepcopy(replaced_tiles)))
+    def RegisterAddTiles(self, layer_index, new_tiles, replaced_tiles=()):
+        """Tuiles déjà posées ; replaced_tiles est parallèle à new_tiles (None = case vide)."""
+        delta = TileDelta(layer_index)
+        replaced_tiles = list(replaced_tiles)
+        for i, tile in enumerate(new_tiles):
+            old = replaced_tiles[i] if i < len(replaced_tiles) else None
+            delta.record(tile.x, tile.y, encode_tile(old) if old else 0, encode_tile(tile))
+        self.RegisterDelta(delta, ActionType.AddTile)
 
     def RegisterRemoveTiles(self, layer_index, tiles, data_manager):
-        removed = []
+        """À appeler avant d'effacer les cases `tiles` (liste de (x, y))."""
+        layer = data_manager.layers[layer_index]
+        delta = TileDelta(layer_index)
         for x, y in tiles:
-            for tile in data_manager.layers[layer_index].tiles:
-                if tile.x == x and tile.y == y:
-                    removed.append(tile)
-        if removed:
-            self._register_action(ActionType.RemoveTile,
-                                  (layer_index, [], copy.deepcopy(removed)))
+            code = layer.getCode(x, y)
+            if code:
+                delta.record(x, y, code, 0)
+        self.RegisterDelta(delta, ActionType.RemoveTile)
+
+    def RegisterDelta(self, delta, action_type=ActionType.RegionTiles):
+        """Une opération de calque (pinceau, gomme, zone, pot) = une seule entrée compacte."""
+        if not delta.changed():
+            return
+        if self.journal:
+            self.journal.append(delta)
+        if self._stroke_open and isinstance(delta, TileDelta):
+            top = self._stroke_action
+            if (top is not None and self.undo_stack and self.undo_stack[-1] is top
+                    and top[0] == action_type and top[1].layer == delta.layer):
+                self.memory_used -= action_size(top)
+                top[1].merge(delta)
+                self.memory_used += action_size(top)
+                self._enforce_budget()
+                return
+            self._register_action(action_type, delta)
+            self._stroke_action = self.undo_stack[-1]
+            return
+        self._register_action(action_type, delta)
 
     def RegisterAddKeyframe(self, animation_name: str, new_kf: AnimatedTile, anim):
         timeline = anim.timeline
@@ -206,5 +262,61 @@ class HistoryManager:
         self._register_action(ActionType.RemoveLight, copy.deepcopy(light))
 
     def _register_action(self, action_type, data):
-        self.undo_stack.append((action_type, data))
+        for action in self.redo_stack:
+            self.memory_used -= action_size(action)
+        self.redo_stack.clear()
+        action = (action_type, data)
+        self.undo_stack.append(action)
+        self.memory_used += action_size(action)
+        if action_type not in LAYER_ACTIONS:
+            self._journal_action(action_type, data, self.data_manager)
+        self._enforce_budget()
+
+    def _journal_action(self, action_type, data, data_manager):
+        """Écrit dans le journal la liste d'éléments ou les keyframes touchées par l'action."""
+        if not self.journal or data_manager is None:
+            return
+        if action_type == ActionType.AddKeyframe:
+            anim_name = data[0]
+            anim = data_manager.animation.animations.get(anim_name)
+            if anim is not None:
+                self.journal.appendKeyframes(anim_name, anim)
+        elif isinstance(data, CollisionRect):
+            self.journal.appendElements("collisionRects", data_manager.collisionRects)
+        elif isinstance(data, LocationPoint):
+            self.journal.appendElements("locationPoints", data_manager.locationPoints)
+        elif isinstance(data, Light):
+            self.journal.appendElements("lights", data_manager.lights)
+        elif isinstance(data, ParticleEmitter):
+            self.journal.appendElements("emitters", data_manager.emitters)
+
+    def _enforce_budget(self):
+        """
+        Au-delà du budget : on compresse d'abord les plus vieilles grosses entrées,
+        puis on oublie les plus anciennes (la dernière action reste toujours annulable).
+        """
+        budget = self.budget
+        if self.memory_used <= budget:
+            return
+        while self._compacted < len(self.undo_stack) - 1:
+            action = self.undo_stack[self._compacted]
+            self._compacted += 1
+            compact = getattr(action[1], "compact", None)
+            if compact is None:
+                continue
+            size = action_size(action)
+            compact()
+            self.memory_used += action_size(action) - size
+            if self.memory_used <= budget:
+                return
+        while self.memory_used > budget and len(self.undo_stack) > 1:
+            self.memory_used -= action_size(self.undo_stack.popleft())
+            self._compacted = max(0, self._compacted - 1)
+            self.evicted += 1
+
+    def clear(self):
+        self.undo_stack.clear()
         self.redo_stack.clear()
+        self.memory_used = 0
+        self._compacted = 0
+        self.endStroke()
@@ -0,0 +1,258 @@
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+import random
+from typing import List
+import zlib
+
+from editor.core.utils import CELL_TYPECODE, Layer, Tile, encode_tile, filled_cells
+
+
+def _cells(data):
+    """Codes d'un enregistrement, décompressés s'il a été compacté (voir RegionDelta.compact)."""
+    if isinstance(data, bytes):
+        cells = array(CELL_TYPECODE)
+        cells.frombytes(zlib.decompress(data))
+        return cells
+    return data
+
+
+def _nbytes(data) -> int:
+    if isinstance(data, bytes):
+        return len(data)
+    if isinstance(data, array):
+        return data.itemsize * len(data)
+    return 0
+
+
+@dataclass
+class RegionDelta:
+    """
+    Enregistrement compact d'une opération sur une zone rectangulaire d'un calque :
+    les codes avant/après sont stockés ligne par ligne, sans aucun objet Tile.
+    """
+    layer: int
+    x_min: int
+    y_min: int
+    x_max: int
+    y_max: int
+    before: array | bytes
+    after: array | bytes | int
+
+    @property
+    def area(self) -> int:
+        return (self.x_max - self.x_min + 1) * (self.y_max - self.y_min + 1)
+
+    @property
+    def nbytes(self) -> int:
+        return _nbytes(self.before) + _nbytes(self.after)
+
+    def compact(self):
+        """Compresse les codes (zlib) : les vieilles entrées d'historique prennent bien moins de place."""
+        if isinstance(self.before, array):
+            self.before = zlib.compress(self.before.tobytes(), 1)
+        if isinstance(self.after, array):
+            self.after = zlib.compress(self.after.tobytes(), 1)
+
+    def undo(self, layers: List[Layer]):
+        layers[self.layer].writeRegion(self.x_min, self.y_min, self.x_max, self.y_max, _cells(self.before))
+
+    def redo(self, layers: List[Layer]):
+        layers[self.layer].writeRegion(self.x_min, self.y_min, self.x_max, self.y_max, _cells(self.after))
+
+    def changed(self) -> bool:
+        before = _cells(self.before)
+        if isinstance(self.after, int):
+            return before != filled_cells(self.after, len(before))
+        return before != _cells(self.after)
+
+
+@dataclass
+class TileDelta:
+    """
+    Enregistrement positionnel de cases isolées (pinceau, gomme) :
+    coordonnées (x, y) à plat + codes avant/après, appliqué en O(nombre de cases).
+    """
+    layer: int
+    coords: array = field(default_factory=lambda: array("i"))
+    before: array = field(default_factory=lambda: array(CELL_TYPECODE))
+    after: array = field(default_factory=lambda: array(CELL_TYPECODE))
+
+    @property
+    def area(self) -> int:
+        return len(self.before)
+
+    @property
+    def nbytes(self) -> int:
+        return _nbytes(self.coords) + _nbytes(self.before) + _nbytes(self.after)
+
+    def record(self, x, y, before, after):
+        self.coords.extend((x, y))
+        self.before.append(before)
+        self.after.append(after)
+
+    def merge(self, other: "TileDelta"):
+        """Ajoute les cases d'un delta postérieur du même calque (coup de pinceau continu)."""
+        self.coords.extend(other.coords)
+        self.before.extend(other.before)
+        self.after.extend(other.after)
+
+    def undo(self, layers: List[Layer]):
+        layer = layers[self.layer]
+        coords, before = self.coords, self.before
+        # à l'envers : une case touchée deux fois retrouve bien son tout premier état
+        for i in range(len(before) - 1, -1, -1):
+            layer.setCode(coords[2 * i], coords[2 * i + 1], before[i])
+
+    def redo(self, layers: List[Layer]):
+        layer = layers[self.layer]
+        coords, after = self.coords, self.after
+        for i in range(len(after)):
+            layer.setCode(coords[2 * i], coords[2 * i + 1], after[i])
+
+    def changed(self) -> bool:
+        return self.before != self.after
+
+
+@dataclass
+class SpanDelta:
+    """
+    Enregistrement compact d'un remplissage irrégulier (pot de peinture) :
+    une suite de segments horizontaux (y, x_min, x_max) passés d'un code à un autre.
+    """
+    layer: int
+    spans: array
+    before: int
+    after: int
+
+    @property
+    def area(self) -> int:
+        spans = self.spans
+        return sum(spans[i + 2] - spans[i + 1] + 1 for i in range(0, len(spans), 3))
+
+    @property
+    def nbytes(self) -> int:
+        return _nbytes(self.spans)
+
+    def _write(self, layers: List[Layer], code):
+        layer = layers[self.layer]
+        spans = self.spans
+        for i in range(0, len(spans), 3):
+            y = spans[i]
+            layer.writeRegion(spans[i + 1], y, spans[i + 2], y, code)
+
+    def undo(self, layers: List[Layer]):
+        self._write(layers, self.before)
+
+    def redo(self, layers: List[Layer]):
+        self._write(layers, self.after)
+
+    def changed(self) -> bool:
+        return bool(self.spans) and self.before != self.after
+
+
+class FloodFillLimit(Exception):
+    """La zone à remplir dépasse le nombre maximal de cases autorisé."""
+
+
+def flood_fill(layers: List[Layer], layer_index, x, y, tile: Tile, bounds, max_cells) -> SpanDelta | None:
+    """
+    Remplissage par balayage de lignes (scanline) de la zone contiguë (4-connexité)
+    de même code que la case (x, y), limité à `bounds` (pygame.Rect en coordonnées grille).
+    Lève FloodFillLimit (sans rien modifier) si la zone dépasse max_cells cases.
+    """
+    layer = layers[layer_index]
+    target = layer.getCode(x, y)
+    code = encode_tile(tile)
+    if target == code or not bounds.collidepoint(x, y):
+        return None
+    x_lo, y_lo = bounds.left, bounds.top
+    x_hi, y_hi = bounds.right - 1, bounds.bottom - 1
+    get = layer.getCode
+
+    delta = SpanDelta(layer_index, array("i"), target, code)
+    filled = 0
+    stack = [(x, y)]
+    while stack:
+        sx, sy = stack.pop()
+        if get(sx, sy) != target:
+            continue
+        left = sx
+        while left > x_lo and get(left - 1, sy) == target:
+            left -= 1
+        right = sx
+        while right < x_hi and get(right + 1, sy) == target:
+            right += 1
+
+        filled += right - left + 1
+        if filled > max_cells:
+            delta.undo(layers)
+            raise FloodFillLimit(f"{filled} cases > {max_cells}")
+        layer.writeRegion(left, sy, right, sy, code)
+        delta.spans.extend((sy, left, right))
+
+        # une graine par segment contigu de la ligne voisine
+        for ny in (sy - 1, sy + 1):
+            if ny < y_lo or ny > y_hi:
+                continue
+            inside = False
+            for nx in range(left, right + 1):
+                if get(nx, ny) == target:
+                    if not inside:
+                        stack.append((nx, ny))
+                        inside = True
+                else:
+                    inside = False
+    return delta
+
+
+def place_tiles(layers: List[Layer], layer_index, tiles) -> TileDelta:
+    """Pose des tuiles une à une et retourne le delta des cases réellement modifiées."""
+    layer = layers[layer_index]
+    delta = TileDelta(layer_index)
+    for tile in tiles:
+        code = encode_tile(tile)
+        old = layer.setCode(tile.x, tile.y, code)
+        if old != code:
+            delta.record(tile.x, tile.y, old, code)
+    return delta
+
+
+def erase_tiles(layers: List[Layer], layer_index, positions) -> TileDelta:
+    layer = layers[layer_index]
+    delta = TileDelta(layer_index)
+    for x, y in positions:
+        old = layer.setCode(x, y, 0)
+        if old:
+            delta.record(x, y, old, 0)
+    return delta
+
+
+def fill_region(layers: List[Layer], layer_index, x_min, y_min, x_max, y_max, tile: Tile) -> RegionDelta:
+    """Remplit la zone avec une seule tuile, en une passe par bloc."""
+    code = encode_tile(tile)
+    before = layers[layer_index].writeRegion(x_min, y_min, x_max, y_max, code)
+    return RegionDelta(layer_index, x_min, y_min, x_max, y_max, before, code)
+
+
+def random_fill_region(layers: List[Layer], layer_index, x_min, y_min, x_max, y_max,
+                       tiles: List[Tile], weights=None, rng=random) -> RegionDelta:
+    """
+    Remplit la zone en tirant chaque case parmi `tiles`.
+    Sans poids explicites, une tuile présente plusieurs fois dans la sélection pèse d'autant plus.
+    """
+    if weights is None:
+        counts = Counter(encode_tile(tile) for tile in tiles)
+        codes, weights = list(counts), list(counts.values())
+    else:
+        codes = [encode_tile(tile) for tile in tiles]
+    area = (x_max - x_min + 1) * (y_max - y_min + 1)
+    after = array(CELL_TYPECODE, rng.choices(codes, weights=weights, k=area))
+    before = layers[layer_index].writeRegion(x_min, y_min, x_max, y_max, after)
+    return RegionDelta(layer_index, x_min, y_min, x_max, y_max, before, after)
+
+
+def erase_region(layers: List[Layer], layer_index, x_min, y_min, x_max, y_max) -> RegionDelta:
+    """Vide la zone ; les blocs absents ne sont même pas créés."""
+    before = layers[layer_index].writeRegion(x_min, y_min, x_max, y_max, 0)
+    return RegionDelta(layer_index, x_min, y_min, x_max, y_max, before, 0)
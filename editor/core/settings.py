@@ -62,6 +62,14 @@ class SettingsManager:
         self.player_spawn_point: str | None = None
         self.can_fly: bool = False
         self.display_particles: bool = True
+        # nombre maximal de cases remplies par le pot de peinture (réglage avancé, sauvegardé)
+        self.bucket_fill_cap: int = 250_000
+        # mémoire accordée à l'historique d'annulation (Mo, réglage avancé, sauvegardé)
+        self.history_budget_mb: float = 64.0
+        # fraction de la résolution de l'écran utilisée pour composer l'éclairage (réglage avancé, sauvegardé)
+        self.light_resolution: float = 0.5
+        # en dessous de ce zoom, le viewport affiche des vignettes de blocs au lieu des cases (réglage avancé, sauvegardé)
+        self.lod_zoom: float = 0.5
         # Widgets container per section:
         # Section -> List of tuples(label, widget, setting, base_rect)
         self.widgets: dict[Section, List[Tuple[str, Any, str, pygame.Rect]]] = {
@@ -86,6 +94,14 @@ class SettingsManager:
                 self.start_mode = int(data["start_mode"])
             if "last_path" in data:
                 self.last_path = data["last_path"]
+            if "bucket_fill_cap" in data:
+                self.bucket_fill_cap = int(data["bucket_fill_cap"])
+            if "history_budget_mb" in data:
+                self.history_budget_mb = float(data["history_budget_mb"])
+            if "light_resolution" in data:
+                self.light_resolution = float(data["light_resolution"])
+            if "lod_zoom" in data:
+                self.lod_zoom = float(data["lod_zoom"])
         except FileNotFoundError:
             pass
         except Exception as e:
@@ -95,7 +111,11 @@ class SettingsManager:
         data = {
             "fps": int(self.fps),
             "start_mode": int(self.start_mode),
-            "last_path":self.path
+            "last_path":self.path,
+            "bucket_fill_cap": int(self.bucket_fill_cap),
+            "history_budget_mb": float(self.history_budget_mb),
+            "light_resolution": float(self.light_resolution),
+            "lod_zoom": float(self.lod_zoom)
         }
         try:
             with open(self.settings_file, "w", encoding="utf-8") as f:
@@ -137,6 +157,12 @@ class SettingsManager:
                     y_offset += base_rect.height + 35
                     continue
 
+                if wtype == "Readout":
+                    # valeur en lecture seule, recalculée à chaque affichage (voir readout_text)
+                    self.widgets[sec].append((label, None, setting, base_rect.copy()))
+                    y_offset += base_rect.height + 5
+                    continue
+
                 # --- création des widgets interactifs ---
                 if wtype == "Slider":
                     widget = Slider(
@@ -277,6 +303,17 @@ class SettingsManager:
                widget[1].text=self.get_startmode_str(self.start_mode)
                widget[1].text_surf = widget[1].font.render(widget[1].text, True, widget[1].text_color)
 
+    def mark_dirty(self, dirty):
+        """Signale à `dirty` le panneau (ouverture / fermeture) et ses menus déroulants ouverts."""
+        visible = self.active_section != Section.HIDDEN
+        readouts = tuple(self.readout_text(setting) for _, widget, setting, _ in self.widgets[self.active_section]
+                         if widget is None and setting) if visible else ()
+        dirty.track("settings", self.panel_rect if visible else None, (self.active_section, readouts))
+        if visible:
+            for _, widget, _, _ in self.widgets[self.active_section]:
+                if isinstance(widget, MenuButton):
+                    dirty.markMenu(widget)
+
     def draw(self):
         if self.active_section == Section.HIDDEN:
             return
@@ -299,11 +336,12 @@ class SettingsManager:
 
         y = title_bottom + 10
 
-        for label, widget, _, base_rect in self.widgets[self.active_section]:
-            # 1) Texte statique (Text/Title)
+        for label, widget, setting, base_rect in self.widgets[self.active_section]:
+            # 1) Texte statique (Text/Title) ou valeur (Readout)
             if widget is None:
                 max_w = self.panel_w - (base_rect.x + 10)
-                for i, line in enumerate(self._wrap_text(label, max_w)):
+                text = self.readout_text(setting) if setting else label
+                for i, line in enumerate(self._wrap_text(text, max_w)):
                     txt_surf = self.font.render(line, True, (200,200,200))
                     self.screen.blit(txt_surf, (self.panel_rect.x + base_rect.x,
                                                 base_rect.y + i * self.font.get_linesize()))
@@ -320,6 +358,14 @@ class SettingsManager:
                 label+=f": {round(self.jump_force,2)}"
             elif label == "Player Speed":
                 label+=f": {round(self.player_speed,2)}"
+            elif label == "Fill Cap":
+                label+=f": {int(self.bucket_fill_cap) // 1000}k"
+            elif label == "History":
+                label+=f": {round(self.history_budget_mb)} Mo"
+            elif label == "Lights":
+                label+=f": {round(self.light_resolution * 100)}%"
+            elif label == "LOD":
+                label+=f": {self.lod_zoom:.2f}"
             lbl_surf = self.font.render(label, True, (200,200,200))
 
             # Si c'est un slider ou un menu déroulant, on le place au-dessus
@@ -336,6 +382,14 @@ class SettingsManager:
             
             self.screen.blit(lbl_surf, (label_x, label_y))
 
+    def readout_text(self, setting: str) -> str:
+        """Texte des widgets Readout de settings_ui.json."""
+        if setting == "history_memory":
+            if self.dataManager is None:
+                return ""
+            used = self.dataManager.history.memory_used / (1024 * 1024)
+            return f"Historique : {used:.1f} / {self.history_budget_mb:.0f} Mo"
+        return ""
 
 
 
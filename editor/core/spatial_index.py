@@ -0,0 +1,93 @@
+from typing import Dict, List, Tuple
+
+
+Box = Tuple[float, float, float, float]
+
+
+class SpatialIndex:
+    """
+    Grille uniforme (hachage spatial) en coordonnées carte : chaque élément est
+    rangé dans toutes les cellules que sa boîte (x0, y0, x1, y1) recouvre.
+    Les requêtes ne parcourent que les cellules touchées, puis filtrent par boîte ;
+    les résultats sont rendus dans l'ordre d'insertion (comme les listes d'origine).
+    """
+
+    def __init__(self, cell_size: int = 256):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Dict[int, object]] = {}
+        # id(objet) -> (objet, boîte, cellules, ordre d'insertion)
+        self.entries: Dict[int, Tuple[object, Box, List[Tuple[int, int]], int]] = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self._seq = 0
+
+    def _cellRange(self, box: Box):
+        cs = self.cell_size
+        return (int(box[0] // cs), int(box[1] // cs),
+                int(box[2] // cs), int(box[3] // cs))
+
+    def insert(self, obj, box: Box, seq: int | None = None):
+        """Ajoute (ou replace) un élément avec sa boîte englobante."""
+        key = id(obj)
+        if key in self.entries:
+            seq = self.entries[key][3] if seq is None else seq
+            self.remove(obj)
+        if seq is None:
+            seq = self._seq
+            self._seq += 1
+        cx0, cy0, cx1, cy1 = self._cellRange(box)
+        cells = []
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                self.cells.setdefault((cx, cy), {})[key] = obj
+                cells.append((cx, cy))
+        self.entries[key] = (obj, box, cells, seq)
+
+    def update(self, obj, box: Box):
+        """Déplace un élément déjà indexé en conservant son ordre."""
+        self.insert(obj, box)
+
+    def remove(self, obj):
+        entry = self.entries.pop(id(obj), None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.pop(id(obj), None)
+                if not bucket:
+                    del self.cells[cell]
+
+    def queryRect(self, box: Box) -> list:
+        """Éléments dont la boîte intersecte `box`, dans l'ordre d'insertion."""
+        x0, y0, x1, y1 = box
+        cx0, cy0, cx1, cy1 = self._cellRange(box)
+        found: Dict[int, object] = {}
+        # très grande zone (dézoom) : on parcourt les cellules occupées plutôt que la zone
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            for (cx, cy), bucket in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.update(bucket)
+        else:
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    bucket = self.cells.get((cx, cy))
+                    if bucket:
+                        found.update(bucket)
+
+        hits = []
+        for key in found:
+            obj, (bx0, by0, bx1, by1), _, seq = self.entries[key]
+            if bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0:
+                hits.append((seq, obj))
+        hits.sort(key=lambda hit: hit[0])
+        return [obj for _, obj in hits]
+
+    def queryPoint(self, x: float, y: float, margin: float = 0) -> list:
+        return self.queryRect((x - margin, y - margin, x + margin, y + margin))
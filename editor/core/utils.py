@@ -1,10 +1,13 @@
 
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
 import math
 import random
+import re
 import time
-from typing import List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 import uuid
 import webbrowser
 
@@ -23,6 +26,7 @@ class Tools(Enum):
     Draw = "draw"
     Rubber = "rubber"
     Fill = "fill"
+    Bucket = "bucket"
     Random = "random"
     Selection = "selection"
     LocationPoint = "location_point"
@@ -38,6 +42,7 @@ class ActionType(Enum):
     RemoveKeyframe = 6
     AddLight = 7
     RemoveLight = 8
+    RegionTiles = 9
     
 
 class Axis(Enum):
@@ -47,7 +52,7 @@ class Axis(Enum):
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Tile:
     TileMap: str
     x: int
@@ -77,30 +82,409 @@ class AnimatedTile:
     tile: Tile
     layer: int 
 
-@dataclass
-class Layer:
-    opacity: float = 1.0
-    tiles: List[Tile] = field(default_factory=list)
-        
-    def addOrReplaceTile(self, tile):
-        idx = next((i for i, t in enumerate(self.tiles) if t.x == tile.x and t.y == tile.y), None)
-        
-        if idx is not None:
-            if self.tiles[idx] == tile:
-                return ""
-            replaced_tile = self.tiles[idx]
-            self.tiles[idx] = tile
-            return replaced_tile
+class TilesetRegistry:
+    """Table d'internement : nom de tileset <-> petit identifiant entier."""
+    def __init__(self):
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, name: str) -> int:
+        tileset_id = self._ids.get(name)
+        if tileset_id is None:
+            tileset_id = len(self._names)
+            if tileset_id > TILESET_MAX:
+                raise ValueError(f"Trop de tilesets (max {TILESET_MAX + 1})")
+            self._names.append(name)
+            self._ids[name] = tileset_id
+        return tileset_id
+
+    def find(self, name: str) -> int | None:
+        """Identifiant d'un nom déjà interné, sans l'ajouter."""
+        return self._ids.get(name)
+
+    def name(self, tileset_id: int) -> str:
+        return self._names[tileset_id]
+
+    def __len__(self):
+        return len(self._names)
+
+
+TILESETS = TilesetRegistry()
+
+
+class NameRegistry:
+    """
+    Index nom -> objets (objets ou dict ayant une clé/attribut `attr`).
+    Pour un nom partagé, le premier inséré est rendu, comme le ferait un parcours de liste.
+    Garde aussi le plus grand suffixe numérique par préfixe ("point_12" -> "point_", 12).
+    """
+    _SUFFIX = re.compile(r"^(.*?)(\d+)$")
+
+    def __init__(self, items: Iterable = (), attr: str = "name"):
+        self.attr = attr
+        self.by_name: Dict[str, list] = {}
+        self._names: Dict[int, str] = {}
+        self._suffixes: Dict[str, Dict[int, int]] = {}
+        self._max: Dict[str, int] = {}
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def __len__(self):
+        return len(self._names)
+
+    def _nameOf(self, item):
+        return item.get(self.attr) if isinstance(item, dict) else getattr(item, self.attr, None)
+
+    def get(self, name, default=None):
+        items = self.by_name.get(name)
+        return items[0] if items else default
+
+    def add(self, item):
+        name = self._nameOf(item)
+        self._names[id(item)] = name
+        self.by_name.setdefault(name, []).append(item)
+        m = self._SUFFIX.match(name) if isinstance(name, str) else None
+        if m:
+            prefix, idx = m.group(1), int(m.group(2))
+            counts = self._suffixes.setdefault(prefix, {})
+            counts[idx] = counts.get(idx, 0) + 1
+            if idx > self._max.get(prefix, -1):
+                self._max[prefix] = idx
+
+    def remove(self, item):
+        if id(item) not in self._names:
+            return
+        name = self._names.pop(id(item))
+        items = self.by_name[name]
+        items[:] = [other for other in items if other is not item]
+        if not items:
+            del self.by_name[name]
+        m = self._SUFFIX.match(name) if isinstance(name, str) else None
+        if m:
+            prefix, idx = m.group(1), int(m.group(2))
+            counts = self._suffixes[prefix]
+            counts[idx] -= 1
+            if not counts[idx]:
+                del counts[idx]
+                if self._max.get(prefix) == idx:
+                    # seul cas non constant : le plus grand suffixe disparaît
+                    if counts:
+                        self._max[prefix] = max(counts)
+                    else:
+                        del self._max[prefix]
+
+    def rename(self, item, new_name):
+        """Renomme l'objet (attribut ou clé) et met l'index à jour."""
+        self.remove(item)
+        if isinstance(item, dict):
+            item[self.attr] = new_name
         else:
-            self.tiles.append(tile)
-            return None
+            setattr(item, self.attr, new_name)
+        self.add(item)
+
+    def owns(self, item) -> bool:
+        return id(item) in self._names
+
+    def nextName(self, prefix: str) -> str:
+        """Premier nom libre `prefix<n>` après le plus grand suffixe utilisé."""
+        return f"{prefix}{self._max.get(prefix, -1) + 1}"
+
+
+# Une case de calque tient dans un entier 32 bits (0 = case vide) :
+#   bits 0-1   rotation (quarts de tour)
+#   bit  2     flip horizontal
+#   bit  3     flip vertical
+#   bits 4-13  Originalx
+#   bits 14-23 Originaly
+#   bits 24-31 identifiant du tileset + 1
+SOURCE_BITS = 10
+SOURCE_MAX = (1 << SOURCE_BITS) - 1
+TILESET_SHIFT = 4 + 2 * SOURCE_BITS
+TILESET_MAX = 254
+
+
+def encode_tile(tile: Tile) -> int:
+    if not (0 <= tile.Originalx <= SOURCE_MAX and 0 <= tile.Originaly <= SOURCE_MAX):
+        raise ValueError(f"Position source hors limites : ({tile.Originalx}, {tile.Originaly})")
+    return ((TILESETS.intern(tile.TileMap) + 1) << TILESET_SHIFT
+            | tile.Originaly << (4 + SOURCE_BITS)
+            | tile.Originalx << 4
+            | tile.flipVertical << 3
+            | tile.flipHorizontal << 2
+            | (tile.rotation // 90) % 4)
+
+
+def unpack_tile(code: int) -> Tuple[int, int, int, int, bool, bool]:
+    """(tileset_id, Originalx, Originaly, rotation, flipHorizontal, flipVertical) d'un code."""
+    return (
+        (code >> TILESET_SHIFT) - 1,
+        (code >> 4) & SOURCE_MAX,
+        (code >> (4 + SOURCE_BITS)) & SOURCE_MAX,
+        (code & 3) * 90,
+        bool(code & 4),
+        bool(code & 8)
+    )
+
+
+def decode_tile(code: int, x: int, y: int) -> Tile:
+    """Vue Tile (objet temporaire) d'une case encodée."""
+    tileset_id, ox, oy, rotation, flip_h, flip_v = unpack_tile(code)
+    return Tile(TILESETS.name(tileset_id), x, y, ox, oy, rotation, flip_h, flip_v)
 
 
+CHUNK_SIZE = 32
+CELL_TYPECODE = "I" if array("I").itemsize >= 4 else "L"
 
-    def removeTile(self, pos):
-        idx = next((i for i, t in enumerate(self.tiles) if t.x == pos[0] and t.y == pos[1]), None)
-        if idx is not None:
-            self.tiles.pop(idx)
+
+@dataclass
+class TileChunk:
+    """Bloc de CHUNK_SIZE x CHUNK_SIZE cases d'un calque, stockées en codes entiers."""
+    cx: int
+    cy: int
+    cells: array = field(default_factory=lambda: empty_cells(CHUNK_SIZE * CHUNK_SIZE), repr=False)
+    count: int = 0
+    dirty: bool = True
+    revision: int = 0
+    _bbox: pygame.Rect | None = field(default=None, repr=False)
+    _bbox_stale: bool = field(default=False, repr=False)
+
+    @property
+    def bbox(self) -> pygame.Rect | None:
+        """Boîte englobante des tuiles posées, en coordonnées grille."""
+        if self._bbox_stale:
+            self._bbox_stale = False
+            self._bbox = None
+            for x, y, _ in self.items():
+                if self._bbox is None:
+                    self._bbox = pygame.Rect(x, y, 1, 1)
+                elif not self._bbox.collidepoint(x, y):
+                    self._bbox.union_ip(pygame.Rect(x, y, 1, 1))
+        return self._bbox
+
+    def items(self):
+        """(x, y, code) des cases non vides, en coordonnées grille."""
+        if not self.count:
+            return
+        ox, oy = self.cx * CHUNK_SIZE, self.cy * CHUNK_SIZE
+        for i, code in enumerate(self.cells):
+            if code:
+                yield ox + i % CHUNK_SIZE, oy + i // CHUNK_SIZE, code
+
+    def get(self, x, y) -> int:
+        return self.cells[(y - self.cy * CHUNK_SIZE) * CHUNK_SIZE + x - self.cx * CHUNK_SIZE]
+
+    def set(self, x, y, code) -> int:
+        """Écrit un code (0 pour vider) et retourne l'ancien."""
+        i = (y - self.cy * CHUNK_SIZE) * CHUNK_SIZE + x - self.cx * CHUNK_SIZE
+        old = self.cells[i]
+        if old == code:
+            return old
+        self.cells[i] = code
+        self.count += (code != 0) - (old != 0)
+        self.dirty = True
+        self.revision += 1
+        if not code:
+            self._bbox_stale = True
+        elif not self._bbox_stale:
+            if self._bbox is None:
+                self._bbox = pygame.Rect(x, y, 1, 1)
+            elif not self._bbox.collidepoint(x, y):
+                self._bbox.union_ip(pygame.Rect(x, y, 1, 1))
+        return old
+
+    def writeSpan(self, i0, values) -> array:
+        """Écrit une suite contiguë de codes à partir de l'index i0 et retourne les anciens."""
+        n = len(values)
+        old = self.cells[i0:i0 + n]
+        if old == values:
+            return old
+        self.cells[i0:i0 + n] = values
+        self.count += old.count(0) - values.count(0)
+        self.dirty = True
+        self.revision += 1
+        self._bbox_stale = True
+        return old
+
+
+def empty_cells(n: int) -> array:
+    return array(CELL_TYPECODE, [0]) * n
+
+
+def filled_cells(code: int, n: int) -> array:
+    return array(CELL_TYPECODE, [code]) * n
+
+
+@dataclass
+class Layer:
+    opacity: float = 1.0
+    chunks: Dict[Tuple[int, int], TileChunk] = field(default_factory=dict, repr=False)
+    _count: int = field(default=0, repr=False)
+
+    @classmethod
+    def fromTiles(cls, tiles: Iterable[Tile], opacity: float = 1.0) -> "Layer":
+        layer = cls(opacity=opacity)
+        for tile in tiles:
+            layer.addOrReplaceTile(tile)
+        return layer
+
+    @property
+    def tiles(self):
+        """Itération ordonnée (bloc par bloc) sur toutes les tuiles, sous forme de vues Tile."""
+        for chunk in self.chunks.values():
+            for x, y, code in chunk.items():
+                yield decode_tile(code, x, y)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @staticmethod
+    def chunkKey(x, y) -> Tuple[int, int]:
+        return (x // CHUNK_SIZE, y // CHUNK_SIZE)
+
+    def getCode(self, x, y) -> int:
+        chunk = self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        if chunk is None:
+            return 0
+        return chunk.get(x, y)
+
+    def setCode(self, x, y, code) -> int:
+        """Écrit un code de case (0 pour effacer) et retourne l'ancien code."""
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if not code:
+                return 0
+            chunk = self.chunks[key] = TileChunk(*key)
+        before = chunk.count
+        old = chunk.set(x, y, code)
+        self._count += chunk.count - before
+        return old
+
+    def getTile(self, x, y) -> Tile | None:
+        code = self.getCode(x, y)
+        return decode_tile(code, x, y) if code else None
+
+    def addOrReplaceTile(self, tile):
+        """
+        Pose une tuile en O(1).
+        Retourne la tuile remplacée, None si la case était vide,
+        ou "" si la tuile posée est identique à l'existante.
+        """
+        code = encode_tile(tile)
+        old = self.setCode(tile.x, tile.y, code)
+        if old == code:
+            return ""
+        return decode_tile(old, tile.x, tile.y) if old else None
+
+    def removeTile(self, pos) -> Tile | None:
+        old = self.setCode(pos[0], pos[1], 0)
+        return decode_tile(old, pos[0], pos[1]) if old else None
+
+    def bounds(self) -> pygame.Rect | None:
+        """Boîte englobante (coordonnées grille) de toutes les tuiles du calque."""
+        box = None
+        for chunk in self.chunks.values():
+            chunk_box = chunk.bbox
+            if chunk_box is None:
+                continue
+            box = chunk_box.copy() if box is None else box.union(chunk_box)
+        return box
+
+    def readRegion(self, x_min, y_min, x_max, y_max) -> array:
+        """Codes de la zone grille, ligne par ligne (0 pour les cases vides)."""
+        cells = array(CELL_TYPECODE)
+        for y in range(y_min, y_max + 1):
+            cy = y // CHUNK_SIZE
+            row = (y - cy * CHUNK_SIZE) * CHUNK_SIZE
+            x = x_min
+            while x <= x_max:
+                cx = x // CHUNK_SIZE
+                x_end = min(x_max, cx * CHUNK_SIZE + CHUNK_SIZE - 1)
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    cells.extend(empty_cells(x_end - x + 1))
+                else:
+                    i0 = row + x - cx * CHUNK_SIZE
+                    cells.extend(chunk.cells[i0:i0 + x_end - x + 1])
+                x = x_end + 1
+        return cells
+
+    def writeRegion(self, x_min, y_min, x_max, y_max, values) -> array:
+        """
+        Écrit d'un bloc la zone grille [x_min, x_max] x [y_min, y_max].
+        values est soit un code unique (0 pour effacer), soit un array de codes
+        ligne par ligne. Retourne les anciens codes dans le même ordre.
+        """
+        width = x_max - x_min + 1
+        constant = isinstance(values, int)
+        before = array(CELL_TYPECODE)
+        for y in range(y_min, y_max + 1):
+            cy = y // CHUNK_SIZE
+            row = (y - cy * CHUNK_SIZE) * CHUNK_SIZE
+            offset = (y - y_min) * width - x_min
+            x = x_min
+            while x <= x_max:
+                cx = x // CHUNK_SIZE
+                x_end = min(x_max, cx * CHUNK_SIZE + CHUNK_SIZE - 1)
+                n = x_end - x + 1
+                span = filled_cells(values, n) if constant else values[offset + x:offset + x_end + 1]
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    if span.count(0) == n:
+                        before.extend(empty_cells(n))
+                        x = x_end + 1
+                        continue
+                    chunk = self.chunks[(cx, cy)] = TileChunk(cx, cy)
+                count = chunk.count
+                before.extend(chunk.writeSpan(row + x - cx * CHUNK_SIZE, span))
+                self._count += chunk.count - count
+                x = x_end + 1
+        return before
+
+    def chunksInRect(self, x_min, y_min, x_max, y_max):
+        """Blocs qui recoupent la zone grille [x_min, x_max] x [y_min, y_max]."""
+        cx_min, cy_min = x_min // CHUNK_SIZE, y_min // CHUNK_SIZE
+        cx_max, cy_max = x_max // CHUNK_SIZE, y_max // CHUNK_SIZE
+        span = (cx_max - cx_min + 1) * (cy_max - cy_min + 1)
+        if span > len(self.chunks):
+            for (cx, cy), chunk in self.chunks.items():
+                if cx_min <= cx <= cx_max and cy_min <= cy <= cy_max:
+                    yield chunk
+            return
+        for cy in range(cy_min, cy_max + 1):
+            for cx in range(cx_min, cx_max + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is not None:
+                    yield chunk
+
+    def codesInRect(self, x_min, y_min, x_max, y_max):
+        """(x, y, code) des cases non vides de la zone grille [x_min, x_max] x [y_min, y_max]."""
+        for chunk in self.chunksInRect(x_min, y_min, x_max, y_max):
+            box = chunk.bbox
+            if box is None:
+                continue
+            if box.left >= x_min and box.right - 1 <= x_max and box.top >= y_min and box.bottom - 1 <= y_max:
+                yield from chunk.items()
+                continue
+            for x, y, code in chunk.items():
+                if x_min <= x <= x_max and y_min <= y <= y_max:
+                    yield x, y, code
+
+    def tilesInRect(self, x_min, y_min, x_max, y_max):
+        """Vues Tile des cases non vides de la zone grille [x_min, x_max] x [y_min, y_max]."""
+        for x, y, code in self.codesInRect(x_min, y_min, x_max, y_max):
+            yield decode_tile(code, x, y)
+
+    def dirtyChunks(self):
+        return [chunk for chunk in self.chunks.values() if chunk.dirty]
+
+    def markClean(self):
+        for chunk in self.chunks.values():
+            chunk.dirty = False
 
 
 @dataclass
@@ -113,6 +497,10 @@ class TileMap:
     zoomedImage: pygame.surface.Surface
     zoom: int = 1.0
     panningOffset: List[int] = field(default_factory=lambda: [0, 0])
+    id: int = field(init=False, default=-1)
+
+    def __post_init__(self):
+        self.id = TILESETS.intern(self.name)
 
     def GetTileImage(self,x,y):
         """Get tile image from relative position"""
@@ -221,6 +609,102 @@ class CollisionRect:
 
 
 
+class LightSpriteCache:
+    """
+    Dégradés de lumière pré-calculés par (rayon, couleur, opacité de l'ombre).
+    Chaque lumière est appliquée au masque d'ombre en deux blits au lieu d'un cercle par pixel de rayon :
+    - couleur : BLEND_RGB_MAX (le fond du masque est noir) ;
+    - opacité : BLEND_RGBA_MIN (l'ombre n'est qu'éclaircie ; hors du disque le sprite vaut 255, sans effet).
+    Sans chevauchement, le résultat est celui des cercles concentriques d'origine ;
+    deux lumières qui se recouvrent s'additionnent au lieu que la dernière efface l'autre.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.sprites: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.bytes = 0
+
+    def _build(self, radius: int, color, base_alpha: int):
+        size = 2 * radius + 1
+        color_sprite = pygame.Surface((size, size))
+        color_sprite.fill((0, 0, 0))
+        alpha_sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        alpha_sprite.fill((255, 255, 255, 255))
+        center = (radius, radius)
+        for r in range(radius, 0, -1):
+            f = 1 - (r / radius)
+            pygame.draw.circle(color_sprite, (int(color[0] * f), int(color[1] * f), int(color[2] * f)), center, r)
+            pygame.draw.circle(alpha_sprite, (255, 255, 255, int(base_alpha * (1 - f))), center, r)
+        return color_sprite, alpha_sprite
+
+    def get(self, radius: int, color, base_alpha: int):
+        key = (radius, tuple(color[:3]), base_alpha)
+        sprites = self.sprites.get(key)
+        if sprites is not None:
+            self.sprites.move_to_end(key)
+            return sprites
+        sprites = self.sprites[key] = self._build(radius, color, base_alpha)
+        self.bytes += 2 * 4 * (2 * radius + 1) ** 2
+        while self.bytes > self.max_bytes and len(self.sprites) > 1:
+            (old_radius, _, _), _ = self.sprites.popitem(last=False)
+            self.bytes -= 2 * 4 * (2 * old_radius + 1) ** 2
+        return sprites
+
+    def draw(self, light_mask: pygame.Surface, center, radius, color, base_alpha):
+        """Éclaire `light_mask` (fond (0, 0, 0, base_alpha)) par une lumière de rayon `radius` en `center`."""
+        radius = int(radius)
+        if radius <= 0:
+            return
+        color_sprite, alpha_sprite = self.get(radius, color, int(base_alpha))
+        topleft = (int(center[0]) - radius, int(center[1]) - radius)
+        light_mask.blit(color_sprite, topleft, special_flags=pygame.BLEND_RGB_MAX)
+        light_mask.blit(alpha_sprite, topleft, special_flags=pygame.BLEND_RGBA_MIN)
+
+
+LIGHT_SPRITES = LightSpriteCache()
+
+
+class LightCompositor:
+    """
+    Masque d'ombre rendu à une fraction `scale` de la taille cible, puis agrandi (smoothscale)
+    avant le blit final : les dégradés de lumière étant doux, la perte est peu visible et le coût
+    de remplissage / mélange est divisé par 1 / scale². Les tampons sont conservés d'une image à l'autre.
+    Les lumières se dessinent dans le masque en coordonnées multipliées par `factor`.
+    """
+
+    def __init__(self, scale: float = 0.5):
+        self.scale = scale
+        self.factor = 1.0
+        self.size = (0, 0)
+        self.mask: pygame.Surface | None = None
+        self.upscaled: pygame.Surface | None = None
+        self.active = False
+
+    def begin(self, size, shadow_alpha) -> pygame.Surface:
+        """Prépare et retourne le masque basse résolution, rempli de l'ombre globale."""
+        self.factor = min(max(float(self.scale), 0.1), 1.0)
+        self.size = (int(size[0]), int(size[1]))
+        low = (max(1, round(self.size[0] * self.factor)), max(1, round(self.size[1] * self.factor)))
+        if self.mask is None or self.mask.get_size() != low:
+            self.mask = pygame.Surface(low, pygame.SRCALPHA)
+        # ombre nulle : le masque est entièrement transparent, inutile de le composer
+        self.active = shadow_alpha > 0
+        if self.active:
+            self.mask.fill((0, 0, 0, shadow_alpha))
+        return self.mask
+
+    def composite(self, target: pygame.Surface, pos=(0, 0)):
+        if not self.active:
+            return
+        if self.mask.get_size() == self.size:
+            target.blit(self.mask, pos)
+            return
+        if self.upscaled is None or self.upscaled.get_size() != self.size:
+            self.upscaled = pygame.Surface(self.size, pygame.SRCALPHA)
+        pygame.transform.smoothscale(self.mask, self.size, self.upscaled)
+        target.blit(self.upscaled, pos)
+
+
 @dataclass
 class Light:
     x: float
@@ -244,35 +728,20 @@ class Light:
         dy = point[1] - cy
         return dx*dx + dy*dy <= (self.radius * zoom)**2
 
-    def draw(self, surface, light_mask, base_alpha, map_offset, zoom, selected):
+    def draw(self, surface, light_mask, base_alpha, map_offset, zoom, selected, mask_scale=1.0):
         cx = int(map_offset[0] + self.x * zoom)
         cy = int(map_offset[1] + self.y * zoom)
         radius_px = int(self.radius * zoom)
 
+        # le masque peut être en résolution réduite (LightCompositor)
+        center = (cx * mask_scale, cy * mask_scale)
         if self.blink:
             now = time.time()
             phase = (now - self.start_time) * 2
             flick_r = radius_px + math.sin(phase) * self.radius_var + (random.random() - 0.5) * 5
-            for r in range(int(flick_r), 0, -1):
-                f = 1 - (r / flick_r)
-                col = (
-                    int(self.color[0] * f),
-                    int(self.color[1] * f),
-                    int(self.color[2] * f),
-                )
-                a = int((1 - f) * base_alpha)
-                pygame.draw.circle(light_mask, (*col, a), (cx, cy), r)
-
+            LIGHT_SPRITES.draw(light_mask, center, flick_r * mask_scale, self.color, base_alpha)
         else:
-            for r in range(radius_px, 0, -1):
-                f = 1 - (r / radius_px)
-                col = (
-                    int(self.color[0] * f),
-                    int(self.color[1] * f),
-                    int(self.color[2] * f)
-                ) 
-                local_a = int(base_alpha * (1 - f))
-                pygame.draw.circle(light_mask, (*col, local_a), (cx, cy), r)
+            LIGHT_SPRITES.draw(light_mask, center, radius_px * mask_scale, self.color, base_alpha)
 
         if selected:
             pygame.draw.circle(surface, (43, 255, 255), (cx, cy+30), radius_px, width=2)
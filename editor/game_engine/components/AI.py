@@ -1,5 +1,4 @@
 import pygame
-from editor.game_engine.components.Raycast import Raycast
 from editor.game_engine import config
 from editor.game_engine.core.level import Level
 from editor.game_engine.core.utils import AIState, Colors,log
@@ -84,8 +83,10 @@ class AIBehavior:
         return self.distanceToPlayer<=self.locationThreshold+20
 
     def handle_movement(self, direction):
+        # seuls les rectangles proches peuvent toucher la zone de détection devant l'entité
+        nearby = self.entity.rect.inflate(self.obstacle_check_distance * 2, 14)
         front_rect, hitbox= self.entity.collisions.FrontCollide(
-            self.level.get_scaled_rects(),
+            [collision.rect for collision in self.level.collisions_near(nearby)],
             self.entity.direction,
             self.obstacle_check_distance
         )
@@ -117,16 +118,8 @@ class AIBehavior:
         if self.distanceToPlayer == 0:
             return True  # Déjà sur le joueur
         
-        direction = to_player.normalize()
-        
-        vision_ray = Raycast(
-            start=self.entity.rect.center,
-            direction=direction,
-            max_distance=self.distanceToPlayer,
-            debug=config.DEBUG_AI
-        )
-        collision, _, _ = vision_ray.cast(self.level.get_scaled_rects())
-        return collision is None
+        # rayon sur la grille du niveau, résultat partagé quelques pas (is_stuck l'appelle plusieurs fois)
+        return self.level.raycasts.entity_line_of_sight(self.entity, self.player)
 
 
     def DrawDebug(self,surface):
@@ -1,6 +1,7 @@
 import json
 from typing import Dict, List, Tuple, Optional
 import pygame
+from editor.core.asset_manager import AssetManager
 
 
 class Animation:
@@ -22,7 +23,7 @@ class AnimationManager:
     def __init__(self, spritesheet: str, colorkey, initial_animation: str, clock: pygame.time.Clock,entity: None):
 
         self.animations: Dict[str, Animation] = {}
-        self.spritesheet = pygame.image.load(spritesheet).convert()
+        self.spritesheet = AssetManager().load(spritesheet, alpha=False)
         self.colorkey = colorkey
         self.clock = clock
         self.current_animation = initial_animation
@@ -125,7 +126,7 @@ class AnimationManager:
                         continue
 
                     try:
-                        self.spritesheet = pygame.image.load(spritesheet_path).convert()
+                        self.spritesheet = AssetManager().load(spritesheet_path, alpha=False)
                     except Exception as e:
                         print(f"Erreur lors du chargement de la spritesheet {spritesheet_path} : {e}")
                         continue
@@ -165,7 +166,7 @@ class AnimationManager:
                     if "frames" in anim:
                         if anim.get("spritesheet"):
                             try:
-                                self.spritesheet = pygame.image.load(anim["spritesheet"]).convert_alpha()
+                                self.spritesheet = AssetManager().load(anim["spritesheet"])
                             except Exception as e:
                                 print(f"Erreur chargement spritesheet {anim['spritesheet']}: {e}")
                         self.addAnimation(
@@ -181,7 +182,7 @@ class AnimationManager:
                         spritesheet_path = anim["spritesheet"]
                         frame_w, frame_h = anim["frame_size"]
                         try:
-                            sheet = pygame.image.load(spritesheet_path).convert_alpha()
+                            sheet = AssetManager().load(spritesheet_path)
                         except Exception as e:
                             print(f"Erreur chargement spritesheet {spritesheet_path}: {e}")
                             continue
@@ -1,3 +1,4 @@
+import math
 import pygame
 from editor.game_engine.core.level import Level
 
@@ -9,42 +10,119 @@ class CollisionManager:
         self.groundThreshold=1
         self.wallThreshold=1
         self.frontHitBoxThreshold=50
+        # collisions à scripts (graph) actuellement traversées par l'entité
+        self.overlapping=[]
+        # résultat du dernier déplacement (move) et contacts à la position courante (_probe)
+        self.contacts=[]
+        self.on_ground=False
+        self.on_wall=False
+        self._probe_key=None
 
     def check(self):
-        for rect in self.level.get_scaled_collision_rects():
+        for rect in self.level.collisions_near(self.entity.rect):
             if self.entity.rect.colliderect(rect):
                 return rect
         return None
     
     def checkWithByName(self,name):
-        for rect in self.level.get_scaled_collision_rects():
+        for rect in self.level.collisions_near(self.entity.rect):
             if rect.name==name and self.entity.rect.colliderect(rect):
                 return True
         return False
 
     def OnGround(self):
-        for Collisionrect in self.level.get_scaled_collision_rects():
-            rect = Collisionrect.rect
-            lowered_rect = self.entity.rect.copy()
-            lowered_rect.bottom += self.groundThreshold
-            if Collisionrect.type=="collision" and lowered_rect.colliderect(rect) and self.entity.rect.top<rect.top:
-                    return True
-        return False
+        self._probe()
+        return self.on_ground
     
     def OnWall(self):
-        for Collisionrect in self.level.get_scaled_collision_rects():
-            rect = Collisionrect.rect
-            # Vérification pour une collision sur le côté gauche
-            leftRect= self.entity.rect.copy()
-            leftRect.x-=self.wallThreshold
-            if Collisionrect.type=="collision" and leftRect.colliderect(rect) and self.entity.rect.right > rect.left:
-                return True
-            # Vérification pour une collision sur le côté droit
-            rightRect= self.entity.rect.copy()
-            rightRect.x+=self.wallThreshold
-            if Collisionrect.type=="collision" and rightRect.colliderect(rect) and self.entity.rect.left < rect.right:
-                return True
-        return False
+        self._probe()
+        return self.on_wall
+
+    def _probe(self):
+        """
+        Contacts sol / mur à la position actuelle, calculés une fois par position (après chaque `move`)
+        puis relus tant que l'entité et les collisions du niveau ne changent pas.
+        """
+        rect = self.entity.rect
+        self.level.get_scaled_collision_rects()
+        key = (rect.x, rect.y, rect.w, rect.h, self.level.collision_version)
+        if key == self._probe_key:
+            return
+        self._probe_key = key
+        lowered_rect = rect.copy()
+        lowered_rect.bottom += self.groundThreshold
+        leftRect = rect.copy()
+        leftRect.x -= self.wallThreshold
+        rightRect = rect.copy()
+        rightRect.x += self.wallThreshold
+        self.on_ground = self.on_wall = False
+        for Collisionrect in self.level.collisions_near(rect.inflate(2*self.wallThreshold, 0).union(lowered_rect)):
+            if Collisionrect.type != "collision":
+                continue
+            other = Collisionrect.rect
+            if lowered_rect.colliderect(other) and rect.top < other.top:
+                self.on_ground = True
+            # côté gauche puis côté droit
+            if (leftRect.colliderect(other) and rect.right > other.left) or (rightRect.colliderect(other) and rect.left < other.right):
+                self.on_wall = True
+
+    def move(self, dx, dy):
+        """
+        Déplacement continu (swept AABB) : l'axe x puis l'axe y, chacun arrêté contre la première
+        collision rencontrée sur le trajet, pour qu'un grand pas (saccade, chute rapide, dash)
+        ne traverse pas une plateforme fine. Retourne les normales des contacts,
+        (0, -1) : sol, (0, 1) : plafond, (1, 0) / (-1, 0) : mur à gauche / à droite.
+        """
+        contacts = []
+        if dx:
+            self._sweep(dx, 0, contacts)
+        if dy:
+            self._sweep(0, dy, contacts)
+        self.contacts = contacts
+        self._probe()
+        return contacts
+
+    def _sweep(self, dx, dy, contacts):
+        rect = self.entity.rect
+        # zone balayée par le déplacement sur cet axe
+        area = rect.union(rect.move(math.floor(dx) if dx < 0 else math.ceil(dx),
+                                    math.floor(dy) if dy < 0 else math.ceil(dy)))
+        stop = None
+        for Collisionrect in self.level.collisions_near(area):
+            if Collisionrect.type != "collision":
+                continue
+            other = Collisionrect.rect
+            if dx:
+                if not (other.top < rect.bottom and other.bottom > rect.top):
+                    continue
+                if dx > 0 and rect.right <= other.left < rect.right + dx:
+                    stop = other.left if stop is None else min(stop, other.left)
+                elif dx < 0 and rect.left + dx < other.right <= rect.left:
+                    stop = other.right if stop is None else max(stop, other.right)
+            else:
+                if not (other.left < rect.right and other.right > rect.left):
+                    continue
+                if dy > 0 and rect.bottom <= other.top < rect.bottom + dy:
+                    stop = other.top if stop is None else min(stop, other.top)
+                elif dy < 0 and rect.top + dy < other.bottom <= rect.top:
+                    stop = other.bottom if stop is None else max(stop, other.bottom)
+        if stop is None:
+            if dx:
+                rect.x += dx
+            else:
+                rect.y += dy
+        elif dx > 0:
+            rect.right = stop
+            contacts.append((-1, 0))
+        elif dx < 0:
+            rect.left = stop
+            contacts.append((1, 0))
+        elif dy > 0:
+            rect.bottom = stop
+            contacts.append((0, -1))
+        else:
+            rect.top = stop
+            contacts.append((0, 1))
 
 
     def FrontCollide(self,rects,direction,threshold=None):
@@ -70,10 +148,10 @@ class CollisionManager:
         
 
     def getSurfaceType(self):
-        for Collisionrect in self.level.get_scaled_collision_rects():
+        lowered_rect = self.entity.rect.copy()
+        lowered_rect.bottom += self.groundThreshold
+        for Collisionrect in self.level.collisions_near(lowered_rect):
             rect = Collisionrect.rect
-            lowered_rect = self.entity.rect.copy()
-            lowered_rect.bottom += self.groundThreshold
             if lowered_rect.colliderect(rect) and self.entity.rect.top<rect.top:
                     return Collisionrect.type
 
@@ -82,10 +160,15 @@ class CollisionManager:
         self.execute()
 
     def execute(self):
-        for Collisionrect in self.level.scaled_collision_rects:
+        # candidats : collisions proches + celles traversées à l'image précédente (pour on_exit)
+        candidates = self.level.collisions_near(self.entity.rect)
+        candidates += [c for c in self.overlapping if c not in candidates]
+        self.overlapping = []
+        for Collisionrect in candidates:
             rect = Collisionrect.rect
             if Collisionrect.graph is not None:
                 if self.entity.rect.colliderect(rect):
+                    self.overlapping.append(Collisionrect)
                     if Collisionrect.collide==False:
                         Collisionrect.collide=True
                         enter=Collisionrect.graph.events.get("on_enter")
@@ -103,7 +186,15 @@ class CollisionManager:
 
     def Process(self):
         """Corrige la position de l'entité en cas de collision avec un objet"""
-        for Collisionrect in self.level.get_scaled_collision_rects():
+        rects = self.level.get_scaled_collision_rects()
+        grid = self.level.collision_grid
+        area = self.entity.rect.inflate(self.entity.rect.width, self.entity.rect.height)
+        indices = grid.query_indices(area)
+        k = 0
+        while k < len(indices):
+            index = indices[k]
+            k += 1
+            Collisionrect = rects[index]
             rect = Collisionrect.rect
             if Collisionrect.type=="collision" and self.entity.rect.colliderect(rect):  # Vérifie si l'entité entre en collision
                 delta_left = abs(self.entity.rect.left - rect.right)
@@ -122,5 +213,11 @@ class CollisionManager:
                 elif min_delta == delta_left:
                     self.entity.rect.left = rect.right  # Collision avec la gauche
 
+                if not area.contains(self.entity.rect):
+                    # repoussée hors de la zone interrogée : collisions suivantes (même ordre) autour de la nouvelle position
+                    area = self.entity.rect.inflate(self.entity.rect.width, self.entity.rect.height)
+                    indices = [i for i in grid.query_indices(area) if i > index]
+                    k = 0
+
 
 
@@ -102,4 +102,4 @@ class EntityMovement:
 
         self._apply_external_forces(dt)
         self.applyFriction()
-        self.entity.rect.x += self.velocity_x * (dt / 17)
+        self.entity.collisions.move(self.velocity_x * (dt / 17), 0)
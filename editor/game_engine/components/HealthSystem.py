@@ -1,5 +1,6 @@
 
 import pygame
+from editor.core.asset_manager import AssetManager
 from editor.game_engine import config
 from editor.game_engine.core.utils import Colors, log
 from typing import TYPE_CHECKING
@@ -17,9 +18,9 @@ class HealthManager:
             self.heal_amount = config["base_params"]["heal_amount"]
         self.last_heal_time = 0
 
-        full_heart = pygame.image.load("./editor/game_engine/Assets/images/heart_full.png").convert_alpha()
-        half_heart = pygame.image.load("./editor/game_engine/Assets/images/heart_half.png").convert_alpha()
-        empty_heart = pygame.image.load("./editor/game_engine/Assets/images/heart_empty.png").convert_alpha()
+        full_heart = AssetManager().load("./editor/game_engine/Assets/images/heart_full.png")
+        half_heart = AssetManager().load("./editor/game_engine/Assets/images/heart_half.png")
+        empty_heart = AssetManager().load("./editor/game_engine/Assets/images/heart_empty.png")
         heart_scale=0.09
 
         # Redimensionne les images de cœur
@@ -92,7 +92,8 @@ class PhysicsObject:
             self.is_jumping = False
             self.fall_timer = 0
 
-        self.entity.rect.y += self.y_velocity * dt_factor
+        # déplacement continu : une chute rapide ne traverse plus les plateformes fines
+        self.entity.collisions.move(0, self.y_velocity * dt_factor)
         if self.entity.collisions.OnGround():
             self.y_velocity = 0
             self.coyote_timer = self.coyote_time
@@ -1,4 +1,5 @@
 import pygame
+from editor.game_engine.core.raycasts import RaycastService
 
 class Raycast:
     def __init__(self, start, direction, max_distance, debug=False):
@@ -25,10 +26,16 @@ class Raycast:
         Lance le rayon et vérifie les collisions avec un ou plusieurs rect.
         
         :param rects: Peut être un pygame.Rect, une liste de pygame.Rect,
-                      ou un pygame.sprite.Group (les sprites doivent avoir un attribut 'rect').
+                      un pygame.sprite.Group (les sprites doivent avoir un attribut 'rect')
+                      ou le RaycastService d'un niveau (level.raycasts, parcours de la grille).
         :return: Tuple (point_collision, rect_collidé, distance)
                  Si aucune collision n'est détectée, retourne (None, None, max_distance).
         """
+        if isinstance(rects, RaycastService):
+            result = rects.cast(self.start, self.direction, self.max_distance)
+            self.collision_point, self.collided_rect = result[0], result[1]
+            return result
+
         # Transformation en liste pour simplifier le traitement
         if isinstance(rects, pygame.Rect):
             rect_list = [rects]
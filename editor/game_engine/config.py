@@ -1,5 +1,8 @@
 #General Settings
 FPS=60
+# fréquence de la simulation (pas fixe, indépendante de l'affichage).
+# Les minuteries comptées en pas (coyote time, tampon de saut, screen shake) sont réglées pour 60.
+SIMULATION_HZ=60
 DISPLAY_FPS=True
 WINDOW_NAME="Jeu Démonstration"
 AUTO_UPDATE_CAMERA=True
@@ -9,6 +9,8 @@ class InputHandler:
         self.noCommandes=player.noInput
         self.input=player.Input
         self.disable=False
+        # état des touches maintenues ; remplacé par une entrée scriptée en mode sans affichage
+        self.key_state = pygame.key.get_pressed
         # Commandes classiques
         self.commandes = {
             pygame.K_RIGHT: self.player.move_right,
@@ -47,7 +49,7 @@ class InputHandler:
                 self.input()
                 return
 
-        keys = pygame.key.get_pressed()
+        keys = self.key_state()
         pressed=False
         for key, action in self.commandes.items():
             if keys[key]:
@@ -0,0 +1,57 @@
+from typing import Callable, Dict, Generic, List, Tuple, TypeVar
+import pygame
+
+
+T = TypeVar("T")
+
+# taille d'une cellule de la grille (pixels monde)
+BROADPHASE_CELL_SIZE = 128
+
+
+class UniformGrid(Generic[T]):
+    """
+    Grille uniforme pour les requêtes de voisinage (phase large) : chaque élément est inscrit
+    dans toutes les cellules que couvre son rectangle, une requête ne parcourt que les cellules
+    de la zone demandée. Le coût dépend donc de la géométrie proche, pas de la taille du niveau.
+    Les candidats sont rendus dans l'ordre d'insertion (même ordre de traitement qu'une liste).
+    """
+
+    def __init__(self, items: List[T] = (), rect_of: Callable[[T], pygame.Rect] = lambda item: item.rect,
+                 cell_size: int = BROADPHASE_CELL_SIZE):
+        self.rect_of = rect_of
+        self.cell_size = cell_size
+        self.items: List[T] = []
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.rebuild(items)
+
+    def _span(self, rect: pygame.Rect) -> Tuple[int, int, int, int]:
+        cs = self.cell_size
+        return (rect.left // cs, rect.top // cs,
+                (rect.right - 1) // cs if rect.w > 0 else rect.left // cs,
+                (rect.bottom - 1) // cs if rect.h > 0 else rect.top // cs)
+
+    def rebuild(self, items: List[T]):
+        self.items = list(items)
+        self.cells.clear()
+        for index, item in enumerate(self.items):
+            x0, y0, x1, y1 = self._span(self.rect_of(item))
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(index)
+
+    def query(self, rect: pygame.Rect) -> List[T]:
+        """Éléments dont les cellules recouvrent `rect` (candidats, à confirmer par colliderect)."""
+        items = self.items
+        return [items[i] for i in self.query_indices(rect)]
+
+    def query_indices(self, rect: pygame.Rect) -> List[int]:
+        """Indices (ordre d'insertion) des éléments dont les cellules recouvrent `rect`."""
+        x0, y0, x1, y1 = self._span(rect)
+        cells = self.cells
+        found = set()
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                indices = cells.get((cx, cy))
+                if indices:
+                    found.update(indices)
+        return sorted(found)
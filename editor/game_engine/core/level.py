@@ -3,8 +3,12 @@ import random
 import time
 from typing import Generator, List, Tuple
 import pygame
+from editor.core.asset_manager import AssetManager
 from editor.game_engine.core.utils import TileMap as CoreTileMap, CollisionRect as CoreCollisionRect, LocationPoint as CoreLocationPoint
 from editor.game_engine.config import STANDARD_TILE_SIZE, BACKGROUND_COLOR
+from editor.game_engine.core.broadphase import UniformGrid
+from editor.game_engine.core.raycasts import RaycastService
+from editor.core.utils import LIGHT_SPRITES, LightCompositor, NameRegistry, decode_tile, encode_tile, unpack_tile
 
 
 class Level:
@@ -25,6 +29,7 @@ class Level:
         self.layers            = layers
         self.collision_rects   = collision_rects
         self.location_points   = location_points
+        self.location_points_by_name = NameRegistry(location_points)
         self.lights            = lights
         self.tile_palette      = tile_palette
         self.background_def = backgrounds
@@ -34,11 +39,14 @@ class Level:
         self.standard_tile_size = standard_tile_size
         self.vfx_emitters      = vfx_emitters if vfx_emitters else []
         self.shadow_alpha=255
+        self.light_compositor  = LightCompositor()
         self.tile_maps         = {}
+        self.tile_maps_by_id   = {}
         self.tile_sizes        = {}
         self.background_layers = []
         self.tile_transform_cache = {}
         self.tile_alpha_cache     = {}
+        self.tile_code_cache      = {}
         self._parallax_layers = []
         self._prepare_background()
         self.init_lightning()
@@ -52,7 +60,16 @@ class Level:
             emitter.size *= scale
             emitter.gravity *= scale
 
-        self.scaled_collision_rects = self.get_scaled_collision_rects()
+        # collisions mises à l'échelle une fois par partie (voir invalidate_collisions)
+        self.scaled_collision_rects: List[CoreCollisionRect] = []
+        self.scaled_rects: List[pygame.Rect] = []
+        self.collision_grid: UniformGrid[CoreCollisionRect] = UniformGrid()
+        self._collision_sources = []
+        self._collisions_dirty = True
+        self.collision_version = 0
+        self._rebuild_collisions()
+        # rayons et lignes de vue sur la grille des collisions
+        self.raycasts = RaycastService(self)
         self._transition_duration = 0.0
         self._transition_timer    = 0.0
         self._bg_target                 = None
@@ -164,6 +181,7 @@ class Level:
     def load_tile_maps(self):
         for tm in self.tile_palette.Maps:
             self.tile_maps[tm.name] = tm
+            self.tile_maps_by_id.setdefault(tm.id, tm)
             self.tile_sizes[tm.name] = tm.tileSize
 
     def _prepare_background(self):
@@ -179,7 +197,7 @@ class Level:
 
         if bg.get("type") == "image":
             for layer_info in bg.get("layers", []):
-                img = pygame.image.load(layer_info["path"]).convert_alpha()
+                img = AssetManager().load(layer_info["path"])
                 self._parallax_layers.append({
                     "image": img,
                     "parallax": layer_info["parallax"],
@@ -188,10 +206,18 @@ class Level:
                     "scaled_size": None
                 })
 
-    def get_scaled_rects(self) -> List[pygame.Rect]:
-        return [crect.rect for crect in self.get_scaled_collision_rects()]
+    def invalidate_collisions(self):
+        """
+        À appeler quand un rectangle de `collision_rects` est déplacé ou redimensionné.
+        Aucun node ne le fait aujourd'hui : le seul qui modifie `collision_rects` (bulle de dialogue,
+        b_world) ne touche qu'au texte, lu sur les rectangles sources au dessin (draw). Le cache n'est
+        donc exact que tant que cela reste vrai ; un node qui change la géométrie doit appeler cette méthode.
+        """
+        self._collisions_dirty = True
 
-    def get_scaled_collision_rects(self) -> List[CoreCollisionRect]:
+    def _rebuild_collisions(self):
+        """Met les collisions à l'échelle du jeu et reconstruit la grille de la phase large."""
+        previous = {id(src): scaled for src, scaled in zip(self._collision_sources, self.scaled_collision_rects)}
         scaled = []
         first = next(iter(self.tile_sizes.values()), 16)
         scale = self.standard_tile_size / first
@@ -203,8 +229,38 @@ class Level:
                 int(r.width * scale),
                 int(r.height * scale)
             )
-            scaled.append(CoreCollisionRect(rd.type, rd.name, rect, rd.color,rd.graph,rd.collide,rd.text,rd.font_size,rd.text_color,rd.bubble_speed,rd.bubble_duration,rd.padding,rd.bubble_start_time))
-        return scaled
+            old = previous.get(id(rd))
+            if old is not None:
+                # même objet conservé : l'état d'entrée / sortie (collide) survit au déplacement
+                old.rect = rect
+                scaled.append(old)
+            else:
+                scaled.append(CoreCollisionRect(rd.type, rd.name, rect, rd.color,rd.graph,rd.collide,rd.text,rd.font_size,rd.text_color,rd.bubble_speed,rd.bubble_duration,rd.padding,rd.bubble_start_time))
+        self._collision_sources = list(self.collision_rects)
+        self.scaled_collision_rects = scaled
+        self.scaled_rects = [crect.rect for crect in scaled]
+        self.collision_grid.rebuild(scaled)
+        self.collision_version += 1
+        self._collisions_dirty = False
+
+    def _ensure_collisions(self):
+        # ajout / retrait détectés par le nombre ; déplacements seulement via invalidate_collisions
+        if self._collisions_dirty or len(self._collision_sources) != len(self.collision_rects):
+            self._rebuild_collisions()
+
+    def get_scaled_rects(self) -> List[pygame.Rect]:
+        self._ensure_collisions()
+        return self.scaled_rects
+
+    def get_scaled_collision_rects(self) -> List[CoreCollisionRect]:
+        """Collisions à l'échelle du jeu (liste partagée : ne pas la modifier)."""
+        self._ensure_collisions()
+        return self.scaled_collision_rects
+
+    def collisions_near(self, rect: pygame.Rect) -> List[CoreCollisionRect]:
+        """Collisions dont les cellules de grille recouvrent `rect` (à confirmer par colliderect)."""
+        self._ensure_collisions()
+        return self.collision_grid.query(rect)
 
     def get_locations_by_type(self, type) -> Generator:
         first = next(iter(self.tile_sizes.values()), 16)
@@ -215,33 +271,58 @@ class Level:
                        loc.rect.y * scale + self.offset_y)
 
     def get_location_by_name(self, name) -> tuple:
+        loc = self.location_points_by_name.get(name)
+        if loc is None:
+            return (800,204)
         first = next(iter(self.tile_sizes.values()), 16)
         scale = self.standard_tile_size / first
-        for loc in self.location_points:
-            if loc.name == name:
-                return (loc.rect.x * scale + self.offset_x,
-                        loc.rect.y * scale + self.offset_y)
-        return (800,204)
+        return (loc.rect.x * scale + self.offset_x,
+                loc.rect.y * scale + self.offset_y)
 
     def get_location_point_by_name(self, name) -> CoreLocationPoint:
-        for loc in self.location_points:
-            if loc.name == name:
-                return loc
+        return self.location_points_by_name.get(name)
 
-    def get_visible_tiles(self, layer, camera):
+    def get_visible_codes(self, layer, camera):
+        """(code, wx, wy) des cases encodées du calque visibles par la caméra."""
         cam = camera.camera_rect
-        cam_r = cam.x + cam.width
-        cam_b = cam.y + cam.height
         ts = self.standard_tile_size
+        # on ne parcourt que les blocs du calque recoupant la caméra
+        x_min = int((cam.x - self.offset_x) // ts) - 1
+        y_min = int((cam.y - self.offset_y) // ts) - 1
+        x_max = int((cam.x + cam.width - self.offset_x) // ts) + 1
+        y_max = int((cam.y + cam.height - self.offset_y) // ts) + 1
 
-        for td in layer.tiles:
-            if not hasattr(td, "world_x"):
-                td.world_x = td.x * ts + self.offset_x
-                td.world_y = td.y * ts + self.offset_y
-            wx, wy = td.world_x, td.world_y
-            if wx + ts < cam.x or wx > cam_r or wy + ts < cam.y or wy > cam_b:
-                continue
-            yield td, wx, wy
+        for x, y, code in layer.codesInRect(x_min, y_min, x_max, y_max):
+            yield code, x * ts + self.offset_x, y * ts + self.offset_y
+
+    def get_visible_tiles(self, layer, camera):
+        ts = self.standard_tile_size
+        for code, wx, wy in self.get_visible_codes(layer, camera):
+            yield decode_tile(code, (wx - self.offset_x) // ts, (wy - self.offset_y) // ts), wx, wy
+
+    def get_code_image(self, code, opacity=255):
+        """Image transformée d'une case encodée, mise en cache par (code, opacité)."""
+        key = (code, opacity)
+        if key in self.tile_code_cache:
+            return self.tile_code_cache[key]
+        tileset_id, original_x, original_y, rotation, flip_h, flip_v = unpack_tile(code)
+        tm = self.tile_maps_by_id.get(tileset_id)
+        img = None
+        if tm:
+            try:
+                img = tm.get_tile(original_x, original_y, self.standard_tile_size)
+            except:
+                img = None
+        if img is not None:
+            if flip_h or flip_v:
+                img = pygame.transform.flip(img, flip_h, flip_v)
+            if rotation:
+                img = pygame.transform.rotate(img, rotation)
+            if opacity != 255:
+                img = img.copy()
+                img.set_alpha(opacity)
+        self.tile_code_cache[key] = img
+        return img
 
     def get_transformed_tile(self, tilemap: CoreTileMap, td):
         key = (
@@ -345,33 +426,10 @@ class Level:
             opacity = int(layer.opacity * 255)
 
             # — 1) Tuiles statiques —
-            for td, wx, wy in self.get_visible_tiles(layer, camera):
-                tm = self.tile_maps.get(td.TileMap)
-                if not tm:
+            for code, wx, wy in self.get_visible_codes(layer, camera):
+                tile_img = self.get_code_image(code, opacity)
+                if tile_img is None:
                     continue
-                if opacity != 255:
-                    key_a = (
-                        tm.name,
-                        td.Originalx, td.Originaly,
-                        td.flipHorizontal, td.flipVertical,
-                        td.rotation,
-                        self.standard_tile_size,
-                        opacity
-                    )
-                    if key_a in self.tile_alpha_cache:
-                        tile_img = self.tile_alpha_cache[key_a]
-                    else:
-                        base = self.get_transformed_tile(tm, td)
-                        if base is None:
-                            continue
-                        tile_img = base.copy()
-                        tile_img.set_alpha(opacity)
-                        self.tile_alpha_cache[key_a] = tile_img
-                else:
-                    tile_img = self.get_transformed_tile(tm, td)
-                    if tile_img is None:
-                        continue
-
                 px, py = camera.apply_point(wx, wy)
                 screen.blit(tile_img, (px, py))
 
@@ -387,35 +445,9 @@ class Level:
                             if anim_tile.tile.TileMap == "":
                                 continue
 
-                            tm = self.tile_maps.get(anim_tile.tile.TileMap)
-                            if not tm:
+                            tile_img = self.get_code_image(encode_tile(anim_tile.tile), opacity)
+                            if tile_img is None:
                                 continue
-                            key_a = (
-                                tm.name,
-                                anim_tile.tile.Originalx, anim_tile.tile.Originaly,
-                                anim_tile.tile.flipHorizontal, anim_tile.tile.flipVertical,
-                                anim_tile.tile.rotation,
-                                self.standard_tile_size,
-                                opacity
-                            )
-                            if key_a in self.tile_alpha_cache:
-                                tile_img = self.tile_alpha_cache[key_a]
-                            else:
-                                base = tm.get_tile(
-                                    anim_tile.tile.Originalx,
-                                    anim_tile.tile.Originaly,
-                                    self.standard_tile_size
-                                )
-                                img = base
-                                if anim_tile.tile.flipHorizontal:
-                                    img = pygame.transform.flip(img, True, False)
-                                if anim_tile.tile.flipVertical:
-                                    img = pygame.transform.flip(img, False, True)
-                                if anim_tile.tile.rotation:
-                                    img = pygame.transform.rotate(img, anim_tile.tile.rotation)
-                                img.set_alpha(opacity)
-                                tile_img = img
-                                self.tile_alpha_cache[key_a] = tile_img
 
                             wx = anim_tile.tile.x * self.standard_tile_size + self.offset_x
                             wy = anim_tile.tile.y * self.standard_tile_size + self.offset_y
@@ -433,42 +465,43 @@ class Level:
         # — Debug collisions —
         from editor.game_engine import config
         
-        for crect in self.get_scaled_collision_rects():
+        # le texte est lu sur la collision d'origine (modifiée par les nodes), la position sur la copie à l'échelle
+        for source, crect in zip(self.collision_rects, self.get_scaled_collision_rects()):
             if config.DEBUG_COLLISIONS:
                 pygame.draw.rect(screen,
                                 crect.color,
                                 camera.apply_rect(crect.rect),
                                 2)
-            if getattr(crect, 'text', None):
+            if getattr(source, 'text', None):
                 now = time.time()
                 # … dans la boucle sur crect …
-                if crect.text is not None:
+                if source.text is not None:
 
                     # 1) Calculer le delta
-                    dt = now - crect.bubble_start_time
+                    dt = now - source.bubble_start_time
                     # 2) Gérer la durée d’affichage
-                    if crect.bubble_duration >= 0 and dt > crect.bubble_duration:
+                    if source.bubble_duration >= 0 and dt > source.bubble_duration:
                         continue  # on n’affiche plus du tout
 
                     # 3) Calculer combien de caractères révéler
-                    if crect.bubble_speed <= 0:
-                        display_text = crect.text
+                    if source.bubble_speed <= 0:
+                        display_text = source.text
                     else:
-                        n_chars = int(dt * crect.bubble_speed)
-                        display_text = crect.text[:n_chars]
+                        n_chars = int(dt * source.bubble_speed)
+                        display_text = source.text[:n_chars]
 
                     # 4) Rendu avec retour à la ligne
-                    font    = pygame.font.Font(None, crect.font_size)
-                    inner_w = crect.rect.width - 2 * crect.padding
+                    font    = pygame.font.Font(None, source.font_size)
+                    inner_w = crect.rect.width - 2 * source.padding
                     text_surfs = self.render_wrapped_text(
-                        display_text, font, crect.text_color, inner_w
+                        display_text, font, source.text_color, inner_w
                     )
 
                     # 5) Blit ligne par ligne
                     base_x, base_y = crect.rect.topleft
                     for idx, surf in enumerate(text_surfs):
-                        y = base_y + crect.padding + idx * font.get_linesize()
-                        x = base_x + crect.padding
+                        y = base_y + source.padding + idx * font.get_linesize()
+                        x = base_x + source.padding
                         screen.blit(surf, camera.apply_point(x, y))
 
 
@@ -501,9 +534,10 @@ class Level:
         first_size = next(iter(self.tile_sizes.values()), self.standard_tile_size)
         scale = self.standard_tile_size / first_size
 
-        # Création du masque sombre semi-transparent
-        light_mask = pygame.Surface(screen.get_size(), flags=pygame.SRCALPHA)
-        light_mask.fill((0, 0, 0, self.shadow_alpha))
+        # Masque sombre semi-transparent, en résolution réduite
+        compositor = self.light_compositor
+        light_mask = compositor.begin(screen.get_size(), self.shadow_alpha)
+        k = compositor.factor
 
         now = time.time()
         for lt in self.lights:
@@ -520,19 +554,11 @@ class Level:
                 # Effet de clignotement
                 phase = (now - lt["start_time"]) * 2
                 flick = base_r + math.sin(phase) * radius_var + (random.random() - 0.5) * 5
-                for r in range(int(flick), 0, -1):
-                    f = 1 - (r / flick)
-                    col = tuple(int(c * f) for c in lt["base_color"])
-                    a = int((1 - f) * self.shadow_alpha)
-                    pygame.draw.circle(light_mask, (*col, a), (bx, by), r)
+                LIGHT_SPRITES.draw(light_mask, (bx * k, by * k), flick * k, lt["base_color"], self.shadow_alpha)
             else:
                 # Lumière fixe
-                for r in range(int(base_r), 0, -1):
-                    f = 1 - (r / base_r)
-                    col = tuple(int(c * f) for c in lt["base_color"])
-                    a = int((1 - f) * self.shadow_alpha)
-                    pygame.draw.circle(light_mask, (*col, a), (bx, by), r)
+                LIGHT_SPRITES.draw(light_mask, (bx * k, by * k), base_r * k, lt["base_color"], self.shadow_alpha)
 
         # On applique le masque sur l'écran
-        screen.blit(light_mask, (0, 0))
+        compositor.composite(screen)
 
@@ -0,0 +1,143 @@
+import math
+from typing import Dict, List, Tuple
+
+import pygame
+
+
+# durée de validité (en pas de simulation) d'une ligne de vue mise en cache pour un couple d'entités
+LOS_CACHE_STEPS = 4
+# marge (pixels) autour du rayon : clipline travaille sur des coordonnées entières
+RAY_MARGIN = 1
+
+
+class RaycastService:
+    """
+    Requêtes de rayons du niveau, sur la grille de la phase large (Level.collision_grid).
+    Un rayon parcourt les cellules qu'il traverse (DDA) au lieu de tester tous les rectangles,
+    et s'arrête dès que le plus proche impact trouvé précède la cellule suivante.
+    Les résultats sont identiques à Raycast.cast sur Level.get_scaled_rects().
+    Les lignes de vue entre deux entités sont gardées LOS_CACHE_STEPS pas (voir `advance`).
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.step = 0
+        # (id(a), id(b)) -> (pas, version des collisions, visible)
+        self._sight: Dict[Tuple[int, int], Tuple[int, int, bool]] = {}
+
+    def advance(self):
+        """Un pas de simulation s'est écoulé (appelé par Game.step)."""
+        self.step += 1
+        if len(self._sight) > 1024:
+            self._sight.clear()
+
+    def cast(self, start, direction, max_distance: float) -> Tuple[pygame.math.Vector2 | None, pygame.Rect | None, float]:
+        """
+        Rayon depuis `start` dans la direction `direction` (normalisée ici), sur `max_distance` pixels.
+        Retourne (point de collision, rectangle touché, distance), ou (None, None, max_distance).
+        """
+        level = self.level
+        level._ensure_collisions()
+        direction = pygame.math.Vector2(direction)
+        if direction.length() == 0:
+            raise ValueError("La direction ne peut pas être le vecteur nul.")
+        direction = direction.normalize()
+        return self._cast(pygame.math.Vector2(start), direction, max_distance,
+                          level.collision_grid, level.scaled_rects)
+
+    def cast_many(self, rays) -> List[Tuple[pygame.math.Vector2 | None, pygame.Rect | None, float]]:
+        """Plusieurs rayons (start, direction, max_distance) en une requête."""
+        level = self.level
+        level._ensure_collisions()
+        grid, rects = level.collision_grid, level.scaled_rects
+        results = []
+        for start, direction, max_distance in rays:
+            direction = pygame.math.Vector2(direction)
+            if direction.length() == 0:
+                raise ValueError("La direction ne peut pas être le vecteur nul.")
+            results.append(self._cast(pygame.math.Vector2(start), direction.normalize(), max_distance, grid, rects))
+        return results
+
+    def line_of_sight(self, start, end) -> bool:
+        """True si aucun rectangle de collision ne coupe le segment [start, end]."""
+        to_end = pygame.math.Vector2(end) - pygame.math.Vector2(start)
+        distance = to_end.length()
+        if distance == 0:
+            return True
+        collision, _, _ = self.cast(start, to_end, distance)
+        return collision is None
+
+    def entity_line_of_sight(self, entity, target) -> bool:
+        """Ligne de vue entre les centres de deux entités, mise en cache quelques pas pour ce couple."""
+        key = (id(entity), id(target))
+        version = self.level.collision_version
+        cached = self._sight.get(key)
+        if cached is not None and cached[1] == version and self.step - cached[0] < LOS_CACHE_STEPS:
+            return cached[2]
+        visible = self.line_of_sight(entity.rect.center, target.rect.center)
+        self._sight[key] = (self.step, self.level.collision_version, visible)
+        return visible
+
+    def _cast(self, start, direction, max_distance, grid, rects):
+        end = start + direction * max_distance
+        cells = grid.cells
+        cs = grid.cell_size
+        sx, sy = start
+        dx, dy = direction
+
+        cx, cy = math.floor(sx / cs), math.floor(sy / cs)
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        t_delta_x = cs / abs(dx) if dx else math.inf
+        t_delta_y = cs / abs(dy) if dy else math.inf
+        t_max_x = ((cx + (dx > 0)) * cs - sx) / dx if dx else math.inf
+        t_max_y = ((cy + (dy > 0)) * cs - sy) / dy if dy else math.inf
+
+        tested = set()
+        # (distance, 0 si le départ est dans le rectangle, indice) : même priorité que Raycast.cast
+        best = None
+        best_point = None
+        t_enter = 0.0
+        while True:
+            t_exit = min(t_max_x, t_max_y, max_distance)
+            # cellules recouvertes par cette portion du rayon, élargie de RAY_MARGIN
+            x0, x1 = sorted((sx + dx * t_enter, sx + dx * t_exit))
+            y0, y1 = sorted((sy + dy * t_enter, sy + dy * t_exit))
+            for gy in range(math.floor((y0 - RAY_MARGIN) / cs), math.floor((y1 + RAY_MARGIN) / cs) + 1):
+                for gx in range(math.floor((x0 - RAY_MARGIN) / cs), math.floor((x1 + RAY_MARGIN) / cs) + 1):
+                    for index in cells.get((gx, gy), ()):
+                        if index in tested:
+                            continue
+                        tested.add(index)
+                        rect = rects[index]
+                        if rect.collidepoint(start):
+                            key = (0, 0, index)
+                            point = start
+                        else:
+                            clip = rect.clipline(start, end)
+                            if not clip:
+                                continue
+                            point = pygame.math.Vector2(clip[0])
+                            distance = point.distance_to(start)
+                            if distance >= max_distance:
+                                continue
+                            key = (distance, 1, index)
+                        if best is None or key < best:
+                            best, best_point = key, point
+
+            # aucun rectangle plus proche ne peut se trouver au-delà de cette cellule
+            if best is not None and best[0] < t_exit - 2 * RAY_MARGIN:
+                break
+            if t_exit >= max_distance:
+                break
+            t_enter = t_exit
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+
+        if best is None:
+            return None, None, max_distance
+        return best_point, rects[best[2]], best[0]
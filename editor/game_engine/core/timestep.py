@@ -0,0 +1,66 @@
+# nombre maximal de pas rattrapés en une image : au-delà le retard est abandonné
+# (sinon une image lente en provoque d'autres encore plus lentes)
+MAX_STEPS_PER_FRAME = 5
+# un déplacement plus grand entre deux pas est une téléportation : il n'est pas interpolé
+INTERPOLATION_SNAP = 128
+
+
+class StepClock:
+    """
+    Horloge vue par la simulation : même interface que pygame.time.Clock pour les composants
+    (Physics, EntityMovement, Camera...), mais get_time() rend toujours la durée d'un pas fixe.
+    """
+
+    def __init__(self, step_ms: float):
+        self.step_ms = step_ms
+
+    def get_time(self) -> float:
+        return self.step_ms
+
+    def get_rawtime(self) -> float:
+        return self.step_ms
+
+    def get_fps(self) -> float:
+        return 1000.0 / self.step_ms
+
+
+class FixedTimestep:
+    """
+    Accumulateur de pas fixe : le temps réel des images est accumulé puis consommé par pas
+    de `step_ms`. La simulation avance donc au même rythme quelle que soit la cadence d'affichage,
+    et `alpha` (fraction du pas suivant déjà écoulée) sert à interpoler le rendu entre les deux
+    derniers états.
+    """
+
+    def __init__(self, hz: float, max_steps: int = MAX_STEPS_PER_FRAME):
+        self.step_ms = 1000.0 / hz
+        self.max_steps = max_steps
+        self.clock = StepClock(self.step_ms)
+        self.accumulator = 0.0
+        self.steps = 0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, frame_ms: float) -> int:
+        """Ajoute la durée de l'image ; retourne le nombre de pas à simuler maintenant."""
+        self.accumulator += frame_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = self.step_ms * steps
+        self.accumulator -= steps * self.step_ms
+        self.steps += steps
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        return min(self.accumulator / self.step_ms, 1.0)
+
+
+def lerp_position(previous, current, alpha: float):
+    """Position interpolée entre deux pas (arrondie au pixel)."""
+    (px, py), (cx, cy) = previous, current
+    if abs(cx - px) > INTERPOLATION_SNAP or abs(cy - py) > INTERPOLATION_SNAP:
+        return cx, cy
+    return round(px + (cx - px) * alpha), round(py + (cy - py) * alpha)
@@ -1,10 +1,12 @@
 
 import pygame
 import sys
+from contextlib import contextmanager
 from editor.core.settings import SettingsManager
 from editor.game_engine.components.Camera import Camera
 from editor.game_engine import config
 from editor.game_engine.core.level import Level
+from editor.game_engine.core.timestep import FixedTimestep, lerp_position
 from editor.game_engine.entities.ennemis.frogger import Frogger
 from editor.game_engine.entities.players import Player
 
@@ -14,14 +16,19 @@ class Game:
     def __init__(self, screen,dataManager,TilePalette,clock,animation_manager,nm):
         self.running = False
         self.clock = clock
+        # la simulation avance par pas fixes ; les composants lisent la durée du pas sur step_clock
+        self.timestep = FixedTimestep(config.SIMULATION_HZ)
+        self.step_clock = self.timestep.clock
+        # positions (entités, caméra) au pas précédent, pour interpoler le rendu
+        self._previous = {}
         self.level = Level.from_data_manager(dataManager,TilePalette,animation_manager=animation_manager)
         self.camera = Camera(screen.get_width(), screen.get_height(), smooth_speed=0.1)
         self.enemies = []
         self.player = Player(config.SPRITESHEET_PATH, config.SPRITESHEET_COLORKEY, config.ANIMATION_PATH, 
-                             self.level, self.camera, self.clock,self.enemies,nm)
+                             self.level, self.camera, self.step_clock,self.enemies,nm)
         self.screen = screen
         # frogger = Frogger(
-        #     clock=self.clock,
+        #     clock=self.step_clock,
         #     camera=self.camera,
         #     level=self.level,
         #     player=self.player,
@@ -39,6 +46,47 @@ class Game:
             'can_fly': False
         }
 
+    def start(self, data_manager, tile_palette, animation_manager, settings: SettingsManager):
+        """
+        Lance une partie : reconstruit le niveau à partir des données de l'éditeur, place le joueur
+        sur le point d'apparition (settings.player_spawn_point) et exécute les événements on_start des graphes.
+        """
+        self.player.audio_manager.clear_sounds()
+        self.level = Level.from_data_manager(data_manager, tile_palette, animation_manager=animation_manager)
+        self.player.level = self.level
+        self.player.collisions.level = self.level
+        self.player.update_location_by_name(settings.player_spawn_point)
+        self.player.last_action_time = pygame.time.get_ticks()
+        self.level.draw_player = lambda s : self.player.draw(s)
+        for enemy in self.enemies:
+            enemy.level = self.level
+            enemy.collisions.level = self.level
+            enemy.AI.level = self.level
+        self.running = True
+        self.update_settings(settings)
+        self.player.movement.clear_forces()
+        self.player.health_system.health = self.player.health_system.max_health
+        self.level.shadow_alpha = settings.global_illum*255
+        self.level.reset_text()
+        for collision_rect in self.level.scaled_collision_rects:
+            if collision_rect.graph is not None:
+                collision_rect.graph._reset_flipflops()
+                collision_rect.graph._reset_once_nodes()
+                collision_rect.graph.clear_error()
+                start = collision_rect.graph.events.get("on_start")
+                if start:
+                    collision_rect.graph.run_logic_from_event(start)
+
+    def stop(self):
+        """Arrête la partie et exécute les événements on_end des graphes."""
+        self.player.audio_manager.clear_sounds()
+        self.running = False
+        for collision_rect in self.level.scaled_collision_rects:
+            if collision_rect.graph is not None:
+                end = collision_rect.graph.events.get("on_end")
+                if end:
+                    collision_rect.graph.run_logic_from_event(end)
+
     def handle_events(self,event):
         if not self.running:
             return
@@ -83,16 +131,46 @@ class Game:
         if settings.global_illum != self._applied_settings['global_illum']:
             self.level.shadow_alpha=settings.global_illum*255
             self._applied_settings['global_illum'] = settings.global_illum
+        self.level.light_compositor.scale = settings.light_resolution
 
     def update(self, settings : SettingsManager):
         if not self.running:
+            self.timestep.reset()
+            self._previous.clear()
             return
+        self.update_settings(settings)
+        for _ in range(self.timestep.advance(self.clock.get_time())):
+            self._snapshot()
+            self.step()
+
+    def step(self):
+        """Un pas de simulation (logique des graphes, joueur, ennemis, caméra), sans rendu."""
+        self.level.raycasts.advance()
         self.tick_execute()
         self.player.update()
-        self.update_settings(settings)
         for ennemi in self.enemies:
             ennemi.update()
-        self.camera.update(self.player.rect, self.screen,self.clock)
+        self.camera.update(self.player.rect, self.screen,self.step_clock)
+
+    def _snapshot(self):
+        self._previous = {id(entity.rect): entity.rect.topleft for entity in [self.player, *self.enemies]}
+        self._previous[id(self.camera.camera_rect)] = self.camera.camera_rect.topleft
+
+    @contextmanager
+    def _interpolated(self):
+        """Place le joueur, les ennemis et la caméra entre les deux derniers pas le temps du rendu."""
+        rects = [entity.rect for entity in [self.player, *self.enemies]] + [self.camera.camera_rect]
+        alpha = self.timestep.alpha
+        saved = [rect.topleft for rect in rects]
+        for rect in rects:
+            previous = self._previous.get(id(rect))
+            if previous is not None:
+                rect.topleft = lerp_position(previous, rect.topleft, alpha)
+        try:
+            yield
+        finally:
+            for rect, topleft in zip(rects, saved):
+                rect.topleft = topleft
 
     def tick_execute(self):
         for collision_rect in self.level.collision_rects:
@@ -107,16 +185,17 @@ class Game:
         if not self.running:
             return
         self.screen=screen
-        self.level.draw(self.screen, self.camera,self.clock)
-        for ennemi in self.enemies:
-            ennemi.draw(self.screen)
-        # self.player.draw(self.screen)
-        self.level.draw_lights(self.camera,self.screen)
-        
-        for emitter in self.level.vfx_emitters:
-            emitter.update(collision_rects=self.level.get_scaled_collision_rects(), player_rect=self.player.rect)
-            if getattr(self, "settings", None) is None or getattr(self.settings, "display_particles", True):
-                emitter.draw_in_game(self.screen, self.camera)
+        with self._interpolated():
+            self.level.draw(self.screen, self.camera,self.clock)
+            for ennemi in self.enemies:
+                ennemi.draw(self.screen)
+            # self.player.draw(self.screen)
+            self.level.draw_lights(self.camera,self.screen)
+
+            for emitter in self.level.vfx_emitters:
+                emitter.update(collision_rects=self.level.get_scaled_collision_rects(), player_rect=self.player.rect)
+                if getattr(self, "settings", None) is None or getattr(self.settings, "display_particles", True):
+                    emitter.draw_in_game(self.screen, self.camera)
             
         pygame.display.flip()
 
@@ -0,0 +1,197 @@
+"""
+Exécution du jeu sans affichage (pilote vidéo SDL "dummy") : tests de jeu automatisés et mesures
+de débit de la simulation, sur des machines Linux sans écran.
+
+    python -m editor.game_engine.headless niveau.json [autre.json ...] --steps 3600 --script entrees.json
+
+(à lancer depuis la racine du projet ; code de sortie non nul si un niveau échoue).
+
+Le niveau est chargé avec son graph (.lvg) comme dans l'éditeur, le joueur apparaît sur le point
+demandé (--spawn, sinon celui du niveau) puis la simulation avance par pas fixes, sans rendu,
+aussi vite que possible. Le script d'entrées est un fichier JSON :
+
+    {"inputs": [{"step": 0, "press": ["right"]}, {"step": 90, "release": ["right"], "press": ["space"]}]}
+
+(noms de touches pygame : "right", "space", "a"...).
+Les durées lues sur pygame.time.get_ticks (nœuds Delay, cadence des animations) restent en temps réel.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+
+import pygame
+
+
+class ScriptedKeys:
+    """État des touches maintenues piloté par un script (remplace pygame.key.get_pressed)."""
+
+    def __init__(self, inputs=()):
+        self.held = set()
+        # pas -> [(pressées, relâchées)]
+        self.timeline = {}
+        for entry in inputs:
+            press = [pygame.key.key_code(name) for name in entry.get("press", [])]
+            release = [pygame.key.key_code(name) for name in entry.get("release", [])]
+            self.timeline.setdefault(int(entry["step"]), []).append((press, release))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f).get("inputs", []))
+
+    def __call__(self):
+        return self
+
+    def __getitem__(self, key):
+        return key in self.held
+
+    def apply(self, step: int, input_handler):
+        """Envoie au joueur les appuis / relâchements prévus pour ce pas."""
+        for press, release in self.timeline.get(step, ()):
+            for key in release:
+                self.held.discard(key)
+                input_handler.handleInput(pygame.event.Event(pygame.KEYUP, key=key, mod=0))
+            for key in press:
+                self.held.add(key)
+                input_handler.handleInput(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0))
+
+
+class HeadlessSession:
+    """
+    Hôte minimal du jeu, à la place de LevelDesign : les données du niveau (DataManager, TilePalette,
+    animations, réglages), les notifications et le Game, sans fenêtre ni interface de l'éditeur.
+    Les graphs des niveaux y accèdent par les mêmes attributs que dans l'éditeur.
+    """
+    headless = True
+
+    def __init__(self, size=(900, 700)):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+        # surface d'écran factice : nécessaire aux convert() / convert_alpha() du chargement
+        self.screen = pygame.display.set_mode(size)
+
+        from editor.core.settings import SettingsManager
+        from editor.game_engine.game_manager import Game
+        from editor.services.save_loader import SaveLoadManager
+        from editor.ui.Notifications import NotificationManager
+
+        self.nm = NotificationManager()
+        self.settings = SettingsManager(self.screen, "./Assets/ui/settings_ui.json", self.nm)
+        self.clock = pygame.time.Clock()
+        self.saveLoadManager = SaveLoadManager(self.screen, self.nm)
+        self.level_loaded = False
+        self.game_engine = None
+        self.clear_cache()
+        self.game_engine = Game(self.screen, self.dataManager, self.tilePalette, self.clock, self.animations, self.nm)
+        self.settings.game_engine = self.game_engine
+        self.dataManager.game_engine = self.game_engine
+
+    def clear_cache(self):
+        """Données vierges (appelé par SaveLoadManager.load avant la lecture d'un niveau)."""
+        from editor.animations.animation import AnimationManager
+        from editor.core.data_manager import DataManager
+        from editor.core.history_manager import HistoryManager
+        from editor.render.tile_palette import TilePalette
+
+        if self.game_engine is not None:
+            self.game_engine.running = False
+        self.HistoryManager = HistoryManager(self.settings)
+        self.animations = AnimationManager(self.screen, self.nm, self.timelineClick)
+        self.dataManager = DataManager(self.HistoryManager, self.settings, self.animations)
+        self.tilePalette = TilePalette(self.screen, 1, 0.25)
+        self.settings.dataManager = self.dataManager
+        self.settings.game_engine = self.game_engine
+        self.dataManager.game_engine = self.game_engine
+        # un niveau sans point d'apparition ne doit pas hériter de celui du niveau précédent
+        self.settings.player_spawn_point = None
+
+    def timelineClick(self):
+        self.dataManager.selectedElement = None
+
+    def load(self, path) -> bool:
+        self.level_loaded = False
+        self.saveLoadManager.load(self, path)
+        return self.level_loaded
+
+    def start(self, spawn=None):
+        if spawn:
+            self.settings.player_spawn_point = spawn
+        spawn = self.settings.player_spawn_point
+        if not spawn:
+            raise ValueError("aucun point d'apparition (--spawn)")
+        # Level.get_location_by_name retomberait silencieusement sur une position par défaut
+        if self.dataManager.getElementByName("locationPoints", spawn) is None:
+            names = ", ".join(point.name for point in self.dataManager.locationPoints) or "aucun"
+            raise ValueError(f"point d'apparition inconnu : {spawn!r} (points du niveau : {names})")
+        self.game_engine.start(self.dataManager, self.tilePalette, self.animations, self.settings)
+
+    def run(self, steps: int, keys: ScriptedKeys = None) -> dict:
+        """Avance la simulation de `steps` pas fixes, sans rendu ; retourne le rapport de la partie."""
+        game = self.game_engine
+        keys = keys or ScriptedKeys()
+        game.player.input_handler.key_state = keys
+        game.update_settings(self.settings)
+        done = 0
+        start = time.perf_counter()
+        while done < steps and game.running:
+            keys.apply(done, game.player.input_handler)
+            game.step()
+            done += 1
+        elapsed = time.perf_counter() - start
+        return {
+            "steps": done,
+            "seconds": elapsed,
+            "steps_per_second": done / elapsed if elapsed > 0 else float("inf"),
+            "simulated_seconds": done * game.timestep.step_ms / 1000.0,
+            "player": tuple(game.player.rect.topleft),
+            "health": game.player.health_system.health,
+            "on_ground": game.player.collisions.OnGround(),
+        }
+
+    def close(self):
+        if self.game_engine.running:
+            self.game_engine.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Exécute des niveaux sans affichage et mesure la simulation.")
+    parser.add_argument("levels", nargs="+", help="niveaux .json (le graph .lvg est trouvé à côté)")
+    parser.add_argument("--steps", type=int, default=3600, help="nombre de pas simulés par niveau")
+    parser.add_argument("--spawn", default=None, help="point d'apparition (par défaut celui du niveau)")
+    parser.add_argument("--script", default=None, help="script d'entrées JSON")
+    args = parser.parse_args(argv)
+
+    levels = [os.path.abspath(path) for path in args.levels]
+    script = os.path.abspath(args.script) if args.script else None
+    # les chemins des ressources du moteur sont relatifs à la racine du projet
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+    session = HeadlessSession()
+    failures = 0
+    for path in levels:
+        try:
+            if not session.load(path):
+                raise RuntimeError("chargement impossible")
+            session.start(args.spawn)
+            keys = ScriptedKeys.from_file(script) if script else ScriptedKeys()
+            report = session.run(args.steps, keys)
+            session.close()
+        except Exception as e:
+            failures += 1
+            print(f"[Headless] ÉCHEC {path}: {e}")
+            traceback.print_exc()
+            continue
+        print(f"[Headless] {os.path.basename(path)}: {report['steps']} pas "
+              f"({report['simulated_seconds']:.1f} s simulées) en {report['seconds']:.2f} s, "
+              f"{report['steps_per_second']:.0f} pas/s, joueur {report['player']}, "
+              f"vie {report['health']}, au sol {report['on_ground']}")
+    pygame.quit()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
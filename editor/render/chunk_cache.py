@@ -0,0 +1,150 @@
+from collections import OrderedDict
+
+import math
+import time
+
+import pygame
+
+from editor.core.utils import CHUNK_SIZE, TileChunk
+
+
+# budget mémoire des surfaces de blocs pré-rendues (octets, 4 octets par pixel)
+CHUNK_CACHE_BYTES = 192 * 1024 * 1024
+# au-delà (fort zoom), une surface de bloc serait trop grande : on dessine case par case
+# (un bloc plein de 1024 px fait 4 Mo ; les surfaces sont en plus limitées aux cases posées)
+MAX_CHUNK_SURFACE_PX = 1024
+
+
+class ChunkSurfaceCache:
+    """
+    Surfaces pré-rendues des blocs de calque (CHUNK_SIZE x CHUNK_SIZE cases), par taille de case.
+    Un bloc n'est re-rendu que si sa révision change (une de ses cases a été modifiée) ;
+    les surfaces les moins récemment affichées sont libérées au-delà de `max_bytes`.
+    Un bloc absent (nouveau zoom, bloc modifié) n'est pas rendu pendant l'image : `get` le met
+    en attente et l'appelant le dessine case par case, puis `warm` le rend entre deux images.
+    Une surface ne couvre que la boîte englobante des cases posées du bloc. Les blocs affichés
+    pendant l'image ne sont jamais libérés ; un bloc qui ne tiendrait plus dans le budget à côté
+    d'eux n'est pas mis en attente et reste dessiné case par case.
+    """
+
+    def __init__(self, get_code_surface, max_bytes: int = CHUNK_CACHE_BYTES):
+        # get_code_surface(code, alpha) -> Surface | None, à la taille de case courante
+        self.get_code_surface = get_code_surface
+        self.max_bytes = max_bytes
+        # (taille de case, calque, cx, cy) -> (bloc, révision, surface, décalage de la surface dans le bloc)
+        self.entries: OrderedDict = OrderedDict()
+        # blocs de l'image en cours à rendre : clé -> bloc
+        self.pending = {}
+        self.bytes = 0
+        # clés affichées ou mises en attente pendant l'image en cours, et leur taille (octets)
+        self.visible = set()
+        self.visible_bytes = 0
+        self.cell_size = None
+        self.generation = None
+
+    @staticmethod
+    def fits(cell_size) -> bool:
+        return CHUNK_SIZE * cell_size <= MAX_CHUNK_SURFACE_PX
+
+    def clear(self):
+        self.entries.clear()
+        self.pending.clear()
+        self.visible.clear()
+        self.bytes = 0
+        self.visible_bytes = 0
+
+    def configure(self, cell_size: float, generation):
+        """
+        Début d'image, à la taille de case (zoom) courante ; un changement de tilesets invalide tout le cache.
+        Les blocs en attente sont ceux de l'image précédente : `get` remet en attente ceux encore visibles.
+        """
+        if generation != self.generation:
+            self.clear()
+            self.generation = generation
+        self.cell_size = cell_size
+        self.pending.clear()
+        self.visible.clear()
+        self.visible_bytes = 0
+
+    def get(self, layer_index: int, chunk: TileChunk):
+        """
+        (surface, décalage) du bloc à la taille courante, ou None s'il n'est pas (encore) rendu.
+        Le décalage (pixels) place la surface par rapport au coin du bloc.
+        """
+        key = (self.cell_size, layer_index, chunk.cx, chunk.cy)
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] is chunk and entry[1] == chunk.revision:
+                self.entries.move_to_end(key)
+                if key not in self.visible:
+                    self.visible.add(key)
+                    self.visible_bytes += self._size(entry[2])
+                return entry[2], entry[3]
+            self._drop(key)
+        if chunk.count and key not in self.visible:
+            size = self._estimate(chunk)
+            if self.visible_bytes + size > self.max_bytes:
+                return None  # ne tiendrait pas avec les blocs déjà affichés : case par case
+            self.pending[key] = chunk
+            self.visible.add(key)
+            self.visible_bytes += size
+        return None
+
+    def warm(self, budget_s: float = 0.004) -> bool:
+        """Rend les blocs en attente dans la limite de `budget_s` secondes. Retourne True quand tout est prêt."""
+        deadline = time.perf_counter() + budget_s
+        while self.pending:
+            key = next(iter(self.pending))
+            chunk = self.pending.pop(key)
+            if chunk.count:
+                self._store(key, chunk, *self._render(chunk))
+            if time.perf_counter() > deadline:
+                return not self.pending
+        return True
+
+    def _store(self, key, chunk: TileChunk, surface: pygame.Surface, offset):
+        if key in self.entries:
+            self._drop(key)
+        self.entries[key] = (chunk, chunk.revision, surface, offset)
+        self.bytes += self._size(surface)
+        # les plus anciennes d'abord ; les blocs de l'image en cours (en fin de liste) restent
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            if oldest in self.visible:
+                break
+            self._drop(oldest)
+
+    def _drop(self, key):
+        surface = self.entries.pop(key)[2]
+        self.bytes -= self._size(surface)
+
+    @staticmethod
+    def _size(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * 4
+
+    def _extent(self, chunk: TileChunk):
+        """(décalage x, décalage y, largeur, hauteur) en pixels de la boîte des cases posées du bloc."""
+        cell = self.cell_size
+        bbox = chunk.bbox
+        bx, by = bbox.x - chunk.cx * CHUNK_SIZE, bbox.y - chunk.cy * CHUNK_SIZE
+        # +1 : arrondi des positions de case pour un zoom fractionnaire
+        return (round(bx * cell), round(by * cell),
+                math.ceil(bbox.width * cell) + 1, math.ceil(bbox.height * cell) + 1)
+
+    def _estimate(self, chunk: TileChunk) -> int:
+        _, _, width, height = self._extent(chunk)
+        return width * height * 4
+
+    def _render(self, chunk: TileChunk):
+        cell = self.cell_size
+        ox, oy, width, height = self._extent(chunk)
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        x0, y0 = chunk.cx * CHUNK_SIZE, chunk.cy * CHUNK_SIZE
+        blits = []
+        for x, y, code in chunk.items():
+            tile_surface = self.get_code_surface(code, 255)
+            if tile_surface is not None:
+                # même arrondi que ViewPort.GetTileRectFromRelative pour un zoom fractionnaire
+                blits.append((tile_surface, (round((x - x0) * cell) - ox, round((y - y0) * cell) - oy)))
+        surface.blits(blits, doreturn=False)
+        return surface, (ox, oy)
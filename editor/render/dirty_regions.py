@@ -0,0 +1,134 @@
+import pygame
+
+
+class DirtyRegions:
+    """
+    Zones de l'écran modifiées depuis la dernière présentation.
+    L'éditeur continue à composer l'image complète, mais seuls les rectangles signalés
+    (`mark`, `track`) sont envoyés à l'écran avec pygame.display.update(rects).
+    - toute entrée autre qu'un mouvement de souris (clic, touche, molette, redimensionnement) : tout l'écran ;
+    - mouvement de souris : les zones d'interface survolées avant et après (effets de survol) ;
+    - contenus animés : chaque gestionnaire signale ses propres zones (`markDirty` / `mark_dirty`).
+    `present` indique si l'image contenait une activité (entrée, animation) ; les zones suivies
+    en mode passif (compteurs FPS) n'en sont pas une, sinon l'éditeur ne serait jamais au repos.
+    """
+
+    # au-delà de cette part de l'écran, un flip complet coûte moins cher qu'une liste de rectangles
+    FULL_RATIO = 0.6
+    # au-delà de ce nombre de rectangles, ils sont regroupés sur une grille de COALESCE_CELL pixels
+    MAX_RECTS = 48
+    COALESCE_CELL = 64
+
+    def __init__(self, screen: pygame.Surface):
+        self.screen = screen
+        self.rects: list[pygame.Rect] = []
+        self.full = True
+        self.active = True
+        # clé -> (rect, état) signalés à la présentation précédente
+        self.states = {}
+
+    def markAll(self):
+        self.full = True
+        self.active = True
+
+    def mark(self, *rects):
+        if any(rect is not None for rect in rects):
+            self.active = True
+        self._add(rects)
+
+    def _add(self, rects):
+        if self.full:
+            return
+        bounds = self.screen.get_rect()
+        for rect in rects:
+            if rect is None:
+                continue
+            rect = pygame.Rect(rect).clip(bounds)
+            if rect.w and rect.h and rect not in self.rects:
+                self.rects.append(rect)
+
+    def track(self, key, rect, state=None, passive=False):
+        """
+        Signale `rect` (et son ancienne position) quand la zone ou son état changent d'une image à l'autre.
+        passive=True : le changement est affiché sans compter comme une activité (voir `present`).
+        """
+        rect = pygame.Rect(rect) if rect is not None else None
+        previous = self.states.get(key)
+        if previous == (rect, state):
+            return
+        changed = (previous[0] if previous is not None else None, rect)
+        if passive:
+            self._add(changed)
+        else:
+            self.mark(*changed)
+        if rect is None:
+            self.states.pop(key, None)
+        else:
+            self.states[key] = (rect, state)
+
+    def markMenu(self, menu):
+        """Menu déroulant (MenuButton) : son panneau, animé et survolé, est rafraîchi tant qu'il est ouvert."""
+        dropdown = menu.dropdown
+        panel = dropdown.panel_rect if dropdown.is_open else None
+        self.track(("menu", id(menu)), panel)
+        if panel is not None:
+            self.mark(panel)
+
+    def noteEvent(self, event, regions, tracked=()):
+        """
+        Entrée utilisateur. `regions` : zones d'interface rafraîchies en entier quand la souris les survole ;
+        `tracked` : zones dont le propriétaire suit lui-même ce qui dépend du curseur (aperçu du viewport).
+        """
+        if event.type != pygame.MOUSEMOTION or any(event.buttons):
+            self.markAll()
+            return
+        previous = (event.pos[0] - event.rel[0], event.pos[1] - event.rel[1])
+        for pos in (event.pos, previous):
+            hit = False
+            for region in regions:
+                if region.collidepoint(pos):
+                    self.mark(region)
+                    hit = True
+            if not hit and not any(area.collidepoint(pos) for area in tracked):
+                self.markAll()
+                return
+
+    def _coalesce(self):
+        """Regroupe de nombreux petits rectangles en bandes horizontales de cellules de grille."""
+        cell = self.COALESCE_CELL
+        cells = set()
+        for rect in self.rects:
+            for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+                for cx in range(rect.left // cell, (rect.right - 1) // cell + 1):
+                    cells.add((cy, cx))
+        bounds = self.screen.get_rect()
+        merged = []
+        run = None
+        for cy, cx in sorted(cells):
+            if run is not None and run[0] == cy and run[2] == cx:
+                run[2] = cx + 1
+                continue
+            if run is not None:
+                merged.append(pygame.Rect(run[1] * cell, run[0] * cell, (run[2] - run[1]) * cell, cell).clip(bounds))
+            run = [cy, cx, cx + 1]
+        if run is not None:
+            merged.append(pygame.Rect(run[1] * cell, run[0] * cell, (run[2] - run[1]) * cell, cell).clip(bounds))
+        self.rects = merged
+
+    def present(self) -> bool:
+        """Envoie les zones à l'écran ; retourne True si l'image contenait une activité."""
+        active = self.active
+        if not self.full:
+            if len(self.rects) > self.MAX_RECTS:
+                self._coalesce()
+            area = sum(rect.w * rect.h for rect in self.rects)
+            screen_w, screen_h = self.screen.get_size()
+            self.full = area > self.FULL_RATIO * screen_w * screen_h
+        if self.full:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full = False
+        self.active = False
+        return active
@@ -1,24 +1,31 @@
 import json
+import math
 from pathlib import Path
+import time
 import traceback
 from typing import List
 import pygame
 from editor.animations.animation import AnimationManager
+from editor.core.asset_manager import AssetManager
 from editor.game_engine.game_manager import Game
+from editor.render.chunk_cache import ChunkSurfaceCache
+from editor.render.lod_cache import ChunkThumbnailCache
 from editor.render.parallax import ParallaxBackground
+from editor.render.tile_cache import ZoomTileCache
 from editor.services.update_handler import UpdateAndCrashHandler
 from editor.ui.CheckBox import Checkbox
 from editor.ui.ColorButton import ColorButton
 from editor.ui.DropDownMenu import MenuButton
 from editor.ui.Font import FontManager
 from editor.ui.ImageButton import ImageButton
+from editor.ui.Label import Label
 from editor.ui.Notifications import NotificationManager
-from editor.core.settings import SettingsManager
+from editor.core.settings import Section, SettingsManager
 from editor.core.data_manager import DataManager, Tile,Tools
 from editor.render.tile_palette import TilePalette
 from editor.ui.Slider import Slider
 from editor.ui.TextButton import Button
-from editor.core.utils import CollisionRect, Light
+from editor.core.utils import CHUNK_SIZE, CollisionRect, Light, LightCompositor, encode_tile, unpack_tile
 from editor.render.viewport import ViewPort
 from editor.vfx.vfx import ParticleEmitter
 
@@ -26,9 +33,8 @@ class DrawManager:
     def __init__(self, screen: pygame.surface.Surface,update: UpdateAndCrashHandler,nm : NotificationManager,settings : SettingsManager):
         self.screen=screen
         self.viewport=pygame.surface.Surface((self.screen.get_width() - 250,self.screen.get_height()-30))
-        self.light_mask = pygame.Surface((self.screen.get_width() - 250,self.screen.get_height()-30), flags=pygame.SRCALPHA)
+        self.light_compositor = LightCompositor()
         self.shadow_alpha=0
-        self.light_mask.fill((0,0,0,self.shadow_alpha))
         self.viewportRect = self.viewport.get_rect()
         self.viewportRect.top = 30
         self.TilePalette=pygame.surface.Surface((210, 230))
@@ -38,7 +44,23 @@ class DrawManager:
         self.TilePreview=False
         self.PaletteSelectionPreview=False
         self.viewportSelectionPreview=False
-        self.tile_cache = {}
+        self.tile_cache = ZoomTileCache(self.buildBaseSurface, self.finishCodeSurface)
+        self.chunk_cache = ChunkSurfaceCache(self.getCodeSurface)
+        self.lod_cache = ChunkThumbnailCache(self.buildBaseSurface)
+        self.counter_rects = []
+        self.animated_rects = []
+        self.animated_tile_rects = []
+        self.previous_tile_rects = []
+        self.update_tag_rect = None
+        self.update_tag_label: Label | None = None
+        # copie du panneau latéral et de la barre du haut, recomposés seulement quand leur zone change
+        self.panel_cache = []
+        self.panel_key = None
+        # état de la palette au dernier rendu de sa surface (TilePalette)
+        self.palette_key = None
+        # DirtyRegions de l'image en cours (None : tout est recomposé)
+        self.dirty = None
+        self.tip_labels = {}
         self.update=update
         self.nm=nm
         self.settings=settings
@@ -58,16 +80,19 @@ class DrawManager:
 
     def loadAssets(self,actions):
         self.actions=actions
-        self.bar = pygame.image.load('./Assets/ui/travaux.png')
-        self.bar = pygame.transform.scale(self.bar, (self.screen.get_width(), 17))
+        self.bar = pygame.transform.scale(AssetManager().load('./Assets/ui/travaux.png'), (self.screen.get_width(), 17))
         self.font = self.font_manager.get(size=26)
-        self.layerText=self.font.render("Layer: 0", True, (255, 255, 255))
-        self.GlobalIllumination=self.font.render("Global Illumination", True, (255, 255, 255))
-        self.MapText=self.font.render("Map:", True, (255, 255, 255))
-        self.collisionsText=self.font.render("Références", True, (255, 255, 255))
-        self.NameText=self.font.render("Name: ", True, (255, 255, 255))
-        self.TypeText=self.font.render("Type: ", True, (255, 255, 255))
-        self.ColorText=self.font.render("Color: ", True, (255, 255, 255))
+        # textes retenus : rastérisés uniquement quand leur valeur change
+        self.layerText=Label("Layer: 0", self.font)
+        self.GlobalIllumination=Label("Global Illumination", self.font)
+        self.MapText=Label("Map:", self.font)
+        self.collisionsText=Label("Références", self.font)
+        self.NameText=Label("Name: ", self.font)
+        self.TypeText=Label("Type: ", self.font)
+        self.ColorText=Label("Color: ", self.font)
+        self.ScaleText=Label("", self.font)
+        self.fpsText=Label("", self.fps_font, self.fps_color)
+        self.drawnText=Label("", self.fps_font, self.fps_color)
         self.slider = Slider(rect=(self.screen.get_width() - 220, 70, 185, 13), 
                              min_value=0, max_value=1, initial_value=1,
                              progress_color=(109, 132, 165),bar_color=(83, 89, 98))
@@ -76,20 +101,20 @@ class DrawManager:
                                    progress_color=(109, 132, 165), bar_color=(83, 89, 98))
         self.playButton=Checkbox(rect=(450, 0, 89, 29),checked_image_path="./Assets/ui/icones/stop.png",unchecked_image_path="./Assets/ui/icones/play.png",action=self.actions.get("play"))
         self.colorPick=ColorButton(rect=(self.screen.get_width() - 70, 195, 40, 20),initial_color=(255, 0, 0),action=self.actions.get("editColor"))
-        self.locationPointImage=pygame.image.load('./Assets/ui/LocationPoint.png')
-        self.locationPointImageFlag=pygame.image.load('./Assets/ui/LocationPoint_flag.png')
-        self.DottedlocationPointImage=pygame.image.load('./Assets/ui/DottedLocationPoint.png')
-        self.DottedlocationPointImageFlag=pygame.image.load('./Assets/ui/DottedLocationPoint_flag.png')
+        self.locationPointImage=AssetManager().load('./Assets/ui/LocationPoint.png')
+        self.locationPointImageFlag=AssetManager().load('./Assets/ui/LocationPoint_flag.png')
+        self.DottedlocationPointImage=AssetManager().load('./Assets/ui/DottedLocationPoint.png')
+        self.DottedlocationPointImageFlag=AssetManager().load('./Assets/ui/DottedLocationPoint_flag.png')
         self.load_buttons("./Asset/ui/ui.json")
         self.UpdateRect()
 
 
     def updateLayerText(self,layer):
-        self.layerText=self.font.render(f"Layer: {layer}", True, (255, 255, 255))
+        self.layerText.set(f"Layer: {layer}")
     
     def updateMapText(self,map):
         if map:
-            self.MapText=self.font.render(f"Map: {map.name}", True, (255, 255, 255))
+            self.MapText.set(f"Map: {map.name}")
 
     def load_buttons(self,json_file):
         try:
@@ -144,8 +169,9 @@ class DrawManager:
                         )
                     )
 
-    def draw(self,viewport: ViewPort,dataManager: DataManager,tilePalette: TilePalette,animation: AnimationManager,clock,game_engine : Game):
+    def draw(self,viewport: ViewPort,dataManager: DataManager,tilePalette: TilePalette,animation: AnimationManager,clock,game_engine : Game,dirty=None):
         self.game_engine=game_engine
+        self.dirty=dirty
         self.tilePaletteData=tilePalette
         self.activeTileMap=self.tilePaletteData.GetCurrentTileMap()
         self.viewportData=viewport
@@ -154,6 +180,7 @@ class DrawManager:
         self.animation=animation
         self.shadow_alpha=self.settings.global_illum*255
         self.drawn=0
+        self.animated_rects = []
         self.fps=clock.get_fps()
         self.updateMapText(self.tilePaletteData.GetCurrentTileMap())
         self.UpdateCollisionText()
@@ -188,18 +215,14 @@ class DrawManager:
                 tooltip_x = graph_button.rect.x - tooltip_w - 10
                 tooltip_y = graph_button.rect.y - 20
                 tooltip_rect = pygame.Rect(tooltip_x, tooltip_y, tooltip_w, tooltip_h)
+                self.animated_rects += [graph_button.rect.inflate(6, 6), tooltip_rect]
                 
                 pygame.draw.rect(self.screen, (10, 11, 16), tooltip_rect, border_radius=8)
                 pygame.draw.rect(self.screen, (0, 175, 240), tooltip_rect, width=2, border_radius=8)
                 
-                tip_font = self.font_manager.get(size=18)
-                line1 = tip_font.render("Nouveau VFX placé !", True, (245, 185, 45))
-                line2 = tip_font.render("Cliquez sur l'icône de rouage", True, (255, 255, 255))
-                line3 = tip_font.render("ci-contre pour le configurer.", True, (255, 255, 255))
-                
-                self.screen.blit(line1, (tooltip_x + 15, tooltip_y + 12))
-                self.screen.blit(line2, (tooltip_x + 15, tooltip_y + 38))
-                self.screen.blit(line3, (tooltip_x + 15, tooltip_y + 64))
+                self.tipLabel("Nouveau VFX placé !", (245, 185, 45)).draw(self.screen, (tooltip_x + 15, tooltip_y + 12))
+                self.tipLabel("Cliquez sur l'icône de rouage").draw(self.screen, (tooltip_x + 15, tooltip_y + 38))
+                self.tipLabel("ci-contre pour le configurer.").draw(self.screen, (tooltip_x + 15, tooltip_y + 64))
 
         if getattr(self.dataManager, "show_collision_placement_tip", False) and self.dataManager.selectedElement and isinstance(self.dataManager.selectedElement, CollisionRect):
             graph_button = None
@@ -217,27 +240,99 @@ class DrawManager:
                 tooltip_x = graph_button.rect.x - tooltip_w - 10
                 tooltip_y = graph_button.rect.y - 20
                 tooltip_rect = pygame.Rect(tooltip_x, tooltip_y, tooltip_w, tooltip_h)
+                self.animated_rects += [graph_button.rect.inflate(6, 6), tooltip_rect]
                 
                 pygame.draw.rect(self.screen, (10, 11, 16), tooltip_rect, border_radius=8)
                 pygame.draw.rect(self.screen, (180, 80, 220), tooltip_rect, width=2, border_radius=8) # Purple border for Nodal
                 
-                tip_font = self.font_manager.get(size=18)
-                line1 = tip_font.render("Zone de collision placée !", True, (245, 185, 45))
-                line2 = tip_font.render("Cliquez sur l'icône de rouage", True, (255, 255, 255))
-                line3 = tip_font.render("ci-contre pour la scripter.", True, (255, 255, 255))
-                
-                self.screen.blit(line1, (tooltip_x + 15, tooltip_y + 12))
-                self.screen.blit(line2, (tooltip_x + 15, tooltip_y + 38))
-                self.screen.blit(line3, (tooltip_x + 15, tooltip_y + 64))
+                self.tipLabel("Zone de collision placée !", (245, 185, 45)).draw(self.screen, (tooltip_x + 15, tooltip_y + 12))
+                self.tipLabel("Cliquez sur l'icône de rouage").draw(self.screen, (tooltip_x + 15, tooltip_y + 38))
+                self.tipLabel("ci-contre pour la scripter.").draw(self.screen, (tooltip_x + 15, tooltip_y + 64))
 
 
+    def tipLabel(self, text, color=(255, 255, 255)) -> Label:
+        """Ligne d'astuce, rastérisée une seule fois."""
+        label = self.tip_labels.get((text, color))
+        if label is None:
+            label = self.tip_labels[(text, color)] = Label(text, self.font_manager.get(size=18), color)
+        return label
+
     def drawFps(self):
+        self.counter_rects = []
         if self.settings.fps:
-            fps_surf = self.fps_font.render(f"{self.fps:.0f} FPS", True, self.fps_color)
-            self.screen.blit(fps_surf, (self.screen.get_width() - fps_surf.get_width() - 20, self.fps_margin))
+            self.fpsText.set(f"{self.fps:.0f} FPS")
+            self.counter_rects.append(self.fpsText.draw(self.screen, (self.screen.get_width() - self.fpsText.get_width() - 20, self.fps_margin)))
         if self.settings.drawn:
-            drawn_surf = self.fps_font.render(f"{self.drawn} tiles", True, self.fps_color)
-            self.screen.blit(drawn_surf, (self.screen.get_width() - drawn_surf.get_width() - 180, self.fps_margin))
+            self.drawnText.set(f"{self.drawn} tiles")
+            self.counter_rects.append(self.drawnText.draw(self.screen, (self.screen.get_width() - self.drawnText.get_width() - 180, self.fps_margin)))
+
+    # ----- présentation partielle (voir DirtyRegions) -----
+    def hoverRegions(self, viewport: ViewPort, animation: AnimationManager):
+        """
+        (zones d'interface à rafraîchir en entier quand la souris les survole,
+         zones dont l'aperçu sous le curseur est suivi par markDirty).
+        """
+        screen_w, screen_h = self.screen.get_size()
+        regions = [pygame.Rect(0, 0, screen_w - 250, 30), pygame.Rect(screen_w - 250, 0, 250, screen_h)]
+        if self.settings.active_section != Section.HIDDEN:
+            regions.append(self.settings.panel_rect)
+        anim = animation.get_current_anim()
+        if anim:
+            regions.append(anim.timeline.rect)
+        tracked = [self.viewportRect] if viewport.isInteractionAllowed() else []
+        return regions, tracked
+
+    def animatedViewportRects(self):
+        """Zones écran du viewport qui changent d'une image à l'autre sans entrée utilisateur."""
+        if self.viewportData.light_preview:
+            return [self.viewportRect]
+        if self.settings.display_particles and any(emitter.particles for emitter in self.dataManager.emitters):
+            return [self.viewportRect]
+        # tuiles animées en lecture : position actuelle et précédente (plateformes mobiles)
+        rects = [rect.move(self.viewportRect.topleft).clip(self.viewportRect)
+                 for rect in self.animated_tile_rects + self.previous_tile_rects]
+        self.previous_tile_rects = self.animated_tile_rects
+        if self.settings.display_lights and self.viewportData.displayRect:
+            zoom = self.viewportData.zoom
+            for light in self.dataManager.elementsInRect("lights", self.viewportData.visibleMapRect(margin=64)):
+                if light.blink:
+                    # rayon scintillant : sinus de amplitude radius_var plus un bruit de +/- 2.5 px
+                    radius = int(light.radius * zoom) + light.radius_var + 4
+                    cx, cy = light.get_screen_pos(self.viewportData.panningOffset, zoom)
+                    rects.append(pygame.Rect(cx - radius, cy - radius, 2 * radius, 2 * radius).clip(self.viewportRect))
+        return rects
+
+    def previewRect(self):
+        """Zone écran de l'aperçu qui suit le curseur (tuiles à poser ou gomme), ou None."""
+        if not (self.TilePreview and self.activeTileMap):
+            return None
+        if self.dataManager.currentTool == Tools.Draw and self.dataManager.currentTiles:
+            rect = None
+            for tile in self.dataManager.currentTiles:
+                tile_rect = self.viewportData.GetTileRectFromRelative(tile.x, tile.y)
+                rect = tile_rect if rect is None else rect.union(tile_rect)
+        elif self.dataManager.currentTool == Tools.Rubber:
+            rect = self.viewportData.GetTileRectFromRelative(*self.viewportData.toGrid(pygame.mouse.get_pos()))
+        else:
+            return None
+        return rect.move(self.viewportRect.topleft).clip(self.viewportRect)
+
+    def markDirty(self, dirty):
+        """Signale à `dirty` ce qui change à l'écran sans entrée utilisateur."""
+        if self.game_engine.running or self.colorPick.picker_visible:
+            dirty.markAll()
+            return
+        if self.activeTileMap:
+            dirty.mark(*self.animatedViewportRects())
+        dirty.mark(*self.animated_rects)
+        # la vérification de mise à jour tourne dans un thread : le badge peut apparaître à tout moment
+        dirty.track("update_tag", self.update_tag_rect)
+        dirty.track("preview", self.previewRect())
+        counters = self.counter_rects[0].unionall(self.counter_rects[1:]) if self.counter_rects else None
+        dirty.track("counters", counters, (self.fps if self.settings.fps else None, self.drawn), passive=True)
+        for button in self.buttons:
+            if isinstance(button, MenuButton):
+                dirty.markMenu(button)
 
     def draw_update_tag(self):
         if not self.update.need_update:
@@ -247,16 +342,15 @@ class DrawManager:
         screen_width = self.screen.get_width()
         screen_height = self.screen.get_height()
 
-        font_small = self.font_manager.get(size=14)
-        text_color = (255, 255, 255)
         orange_main = (200, 100, 20)
 
-        label = f"MISE À JOUR : v{self.update.new_version}"
-        text_surf = font_small.render(label, True, text_color)
+        if self.update_tag_label is None:
+            self.update_tag_label = Label(font=self.font_manager.get(size=14))
+        self.update_tag_label.set(f"MISE À JOUR : v{self.update.new_version}")
         padding_x = 15
         padding_y = 6
-        rect_w = text_surf.get_width() + padding_x * 2 + 10
-        rect_h = text_surf.get_height() + padding_y * 2
+        rect_w = self.update_tag_label.get_width() + padding_x * 2 + 10
+        rect_h = self.update_tag_label.get_height() + padding_y * 2
         
         x = (screen_width - sidebar_width) + (sidebar_width // 2) - (rect_w // 2)
         y = screen_height - rect_h - 10
@@ -265,7 +359,7 @@ class DrawManager:
         pygame.draw.rect(self.screen, orange_main, badge_rect, border_radius=15)
         icon_center = (x + padding_x, y + rect_h // 2)
         pygame.draw.circle(self.screen, (255, 230, 100), icon_center, 3)
-        self.screen.blit(text_surf, (x + padding_x + 12, y + padding_y))
+        self.update_tag_label.draw(self.screen, (x + padding_x + 12, y + padding_y))
         return badge_rect
 
     def drawLight(self):
@@ -276,28 +370,29 @@ class DrawManager:
             pygame.draw.circle(self.screen, (255, 255, 0), (ox, oy), radius, 2)
         
     def UpdateCollisionText(self):
-        if self.dataManager.selectedElement:
-            if isinstance(self.dataManager.selectedElement, Light):
-                self.TypeText=self.font.render(f"Blink", True, (255, 255, 255))
-                self.NameText=self.font.render(f"Radius: {round(self.dataManager.selectedElement.radius,1)}", True, (255, 255, 255))
-                self.ColorText=self.font.render("Color: ", True, (255, 255, 255))
-                self.colorPick.color=self.dataManager.selectedElement.color
-            elif isinstance(self.dataManager.selectedElement, ParticleEmitter):
-                self.NameText=self.font.render("", True, (255, 255, 255))
-                self.TypeText=self.font.render(f"Type: VFX ({self.dataManager.selectedElement.name})", True, (255, 255, 255))
-                self.ColorText=self.font.render("Color: ", True, (255, 255, 255))
-                self.colorPick.color=self.dataManager.selectedElement.color_start
+        selected = self.dataManager.selectedElement
+        if selected:
+            if isinstance(selected, Light):
+                self.TypeText.set("Blink")
+                self.NameText.set(f"Radius: {round(selected.radius,1)}")
+                self.ColorText.set("Color: ")
+                self.colorPick.color=selected.color
+            elif isinstance(selected, ParticleEmitter):
+                self.NameText.set("")
+                self.TypeText.set(f"Type: VFX ({selected.name})")
+                self.ColorText.set("Color: ")
+                self.colorPick.color=selected.color_start
                 if not self.scale_slider.dragging:
-                    self.scale_slider.value = self.dataManager.selectedElement.overall_scale
+                    self.scale_slider.value = selected.overall_scale
             else:
-                self.NameText=self.font.render(f"Name: {self.dataManager.selectedElement.name}", True, (255, 255, 255))
-                self.TypeText=self.font.render(f"Type: {self.dataManager.selectedElement.type}", True, (255, 255, 255))
-                self.ColorText=self.font.render("Color: ", True, (255, 255, 255))
-                self.colorPick.color=self.dataManager.selectedElement.color
+                self.NameText.set(f"Name: {selected.name}")
+                self.TypeText.set(f"Type: {selected.type}")
+                self.ColorText.set("Color: ")
+                self.colorPick.color=selected.color
         else:
-            self.NameText=self.font.render("", True, (255, 255, 255))
-            self.TypeText=self.font.render("", True, (255, 255, 255))
-            self.ColorText=self.font.render("", True, (255, 255, 255))
+            self.NameText.set("")
+            self.TypeText.set("")
+            self.ColorText.set("")
 
 
     def drawElements(self):
@@ -305,16 +400,17 @@ class DrawManager:
             return
 
         viewport_rect = pygame.Rect(0, 30, self.viewport.get_width(), self.viewport.get_height())
+        visible = self.viewportData.visibleMapRect(margin=64)
 
         if self.settings.show_collisions:
-            for collision in self.dataManager.collisionRects:
+            for collision in self.dataManager.elementsInRect("collisionRects", visible):
                 screen_rect = collision.get_screen_rect(self.viewportData.panningOffset, self.viewportData.zoom)
                 if viewport_rect.colliderect(screen_rect):
                     collision.draw(self.screen, self.viewportData.panningOffset, self.viewportData.zoom,
                                 collision == self.dataManager.selectedElement)
 
         if self.settings.show_location_points:
-            for lp in self.dataManager.locationPoints:
+            for lp in self.dataManager.elementsInRect("locationPoints", visible):
                 image = self.locationPointImageFlag if lp.name == self.settings.player_spawn_point else self.locationPointImage
                 if lp == self.dataManager.selectedElement:
                     image = self.DottedlocationPointImageFlag if lp.name == self.settings.player_spawn_point else self.DottedlocationPointImage
@@ -323,17 +419,19 @@ class DrawManager:
                     lp.draw(self.screen, self.viewportData.panningOffset, self.viewportData.zoom, image)
 
         if self.settings.display_lights:
-            self.light_mask = pygame.Surface((self.screen.get_width() - 250, self.screen.get_height() - 30), flags=pygame.SRCALPHA)
-            self.light_mask.fill((0, 0, 0, self.shadow_alpha))
-            for light in self.dataManager.lights:
+            compositor = self.light_compositor
+            compositor.scale = self.settings.light_resolution
+            light_mask = compositor.begin(self.viewport.get_size(), self.shadow_alpha)
+            for light in self.dataManager.elementsInRect("lights", visible):
                 cx, cy = light.get_screen_pos(self.viewportData.panningOffset, self.viewportData.zoom)
                 radius_px = int(light.radius * self.viewportData.zoom)
                 light_rect = pygame.Rect(cx - radius_px, cy - radius_px, 2 * radius_px, 2 * radius_px)
                 if viewport_rect.colliderect(light_rect):
-                    light.draw(self.screen, self.light_mask, self.shadow_alpha, self.viewportData.panningOffset,
+                    light.draw(self.screen, light_mask, self.shadow_alpha, self.viewportData.panningOffset,
                             self.viewportData.zoom,
-                            light == self.dataManager.selectedElement and not self.colorPick.picker_visible)
-            self.screen.blit(self.light_mask, (0, 30))
+                            light == self.dataManager.selectedElement and not self.colorPick.picker_visible,
+                            compositor.factor)
+            compositor.composite(self.screen, (0, 30))
 
         total_particles = sum(len(emitter.particles) for emitter in self.dataManager.emitters)
         fps = self.fps
@@ -416,17 +514,38 @@ class DrawManager:
             self.viewport.fill(self.bg_color)
 
         anim_states = self.animation.get_current_states()
+        self.animated_tile_rects = []
         current_coords = {(t.x, t.y) for t in self.dataManager.currentTiles}
+        visible = self.viewportData.visibleGridRect()
+        cell_size = self.viewportData.tileSize * self.viewportData.zoom
+        # zoom très éloigné : vignettes de blocs, tous calques confondus (niveau de détail)
+        use_lod = self.viewportData.zoom < self.settings.lod_zoom
+        use_chunks = self.chunk_cache.fits(cell_size)
+        generation = self.paletteGeneration()
+        self.tile_cache.configure(generation)
+        if use_lod:
+            self.lod_cache.configure(generation)
+            self.drawLodChunks(visible, cell_size)
+        elif use_chunks:
+            self.chunk_cache.configure(cell_size, generation)
         for layer_index, layer in enumerate(self.dataManager.layers):
-            for tile in layer.tiles:
-                self.drawTile(tile, alpha=int(layer.opacity * 255))
+            alpha = int(layer.opacity * 255)
+            if use_chunks and not use_lod:
+                self.drawLayerChunks(layer_index, layer, visible, alpha)
+            elif not use_lod:
+                for x, y, code in layer.codesInRect(*visible):
+                    self.drawCode(x, y, code, alpha)
 
             for anim_name, anim_data in anim_states.items():
+                playing = self.animation.animations[anim_name].timeline.playing
                 for anim_id, frame_dict in anim_data.items():
                     for (x, y, lay), anim_tile in frame_dict.items():
                         if lay == layer_index:
                             if anim_tile.tile.TileMap == "":
                                 continue
+                            if playing:
+                                self.animated_tile_rects.append(
+                                    self.viewportData.GetTileRectFromRelative(anim_tile.tile.x, anim_tile.tile.y))
                             if (self.settings.keyframe_overlay
                                     and not self.animation.get_current_anim().timeline.record
                                     and self.dataManager.currentTiles
@@ -451,55 +570,121 @@ class DrawManager:
         self.viewport.blit(overlay, rect)
 
 
+    def drawLayerChunks(self, layer_index, layer, visible, alpha):
+        """Blitte les surfaces pré-rendues des blocs visibles du calque (une par bloc, pas par case)."""
+        x_min, y_min, x_max, y_max = visible
+        for chunk in layer.chunksInRect(*visible):
+            cached = self.chunk_cache.get(layer_index, chunk)
+            if cached is None:
+                # pas encore rendu à ce zoom (ou modifié, ou hors budget) : case par case pour cette image
+                for x, y, code in chunk.items():
+                    if x_min <= x <= x_max and y_min <= y <= y_max:
+                        self.drawCode(x, y, code, alpha)
+                continue
+            surface, (ox, oy) = cached
+            rect = self.viewportData.GetTileRectFromRelative(chunk.cx * CHUNK_SIZE, chunk.cy * CHUNK_SIZE)
+            surface.set_alpha(alpha)
+            self.viewport.blit(surface, (rect.x + ox, rect.y + oy))
+            self.drawn += chunk.count
+
+    def drawLodChunks(self, visible, cell_size):
+        """Une vignette par position de bloc visible, calques déjà superposés (voir ChunkThumbnailCache)."""
+        layers = self.dataManager.layers
+        alphas = [int(layer.opacity * 255) for layer in layers]
+        positions = {}
+        for layer_index, layer in enumerate(layers):
+            for chunk in layer.chunksInRect(*visible):
+                positions.setdefault((chunk.cx, chunk.cy), [None] * len(layers))[layer_index] = chunk
+        side = math.ceil(CHUNK_SIZE * cell_size)
+        for (cx, cy), chunks in positions.items():
+            surface = self.lod_cache.get(cx, cy, chunks, alphas, side)
+            if surface is None:
+                continue
+            rect = self.viewportData.GetTileRectFromRelative(cx * CHUNK_SIZE, cy * CHUNK_SIZE)
+            self.viewport.blit(surface, rect.topleft)
+            self.drawn += sum(chunk.count for chunk in chunks if chunk is not None)
+
+    def drawCode(self, x, y, code, alpha):
+        """Dessine une case de calque encodée ; le code sert directement de clé de cache."""
+        rect = self.viewportData.GetTileRectFromRelative(x, y)
+        if not rect.colliderect(self.viewportData.rect):
+            return
+        tile_surface = self.getCodeSurface(code, alpha)
+        if tile_surface is None:
+            return
+        self.drawn+=1
+        self.viewport.blit(tile_surface, rect)
+
+    def paletteGeneration(self):
+        return (id(self.tilePaletteData.Maps), len(self.tilePaletteData.Maps))
+
+    def getCodeSurface(self, code, alpha):
+        grid_cell_size = int(self.viewportData.tileSize * self.viewportData.zoom)
+        return self.tile_cache.get(code, alpha, grid_cell_size)
+
+    def warmCaches(self, budget_s=0.004):
+        """
+        Entre deux images : rend les blocs visibles en attente, puis prépare les tuiles
+        des zooms voisins (deux crans de molette de part et d'autre).
+        """
+        start = time.perf_counter()
+        if not self.lod_cache.warm(budget_s) or not self.chunk_cache.warm(budget_s):
+            return False
+        budget_s -= time.perf_counter() - start
+        if budget_s <= 0:
+            return False
+        viewport = self.viewportData
+        sizes = []
+        for step in (1, -1, 2, -2):
+            zoom = max(round(viewport.zoom + step * viewport.zoomSensitivity, 2), 0.25)
+            sizes.append(int(viewport.tileSize * zoom))
+        return self.tile_cache.warm(sizes, budget_s)
+
+    def buildBaseSurface(self, code):
+        """Tuile découpée dans son tileset et orientée, à sa taille d'origine."""
+        tileset_id, original_x, original_y, rotation, flip_h, flip_v = unpack_tile(code)
+        tileMap = self.tilePaletteData.GetMapById(tileset_id)
+        if tileMap is None:
+            return None
+        tile_rect = pygame.Rect(
+            original_x * tileMap.tileSize,
+            original_y * tileMap.tileSize,
+            tileMap.tileSize,
+            tileMap.tileSize
+        )
+        try:
+            tile_surface = tileMap.image.subsurface(tile_rect).copy()
+        except:
+            return None
+
+        if tileMap.colorKey:
+            tile_surface.set_colorkey(tileMap.colorKey)
+
+        if flip_h or flip_v:
+            tile_surface = pygame.transform.flip(tile_surface, flip_h, flip_v)
+
+        if rotation != 0:
+            tile_surface = pygame.transform.rotate(tile_surface, rotation)
+        return tile_surface
+
+    def finishCodeSurface(self, base, alpha, size):
+        tile_surface = pygame.transform.scale(base, (size, size))
+        if alpha!=255:
+            tile_surface.set_alpha(alpha)
+        elif self.macOsBlendingProblem:
+            tile_surface.set_alpha(254)
+        return tile_surface
+
     def drawTile(self, tile: Tile, alpha=None, overlay=False, overlay_cyan=False,overlay_yellow=False):
-        tileMap = self.tilePaletteData.GetMapByName(tile.TileMap)
         rect = self.viewportData.GetTileRectFromRelative(tile.x, tile.y)
 
 
         if not rect.colliderect(self.viewportData.rect):
             return
+        tile_surface = self.getCodeSurface(encode_tile(tile), alpha)
+        if tile_surface is None:
+            return
         self.drawn+=1
-        key = (
-            tile.TileMap,
-            tile.Originalx,
-            tile.Originaly,
-            tile.flipHorizontal,
-            tile.flipVertical,
-            tile.rotation,
-            alpha
-        )
-
-        if key in self.tile_cache:
-            tile_surface = self.tile_cache[key]
-        else:
-            tile_rect = pygame.Rect(
-                tile.Originalx * tileMap.tileSize,
-                tile.Originaly * tileMap.tileSize,
-                tileMap.tileSize,
-                tileMap.tileSize
-            )
-            try:
-                tile_surface = tileMap.image.subsurface(tile_rect).copy()
-            except:
-                return
-
-            if tileMap.colorKey:
-                tile_surface.set_colorkey(tileMap.colorKey)
-
-            if tile.flipHorizontal or tile.flipVertical:
-                tile_surface = pygame.transform.flip(tile_surface, tile.flipHorizontal, tile.flipVertical)
-
-            if tile.rotation != 0:
-                tile_surface = pygame.transform.rotate(tile_surface, tile.rotation)
-
-            tile_surface = self.GetScaledTile(tile_surface)
-            if alpha!=255:
-                tile_surface.set_alpha(alpha)
-            elif self.macOsBlendingProblem:
-                tile_surface.set_alpha(254)
-
-            # Stocker dans le cache
-            self.tile_cache[key] = tile_surface
         self.viewport.blit(tile_surface, rect)
 
         if overlay:
@@ -518,11 +703,6 @@ class DrawManager:
 
 
 
-    def GetScaledTile(self,surface):
-        grid_cell_size = self.viewportData.tileSize * self.viewportData.zoom
-        surface = pygame.transform.scale(surface, (grid_cell_size, grid_cell_size))
-        return surface
-
 
     def drawViewportGrid(self):
         if not (self.activeTileMap and self.settings.is_grid_visible) or self.game_engine.running:
@@ -545,10 +725,43 @@ class DrawManager:
     def drawTilePalette(self):
         if not self.activeTileMap:
             return
-        self.TilePalette.fill((50, 58, 81))
-        self.TilePalette.blit(self.activeTileMap.zoomedImage,self.tilePaletteData.panningOffset)
-        self.drawPalettegrid()
+        key = (id(self.TilePalette), id(self.activeTileMap.zoomedImage), tuple(self.tilePaletteData.panningOffset),
+               self.tilePaletteData.zoom, self.activeTileMap.tileSize)
+        if key != self.palette_key:
+            self.TilePalette.fill((50, 58, 81))
+            self.TilePalette.blit(self.activeTileMap.zoomedImage,self.tilePaletteData.panningOffset)
+            self.drawPalettegrid()
+            self.palette_key = key
         self.screen.blit(self.TilePalette,self.TilePaletteRect)
+
+    # ----- panneaux statiques (voir drawMainUI) -----
+    def panelRects(self):
+        """Panneau latéral et barre du haut : tout l'écran hors viewport."""
+        screen_width, screen_height = self.screen.get_size()
+        return [pygame.Rect(screen_width - 250, 0, 250, screen_height), pygame.Rect(0, 0, screen_width - 250, 30)]
+
+    def panelState(self):
+        """Ce qui peut changer dans les panneaux sans entrée utilisateur."""
+        selected = self.dataManager.selectedElement
+        return (self.screen.get_size(), self.update.need_update, id(selected), self.dataManager.currentTool,
+                self.layerText.text, self.MapText.text, self.collisionsText.text, self.TypeText.text,
+                self.NameText.text, self.ColorText.text, getattr(selected, "overall_scale", None),
+                getattr(selected, "blink", None), self.viewportData.displayRect, self.slider.value)
+
+    def panelsClean(self, panels, key) -> bool:
+        """
+        True si la copie des panneaux est encore exacte : pas d'entrée qui rafraîchit tout l'écran,
+        pas de survol des panneaux (zones marquées par DirtyRegions.noteEvent), pas de menu ouvert
+        et le même état qu'à la dernière composition.
+        """
+        dirty = self.dirty
+        if dirty is None or dirty.full or not self.panel_cache or key != self.panel_key:
+            return False
+        if self.game_engine.running or self.colorPick.picker_visible:
+            return False
+        if any(rect.colliderect(panel) for rect in dirty.rects for panel in panels):
+            return False
+        return not any(isinstance(button, MenuButton) and button.dropdown.is_open for button in self.buttons)
         
     def UpdateRect(self):
         self.TilePaletteRect=pygame.Rect(self.screen.get_width() - 230, self.screen.get_height() - 270,210*self.TilePaletteSurfaceZoom,230*self.TilePaletteSurfaceZoom)
@@ -556,8 +769,7 @@ class DrawManager:
         self.TilePaletteRect.bottom=self.screen.get_height()-40
         self.TilePaletteRect.right=self.screen.get_width()-20
         self.palette_area_rect = pygame.Rect(self.screen.get_width() - 230, self.screen.get_height() - 270, 210, 230)
-        self.bar = pygame.image.load('./Assets/ui/travaux.png')
-        self.bar = pygame.transform.scale(self.bar, (self.screen.get_width(), 17))
+        self.bar = pygame.transform.scale(AssetManager().load('./Assets/ui/travaux.png'), (self.screen.get_width(), 17))
         self.barRect=self.bar.get_rect()
         self.barRect.centerx = self.screen.get_width() // 2
         self.barRect.bottom = self.screen.get_height()
@@ -590,6 +802,18 @@ class DrawManager:
             y += grid_cell_size
 
     def drawMainUI(self):
+        panels = self.panelRects()
+        key = self.panelState()
+        if self.panelsClean(panels, key):
+            # panneaux inchangés : seul le viewport est recomposé, puis la copie des panneaux par-dessus
+            if self.activeTileMap:
+                self.screen.blit(self.viewport,self.viewportRect)
+                self.drawElements()
+            else:
+                self.screen.fill((200,200,200), self.viewportRect)
+            for surface, rect in self.panel_cache:
+                self.screen.blit(surface, rect)
+            return
         self.screen.fill((200,200,200))
         screen_width = self.screen.get_width()
         screen_height = self.screen.get_height()
@@ -603,16 +827,16 @@ class DrawManager:
         pygame.draw.rect(self.screen, (47, 47, 47), (screen_width - 230, 250, 210, 140), border_radius=3)
         pygame.draw.rect(self.screen, (26, 26, 26), self.palette_area_rect, border_radius=3)
         pygame.draw.rect(self.screen, (36, 36, 36), (0, 0, screen_width - 250, 30))
-        self.screen.blit(self.layerText,(screen_width - 220,40))
-        self.screen.blit(self.MapText,(screen_width - 230,400))
-        self.screen.blit(self.collisionsText,(screen_width - 220, 95))
-        self.screen.blit(self.TypeText,(screen_width - 220, 125))
-        self.screen.blit(self.NameText,(screen_width - 220, 160))
-        self.screen.blit(self.ColorText,(screen_width - 220, 195))
+        self.layerText.draw(self.screen,(screen_width - 220,40))
+        self.MapText.draw(self.screen,(screen_width - 230,400))
+        self.collisionsText.draw(self.screen,(screen_width - 220, 95))
+        self.TypeText.draw(self.screen,(screen_width - 220, 125))
+        self.NameText.draw(self.screen,(screen_width - 220, 160))
+        self.ColorText.draw(self.screen,(screen_width - 220, 195))
         if self.dataManager.selectedElement and isinstance(self.dataManager.selectedElement, ParticleEmitter):
             scale_val = self.dataManager.selectedElement.overall_scale
-            scale_text = self.font.render(f"Scale: {scale_val:.2f}", True, (255, 255, 255))
-            self.screen.blit(scale_text, (screen_width - 220, 158))
+            self.ScaleText.set(f"Scale: {scale_val:.2f}")
+            self.ScaleText.draw(self.screen, (screen_width - 220, 158))
             self.scale_slider.draw(self.screen)
         #self.screen.blit(self.bar, self.barRect)
         edit=0
@@ -624,12 +848,13 @@ class DrawManager:
                     if isinstance(self.dataManager.selectedElement, ParticleEmitter) and button.action_name == "editName":
                         continue
                     if isinstance(self.dataManager.selectedElement,Light) and edit==1:
+                        # images en cache (ImageButton) : simple changement de référence, sans lecture disque
                         if self.dataManager.selectedElement.blink:
-                            button.init_image("./Assets/ui/icones/checked.png")
+                            button.set_image("./Assets/ui/icones/checked.png")
                         else:
-                            button.init_image("./Assets/ui/icones/unchecked.png")
+                            button.set_image("./Assets/ui/icones/unchecked.png")
                         button.draw(self.screen)
-                        button.init_image("./Assets/ui/icones/edit.png")
+                        button.set_image("./Assets/ui/icones/edit.png")
                     else:
                         button.draw(self.screen)
             elif hasattr(button, "image_path") and self.dataManager.currentTool and button.action_name==self.dataManager.currentTool._value_:
@@ -641,7 +866,9 @@ class DrawManager:
                 button.draw(self.screen)
         self.slider.draw(self.screen)
         self.playButton.draw(self.screen)
-        self.draw_update_tag()
+        self.update_tag_rect = self.draw_update_tag()
+        self.panel_cache = [(self.screen.subsurface(rect).copy(), rect) for rect in panels]
+        self.panel_key = key
 
 
 
@@ -649,6 +876,4 @@ class DrawManager:
     
     def UpdateEyeButtons(self,button):
         if hasattr(button, "image_path") and isinstance(button.image_path, str) and "eyes" in button.image_path:
-                button.image_path="./Assets/ui/icones/eyesopen.png" if self.viewportData.displayRect else "./Assets/ui/icones/eyesclose.png"
-                button.image=button._load_image(button.image_path)
-                button.hover_image=button._create_hover_image(button.image)
\ No newline at end of file
+                button.set_image("./Assets/ui/icones/eyesopen.png" if self.viewportData.displayRect else "./Assets/ui/icones/eyesclose.png")
\ No newline at end of file
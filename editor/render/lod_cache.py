@@ -0,0 +1,145 @@
+from collections import OrderedDict
+
+import time
+
+import pygame
+
+from editor.core.utils import CHUNK_SIZE
+
+
+# pixels par case dans une vignette de bloc (une case de 16 px moyennée en 4 x 4)
+LOD_TILE_PX = 4
+# budget mémoire des vignettes et de leurs copies à la taille affichée (octets)
+LOD_CACHE_BYTES = 64 * 1024 * 1024
+# temps accordé pendant l'image au rendu des vignettes manquantes, le reste est fait par `warm`
+LOD_FRAME_BUDGET_S = 0.006
+
+
+class ChunkThumbnailCache:
+    """
+    Niveau de détail pour les zooms très éloignés : une vignette par position de bloc
+    (CHUNK_SIZE x CHUNK_SIZE cases), où chaque case est réduite par moyenne à LOD_TILE_PX pixels
+    et où tous les calques sont déjà superposés (avec leur opacité).
+    Le viewport dessine alors une image par bloc au lieu d'une case (ou d'un bloc) par calque.
+    Une vignette est recalculée paresseusement quand un de ses blocs change (révision) :
+    pendant l'image si le budget le permet, sinon l'ancienne vignette reste affichée jusqu'à `warm`.
+    """
+
+    def __init__(self, build_base, max_bytes: int = LOD_CACHE_BYTES):
+        # build_base(code) -> Surface | None, tuile orientée à sa taille d'origine
+        self.build_base = build_base
+        self.max_bytes = max_bytes
+        # (code, alpha) -> tuile moyennée LOD_TILE_PX x LOD_TILE_PX
+        self.tiles = {}
+        # (cx, cy) -> [signature, vignette, côté affiché, vignette à ce côté]
+        self.entries: OrderedDict = OrderedDict()
+        # (cx, cy) -> (signature, blocs par calque, alphas) à recalculer
+        self.pending = {}
+        self.bytes = 0
+        self.generation = None
+        self.deadline = 0.0
+
+    def clear(self):
+        self.tiles.clear()
+        self.entries.clear()
+        self.pending.clear()
+        self.bytes = 0
+
+    def configure(self, generation, frame_budget_s: float = LOD_FRAME_BUDGET_S):
+        """Début d'image ; un changement de tilesets invalide toutes les vignettes."""
+        if generation != self.generation:
+            self.clear()
+            self.generation = generation
+        self.deadline = time.perf_counter() + frame_budget_s
+
+    @staticmethod
+    def signature(chunks, alphas) -> tuple:
+        return tuple((id(chunk), chunk.revision, alpha) if chunk is not None else None
+                     for chunk, alpha in zip(chunks, alphas))
+
+    def get(self, cx: int, cy: int, chunks, alphas, side: int) -> pygame.Surface | None:
+        """
+        Vignette du bloc (cx, cy) au côté `side` en pixels.
+        `chunks` : bloc de chaque calque à cette position (ou None), `alphas` : opacité de chaque calque.
+        """
+        key = (cx, cy)
+        signature = self.signature(chunks, alphas)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != signature:
+            if time.perf_counter() < self.deadline:
+                entry = self._store(key, signature, self._render(chunks, alphas))
+            else:
+                self.pending[key] = (signature, chunks, alphas)
+                if entry is None:
+                    return None  # dessiné à l'image suivante, une fois la vignette prête
+        self.entries.move_to_end(key)
+        if entry[2] != side:
+            thumbnail = entry[1]
+            self.bytes -= self._scaledSize(entry)
+            entry[2] = side
+            entry[3] = thumbnail if thumbnail.get_width() == side else pygame.transform.scale(thumbnail, (side, side))
+            self.bytes += self._scaledSize(entry)
+        return entry[3]
+
+    def warm(self, budget_s: float = 0.004) -> bool:
+        """Recalcule les vignettes en attente dans la limite de `budget_s` secondes. True quand tout est prêt."""
+        deadline = time.perf_counter() + budget_s
+        while self.pending:
+            key = next(iter(self.pending))
+            signature, chunks, alphas = self.pending.pop(key)
+            self._store(key, signature, self._render(chunks, alphas))
+            if time.perf_counter() > deadline:
+                return not self.pending
+        return True
+
+    def _store(self, key, signature, thumbnail: pygame.Surface) -> list:
+        self.pending.pop(key, None)
+        if key in self.entries:
+            self._drop(key)
+        entry = self.entries[key] = [signature, thumbnail, None, None]
+        self.bytes += self._size(thumbnail)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            self._drop(next(iter(self.entries)))
+        return entry
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        self.bytes -= self._size(entry[1]) + self._scaledSize(entry)
+
+    @staticmethod
+    def _size(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * 4
+
+    def _scaledSize(self, entry) -> int:
+        # la copie à la taille affichée n'existe que si elle diffère de la vignette
+        return self._size(entry[3]) if entry[3] is not None and entry[3] is not entry[1] else 0
+
+    def _tile(self, code, alpha) -> pygame.Surface | None:
+        key = (code, alpha)
+        if key not in self.tiles:
+            base = self.build_base(code)
+            tile = None
+            if base is not None:
+                # copie en alpha par pixel pour que la couleur transparente (colorkey) ne soit pas moyennée
+                source = pygame.Surface(base.get_size(), pygame.SRCALPHA)
+                source.blit(base, (0, 0))
+                tile = pygame.transform.smoothscale(source, (LOD_TILE_PX, LOD_TILE_PX))
+                if alpha < 255:
+                    tile.set_alpha(alpha)
+            self.tiles[key] = tile
+        return self.tiles[key]
+
+    def _render(self, chunks, alphas) -> pygame.Surface:
+        side = CHUNK_SIZE * LOD_TILE_PX
+        surface = pygame.Surface((side, side), pygame.SRCALPHA)
+        for chunk, alpha in zip(chunks, alphas):
+            if chunk is None or not chunk.count or alpha <= 0:
+                continue
+            x0, y0 = chunk.cx * CHUNK_SIZE, chunk.cy * CHUNK_SIZE
+            blits = []
+            for x, y, code in chunk.items():
+                tile = self._tile(code, alpha)
+                if tile is not None:
+                    blits.append((tile, ((x - x0) * LOD_TILE_PX, (y - y0) * LOD_TILE_PX)))
+            surface.blits(blits, doreturn=False)
+        return surface
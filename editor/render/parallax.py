@@ -1,4 +1,5 @@
 import pygame
+from editor.core.asset_manager import AssetManager
 
 class ParallaxBackground:
     def __init__(self, surface: pygame.Surface, viewport_data, layers: list[tuple[str, float]],
@@ -16,7 +17,7 @@ class ParallaxBackground:
         self.buffers = {}
 
         for path, parallax in layers:
-            orig = pygame.image.load(path).convert_alpha()
+            orig = AssetManager().load(path)
             self.layers.append({
                 "orig": orig,
                 "parallax": parallax,
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+import time
+
+import pygame
+
+
+# budget mémoire des tuiles mises à l'échelle, tous niveaux de zoom confondus (octets)
+TILE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ZoomTileCache:
+    """
+    Cache des surfaces de tuiles par niveau de zoom (pyramide de tailles de case).
+    - `base` : tuile découpée, orientée (flip / rotation), non mise à l'échelle, indépendante du zoom ;
+    - `levels` : taille de case en pixels -> {(code, alpha): surface à cette taille}.
+    Changer de zoom ne vide plus le cache : on bascule sur le niveau correspondant, et les
+    niveaux voisins sont préparés par petites tranches entre deux images (`warm`).
+    Les niveaux les moins récemment utilisés sont libérés au-delà de `max_bytes`.
+    """
+
+    def __init__(self, build_base, finish, max_bytes: int = TILE_CACHE_BYTES):
+        # build_base(code) -> Surface | None ; finish(surface, alpha, size) -> Surface
+        self.build_base = build_base
+        self.finish = finish
+        self.max_bytes = max_bytes
+        self.base = {}
+        self.levels: OrderedDict = OrderedDict()
+        self.level_bytes = {}
+        self.bytes = 0
+        self.size = None
+        self.current = None
+        self.generation = None
+        self._warmed = {}
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels.values())
+
+    def clear(self):
+        self.base.clear()
+        self.levels.clear()
+        self.level_bytes.clear()
+        self._warmed.clear()
+        self.bytes = 0
+        self.size = None
+        self.current = None
+
+    def configure(self, generation):
+        """Génération des tilesets : un changement de palette invalide toutes les tuiles."""
+        if generation != self.generation:
+            self.clear()
+            self.generation = generation
+
+    def _level(self, size: int) -> dict:
+        level = self.levels.get(size)
+        if level is None:
+            level = self.levels[size] = {}
+            self.level_bytes[size] = 0
+        return level
+
+    def _use(self, size: int):
+        self.current = self._level(size)
+        self.size = size
+        self.levels.move_to_end(size)
+
+    def get(self, code: int, alpha, size: int) -> pygame.Surface | None:
+        if size != self.size:
+            self._use(size)
+        key = (code, alpha)
+        surface = self.current.get(key)
+        if surface is None:
+            surface = self._build(code, alpha, size, self.current)
+        return surface
+
+    def _build(self, code, alpha, size, level) -> pygame.Surface | None:
+        base = self.base.get(code)
+        if base is None:
+            base = self.build_base(code)
+            if base is None:
+                return None
+            self.base[code] = base
+        surface = self.finish(base, alpha, size)
+        level[(code, alpha)] = surface
+        nbytes = surface.get_width() * surface.get_height() * 4
+        self.level_bytes[size] += nbytes
+        self.bytes += nbytes
+        if self.bytes > self.max_bytes:
+            self._evict(keep=size)
+        return surface
+
+    def _evict(self, keep: int):
+        for size in list(self.levels):
+            if self.bytes <= self.max_bytes:
+                break
+            if size == keep or size == self.size:
+                continue
+            del self.levels[size]
+            self.bytes -= self.level_bytes.pop(size)
+            self._warmed.pop(size, None)
+
+    def warm(self, sizes, budget_s: float = 0.002) -> bool:
+        """
+        Prépare, dans la limite de `budget_s` secondes, les tuiles du niveau courant aux tailles `sizes`
+        (zooms voisins). Retourne True quand tout est prêt.
+        """
+        if self.current is None:
+            return True
+        deadline = time.perf_counter() + budget_s
+        wanted = len(self.current)
+        for size in sizes:
+            if size <= 0 or size == self.size or self._warmed.get(size) == wanted:
+                continue
+            if size not in self.levels:
+                self._level(size)
+                # un niveau préparé d'avance ne doit pas passer devant ceux réellement affichés
+                self.levels.move_to_end(size, last=False)
+            level = self.levels[size]
+            for code, alpha in list(self.current):
+                if (code, alpha) not in level:
+                    if self.bytes >= self.max_bytes:
+                        return True  # pas de préchargement au détriment des niveaux affichés
+                    self._build(code, alpha, size, level)
+                    if time.perf_counter() > deadline:
+                        return False
+            self._warmed[size] = wanted
+        return True
@@ -1,5 +1,5 @@
 import pygame
-from editor.core.utils import List,TileMap
+from editor.core.utils import TILESETS, Dict, List, TileMap
 
 class TilePalette():
     def __init__(self,screen,moveSensitivity,zoomSensitivity):
@@ -7,6 +7,7 @@ class TilePalette():
         self.moveSensitivity=moveSensitivity
         self.zoomSensitivity=zoomSensitivity
         self.currentTileMap=0
+        self._mapsById: Dict[int, TileMap]={}
         self.Maps: List[TileMap]=[]
         self.zoom=1.0
         self.panningOffset=[0,0]
@@ -35,13 +36,27 @@ class TilePalette():
             self.panningOffset = new_map.panningOffset.copy()
             self.UpdateZoom()
 
+    @property
+    def Maps(self) -> List[TileMap]:
+        return self._maps
+
+    @Maps.setter
+    def Maps(self, maps: List[TileMap]):
+        self._maps = maps
+        self._mapsById.clear()
+        for tile_map in maps:
+            self._mapsById.setdefault(tile_map.id, tile_map)
+
+    def GetMapById(self, tileset_id):
+        return self._mapsById.get(tileset_id)
+
     def GetMapByName(self,name):
-        for map in self.Maps:
-            if map.name==name:
-                return map
+        return self._mapsById.get(TILESETS.find(name))
 
     def AddMap(self,name,filepath,tileSize,image,colorKey):
-        self.Maps.append(TileMap(name,filepath,tileSize,image,colorKey,image))
+        tile_map = TileMap(name,filepath,tileSize,image,colorKey,image)
+        self._maps.append(tile_map)
+        self._mapsById.setdefault(tile_map.id, tile_map)
 
     def GetCurrentTileMap(self):
         if len(self.Maps)>self.currentTileMap:
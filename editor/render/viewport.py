@@ -79,6 +79,23 @@ class ViewPort():
         rect_y = self.rect.y + round(tile_content_y)
         return pygame.Rect(rect_x, rect_y, grid_cell_size, grid_cell_size)
 
+    def visibleGridRect(self):
+        """Bornes (x_min, y_min, x_max, y_max) des cases de la grille visibles dans le viewport."""
+        grid_cell_size = self.tileSize * self.zoom
+        x_min = int((-self.panningOffset[0]) // grid_cell_size)
+        y_min = int((-self.panningOffset[1]) // grid_cell_size)
+        x_max = int((self.rect.width - self.panningOffset[0]) // grid_cell_size)
+        y_max = int((self.rect.height - self.panningOffset[1]) // grid_cell_size)
+        return x_min, y_min, x_max, y_max
+
+    def visibleMapRect(self, margin=0):
+        """Boîte (x0, y0, x1, y1) visible en coordonnées carte, élargie de `margin` pixels écran."""
+        zoom = self.zoom
+        return ((-self.panningOffset[0] - margin) / zoom,
+                (-self.panningOffset[1] - margin) / zoom,
+                (self.rect.width - self.panningOffset[0] + margin) / zoom,
+                (self.rect.height - self.panningOffset[1] + margin) / zoom)
+
     def Zoom(self, zoom_delta):
         old_zoom = self.zoom
         new_zoom = max(old_zoom + zoom_delta * self.zoomSensitivity, 0.25)
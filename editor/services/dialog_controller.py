@@ -1,4 +1,5 @@
 from editor.animations.animation import AnimationManager
+from editor.core.asset_manager import AssetManager
 from editor.core.data_manager import DataManager
 from editor.core.utils import Colors, Light, Tools
 from editor.services.save_loader import SaveLoadManager
@@ -187,7 +188,8 @@ class DialogController:
             return
         self.TmapOpener.filepath=file_path
         try:
-            self.TmapOpener.image = pygame.image.load(file_path).convert_alpha()
+            # copie : l'aperçu est redimensionné et reçoit la couleur transparente choisie
+            self.TmapOpener.image = AssetManager().load(file_path).copy()
         except Exception as e:
             print("Erreur lors de l'ouverture du fichier !",Colors.RED,traceback.format_exc(),Colors.RESET)
             self.nm.notify('error', 'Erreur', "Erreur lors de l'ouverture de l'image !",duration=2)
@@ -278,6 +280,7 @@ class DialogController:
 
             if 'radius' in result:
                 elem.radius = result['radius']
+                self.dataManager.updateElement(elem)
 
 
         else:
@@ -330,7 +333,7 @@ class DialogController:
                 pygame.display.flip()
 
             if 'name' in result:
-                elem.name = result['name']
+                self.dataManager.renameElement(elem, result['name'])
 
 
     def EditType(self):
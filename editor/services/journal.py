@@ -0,0 +1,317 @@
+from array import array
+import base64
+import json
+import os
+import zlib
+
+from editor.core.region_ops import RegionDelta, SpanDelta, TileDelta
+from editor.core.utils import CELL_TYPECODE, TILESET_SHIFT, TILESETS
+from editor.services.save_loader import (deserialize_collision, deserialize_emitter, deserialize_keyframe,
+                                         deserialize_light, deserialize_location_point, serialize_collision,
+                                         serialize_emitter, serialize_keyframe, serialize_light,
+                                         serialize_location_point)
+
+
+JOURNAL_VERSION = 1
+# au-delà, le journal est replié dans le fichier du niveau (sauvegarde complète)
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+
+# listes d'éléments du DataManager -> (sérialisation, désérialisation), au format du fichier niveau
+ELEMENT_FORMATS = {
+    "collisionRects": (serialize_collision, deserialize_collision),
+    "locationPoints": (serialize_location_point, deserialize_location_point),
+    "lights": (serialize_light, deserialize_light),
+    "emitters": (serialize_emitter, deserialize_emitter),
+}
+
+
+def _pack(cells) -> str:
+    data = cells if isinstance(cells, bytes) else zlib.compress(cells.tobytes(), 1)
+    return base64.b64encode(data).decode("ascii")
+
+
+def _unpack(text: str) -> array:
+    cells = array(CELL_TYPECODE)
+    cells.frombytes(zlib.decompress(base64.b64decode(text)))
+    return cells
+
+
+class EditJournal:
+    """
+    Journal en ajout seul (JSON Lines) des modifications du niveau, à côté du niveau :
+    `<niveau>.json.journal`. Chaque ligne est l'état écrit par une action, une annulation
+    ou un rétablissement ; rejouée sur la dernière sauvegarde complète, elle redonne
+    exactement le niveau au moment de la dernière ligne.
+    Calques : les cases modifiées, avec les codes de la table des tilesets de la session (ligne "tilesets").
+    Éléments (collisions, points, lumières, émetteurs) et keyframes : la liste entière touchée par l'action.
+    Le fichier n'est créé qu'à la première modification et il est supprimé à la fermeture normale
+    de l'éditeur ou quand les modifications sont abandonnées (`discard`) : un journal retrouvé
+    au chargement vient donc d'une session interrompue.
+    """
+
+    def __init__(self):
+        self.path: str | None = None
+        self.level_path: str | None = None
+        self._file = None
+        # en-tête du journal pas encore créé (voir _start)
+        self._header: dict | None = None
+        self._tilesets_written = 0
+        self.size = 0
+        # l'utilisateur a déjà été consulté pour replier le journal dans le niveau
+        self.compaction_asked = False
+
+    @staticmethod
+    def pathFor(level_path: str) -> str:
+        return level_path + ".journal"
+
+    @staticmethod
+    def _levelStamp(level_path: str) -> dict:
+        stat = os.stat(level_path)
+        return {"mtime": stat.st_mtime, "size": stat.st_size}
+
+    @classmethod
+    def _matches(cls, header: dict, level_path: str) -> bool:
+        """L'en-tête correspond-il à la sauvegarde actuelle du niveau ?"""
+        stamp = cls._levelStamp(level_path)
+        return (header.get("op") == "header" and header.get("mtime") == stamp["mtime"]
+                and header.get("size") == stamp["size"])
+
+    # ----- écriture -----
+    def _start(self) -> bool:
+        """Crée le fichier à la première modification : un niveau seulement consulté n'a pas de journal."""
+        if self.path is None or self._header is None:
+            return False
+        try:
+            self._open("w")
+        except OSError as e:
+            print(f"[Journal] Impossible d'ouvrir {self.path}: {e}")
+            self._file = None
+            self.path = None
+            return False
+        header, self._header = self._header, None
+        self._write(header)
+        return True
+
+    def _write(self, record: dict):
+        if self._file is None and not self._start():
+            return
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        self.size += len(line)
+
+    def _open(self, mode: str):
+        self.close()
+        self._file = open(self.path, mode, encoding="utf-8")
+        self.size = self._file.tell()
+
+    def reset(self, level_path: str):
+        """
+        Nouveau journal vide, associé à l'état actuel (juste sauvegardé ou chargé) du fichier niveau.
+        Le journal courant (même après un « enregistrer sous ») et un éventuel journal périmé
+        de ce niveau sont supprimés ; le nouveau sera créé à la première modification.
+        """
+        self.discard()
+        self._remove(self.pathFor(level_path))
+        self.level_path = level_path
+        self.path = self.pathFor(level_path)
+        self._header = {"op": "header", "version": JOURNAL_VERSION, **self._levelStamp(level_path)}
+        self._tilesets_written = 0
+        self.size = 0
+        self.compaction_asked = False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """
+        Ferme et supprime le journal courant : fermeture normale de l'éditeur, modifications
+        abandonnées (nouveau niveau, autre niveau ouvert) ou niveau enregistré sous un autre chemin.
+        """
+        self.close()
+        if self.path and self._header is None:
+            # seulement un fichier écrit par cette session (pas un journal en attente d'une autre)
+            self._remove(self.path)
+        self.path = self.level_path = None
+        self._header = None
+
+    @staticmethod
+    def _remove(path: str):
+        if os.path.isfile(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"[Journal] Impossible de supprimer {path}: {e}")
+
+    def needsCompaction(self) -> bool:
+        """Journal trop gros, et l'utilisateur n'a pas encore été consulté pour le replier dans le niveau."""
+        return self._file is not None and self.size > JOURNAL_COMPACT_BYTES and not self.compaction_asked
+
+    def append(self, delta, forward: bool = True):
+        """Journalise l'effet d'un delta de calque (forward=False pour une annulation)."""
+        if self.path is None:
+            return
+        if len(TILESETS) > self._tilesets_written:
+            self._tilesets_written = len(TILESETS)
+            self._write({"op": "tilesets", "names": [TILESETS.name(i) for i in range(self._tilesets_written)]})
+
+        if isinstance(delta, TileDelta):
+            codes = delta.after if forward else delta.before
+            cells = []
+            order = range(len(codes)) if forward else range(len(codes) - 1, -1, -1)
+            for i in order:
+                cells.extend((delta.coords[2 * i], delta.coords[2 * i + 1], codes[i]))
+            self._write({"op": "cells", "layer": delta.layer, "cells": cells})
+        elif isinstance(delta, RegionDelta):
+            codes = delta.after if forward else delta.before
+            record = {"op": "rect", "layer": delta.layer,
+                      "rect": [delta.x_min, delta.y_min, delta.x_max, delta.y_max]}
+            if isinstance(codes, int):
+                record["fill"] = codes
+            else:
+                record["codes"] = _pack(codes)
+            self._write(record)
+        elif isinstance(delta, SpanDelta):
+            self._write({"op": "spans", "layer": delta.layer, "spans": list(delta.spans),
+                         "fill": delta.after if forward else delta.before})
+
+    def appendElements(self, kind: str, elements):
+        """Journalise la liste d'éléments `kind` ("lights", "emitters"...) après une action."""
+        if self.path is None:
+            return
+        serialize = ELEMENT_FORMATS[kind][0]
+        self._write({"op": "elements", "kind": kind, "items": [serialize(e) for e in elements]})
+
+    def appendKeyframes(self, name: str, anim):
+        """Journalise les keyframes de l'animation `name` après une action."""
+        if self.path is None:
+            return
+        self._write({"op": "keyframes", "animation": name, "end": anim.timeline.end,
+                     "keyframes": [serialize_keyframe(kf) for kf in anim.timeline.keyframes]})
+
+    # ----- relecture -----
+    def pendingEdits(self, level_path: str) -> int:
+        """
+        Nombre de modifications du journal laissé par une session interrompue,
+        0 s'il n'y en a pas ou s'il ne correspond pas à la sauvegarde actuelle.
+        """
+        count = 0
+        try:
+            with open(self.pathFor(level_path), "rb") as f:
+                for n, line in enumerate(f):
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if n == 0:
+                        if not self._matches(record, level_path):
+                            return 0
+                    elif record.get("op") != "tilesets":
+                        count += 1
+        except OSError:
+            return 0
+        return count
+
+    def recover(self, level_path: str, data_manager, accept=None) -> int:
+        """
+        Rejoue le journal d'un niveau qui vient d'être chargé (session précédente interrompue)
+        puis continue à écrire à sa suite. Retourne le nombre de modifications rejouées.
+        accept(n) : confirmation demandée avant de rejouer n modifications ; refusé, le journal est supprimé.
+        """
+        path = self.pathFor(level_path)
+        replayed = None
+        pending = self.pendingEdits(level_path) if os.path.isfile(path) else 0
+        if pending and accept is not None and not accept(pending):
+            print(f"[Journal] Récupération refusée, {path} supprimé.")
+            pending = 0
+        if pending:
+            try:
+                replayed, valid_size = self._replay(path, level_path, data_manager)
+                if replayed is not None and valid_size < os.path.getsize(path):
+                    os.truncate(path, valid_size)
+            except (OSError, ValueError, KeyError, zlib.error) as e:
+                print(f"[Journal] Journal illisible ignoré ({path}): {e}")
+        if replayed is None:
+            # pas de journal, journal périmé ou refusé : il est supprimé
+            self.reset(level_path)
+            return 0
+        # le journal reste valable pour la sauvegarde actuelle : on continue à la suite,
+        # avec une nouvelle table de tilesets (les identifiants de cette session diffèrent)
+        self.level_path, self.path = level_path, path
+        self._header = None
+        self.compaction_asked = False
+        try:
+            self._open("a")
+        except OSError as e:
+            print(f"[Journal] Impossible d'ouvrir {self.path}: {e}")
+            self._file = None
+            self.path = None
+        self._tilesets_written = 0
+        return replayed
+
+    def _replay(self, path, level_path, data_manager):
+        """(nombre de lignes rejouées ou None si le journal ne correspond pas, taille valide en octets)."""
+        remap = {}
+        replayed = 0
+        valid_size = 0
+
+        def code_of(code):
+            if not code:
+                return 0
+            tileset = code >> TILESET_SHIFT
+            return remap[tileset] << TILESET_SHIFT | (code & ((1 << TILESET_SHIFT) - 1))
+
+        with open(path, "rb") as f:
+            for n, line in enumerate(f):
+                if not line.endswith(b"\n"):
+                    break  # dernière ligne tronquée par le crash
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_size += len(line)
+                op = record.get("op")
+                if n == 0:
+                    if not self._matches(record, level_path):
+                        print(f"[Journal] {path} ne correspond pas à la sauvegarde actuelle, ignoré.")
+                        return None, valid_size
+                    continue
+                if op == "tilesets":
+                    remap = {i + 1: TILESETS.intern(name) + 1 for i, name in enumerate(record["names"])}
+                    continue
+                if op == "elements":
+                    deserialize = ELEMENT_FORMATS[record["kind"]][1]
+                    setattr(data_manager, record["kind"], [deserialize(item) for item in record["items"]])
+                    replayed += 1
+                    continue
+                if op == "keyframes":
+                    name = record["animation"]
+                    animations = data_manager.animation
+                    if name not in animations.animations:
+                        animations.create(name, float(record["end"]), on_load=True)
+                    timeline = animations.animations[name].timeline
+                    timeline.keyframes = [deserialize_keyframe(name, kf) for kf in record["keyframes"]]
+                    timeline.compute_scale()
+                    replayed += 1
+                    continue
+                layer = data_manager.layers[record["layer"]]
+                if op == "cells":
+                    cells = record["cells"]
+                    for i in range(0, len(cells), 3):
+                        layer.setCode(cells[i], cells[i + 1], code_of(cells[i + 2]))
+                elif op == "rect":
+                    if "fill" in record:
+                        values = code_of(record["fill"])
+                    else:
+                        values = array(CELL_TYPECODE, map(code_of, _unpack(record["codes"])))
+                    layer.writeRegion(*record["rect"], values)
+                elif op == "spans":
+                    spans, code = record["spans"], code_of(record["fill"])
+                    for i in range(0, len(spans), 3):
+                        layer.writeRegion(spans[i + 1], spans[i], spans[i + 2], spans[i], code)
+                replayed += 1
+        return replayed, valid_size
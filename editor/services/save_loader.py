@@ -8,10 +8,191 @@ from editor.blueprint_editor.blueprints.b_logic import SequenceNode
 from editor.blueprint_editor.node import NODE_REGISTRY, Node
 from editor.blueprint_editor.system import BlueprintEditor
 from editor.ui.FileDialog import FileDialog
+from editor.core.asset_manager import AssetManager
 from editor.core.utils import AnimatedTile, Colors, Light, LocationPoint, TileMap, Tools, Tile, Layer, CollisionRect
 from editor.vfx.vfx import ParticleEmitter
 from dataclasses import is_dataclass
 
+
+# ----- format des éléments dans le fichier niveau (aussi utilisé par le journal) -----
+def serialize_collision(collision):
+    return {
+        "type": collision.type,
+        "name": collision.name,
+        "rect": [collision.rect.x, collision.rect.y, collision.rect.width, collision.rect.height],
+        "color": list(collision.color),
+        "id": collision.id
+    }
+
+
+def deserialize_collision(collision_dict):
+    return CollisionRect(
+        type=collision_dict["type"],
+        name=collision_dict["name"],
+        rect=pygame.Rect(*collision_dict["rect"]),
+        color=tuple(collision_dict["color"]),
+        id=collision_dict.get("id", str(uuid.uuid4()))
+    )
+
+
+def serialize_location_point(point):
+    return {
+        "type": point.type,
+        "name": point.name,
+        "rect": [point.rect.x, point.rect.y, point.rect.width, point.rect.height],
+        "color": list(point.color)
+    }
+
+
+def deserialize_location_point(point):
+    return LocationPoint(
+        type=point["type"],
+        name=point["name"],
+        rect=pygame.Rect(*point["rect"]),
+        color=tuple(point["color"])
+    )
+
+
+def serialize_light(light):
+    return {
+        "x": light.x,
+        "y": light.y,
+        "radius": light.radius,
+        "color": list(light.color),
+        "blink": light.blink
+    }
+
+
+def deserialize_light(light):
+    return Light(
+        x=light["x"],
+        y=light["y"],
+        radius=light["radius"],
+        color=tuple(light["color"]),
+        blink=light["blink"]
+    )
+
+
+def serialize_emitter(em):
+    return {
+        "x": em.x,
+        "y": em.y,
+        "name": em.name,
+        "rate": em.rate,
+        "spread": em.spread,
+        "speed": em.speed,
+        "size": em.size,
+        "gravity": em.gravity,
+        "friction": em.friction,
+        "colors": [dict(c) for c in getattr(em, "colors", [])] if hasattr(em, "colors") else [{"pos": 0.0, "color": em.color_start}, {"pos": 1.0, "color": em.color_end}],
+        "lifetime": em.lifetime,
+        "active": em.active,
+        "vortex": em.vortex,
+        "color_mode": em.color_mode,
+        "spawn_mode": em.spawn_mode,
+        "particle_style": getattr(em, "particle_style", "circle"),
+        "custom_sprite": getattr(em, "custom_sprite", ""),
+        "burst_interval": getattr(em, "burst_interval", 45),
+        "chaos": getattr(em, "chaos", 0.0),
+        "size_mode": getattr(em, "size_mode", "Constant"),
+        "overall_scale": getattr(em, "overall_scale", 1.0),
+        "active_modules": [dict(m) for m in getattr(em, "active_modules", [])],
+        "emitter_type": getattr(em, "emitter_type", "Point"),
+        "spawn_width": getattr(em, "spawn_width", 100),
+        "spawn_height": getattr(em, "spawn_height", 50),
+        "direction_angle": getattr(em, "direction_angle", -1.57),
+        "is_sub_emitter": getattr(em, "is_sub_emitter", False),
+        "sub_emitters": [serialize_emitter(sub) for sub in getattr(em, "sub_emitters", [])]
+    }
+
+
+def deserialize_emitter(e_data):
+    em = ParticleEmitter(e_data["x"], e_data["y"], e_data["name"])
+    em.rate = e_data.get("rate", 5.0)
+    em.spread = e_data.get("spread", 1.5)
+    em.speed = e_data.get("speed", 3.0)
+    em.size = e_data.get("size", 5.0)
+    em.gravity = e_data.get("gravity", 0.1)
+    em.friction = e_data.get("friction", 0.97)
+    
+    raw_colors = e_data.get("colors")
+    if raw_colors:
+        if isinstance(raw_colors[0], dict):
+            em.colors = [dict(c) for c in raw_colors]
+        else:
+            em.colors = []
+            n_colors = len(raw_colors)
+            for idx, c in enumerate(raw_colors):
+                pos = idx / max(1, n_colors - 1)
+                em.colors.append({"pos": pos, "color": list(c)})
+    else:
+        color_start = e_data.get("color_start", [255, 255, 255])
+        color_end = e_data.get("color_end", [200, 200, 200])
+        em.colors = [{"pos": 0.0, "color": color_start}, {"pos": 1.0, "color": color_end}]
+    
+    em.lifetime = e_data.get("lifetime", 60)
+    em.active = e_data.get("active", True)
+    em.vortex = e_data.get("vortex", 0.0)
+    em.color_mode = e_data.get("color_mode", "Lerp")
+    em.spawn_mode = e_data.get("spawn_mode", "Continuous")
+    em.particle_style = e_data.get("particle_style", "circle")
+    
+    em.custom_sprite = e_data.get("custom_sprite", "")
+    em.burst_interval = e_data.get("burst_interval", 45)
+    em.chaos = e_data.get("chaos", 0.0)
+    em.size_mode = e_data.get("size_mode", "Constant")
+    em.overall_scale = e_data.get("overall_scale", 1.0)
+    em.active_modules = [dict(m) for m in e_data.get("active_modules", [])]
+    
+    em.emitter_type = e_data.get("emitter_type", "Point")
+    em.spawn_width = e_data.get("spawn_width", 100)
+    em.spawn_height = e_data.get("spawn_height", 50)
+    em.direction_angle = e_data.get("direction_angle", -1.57)
+    em.is_sub_emitter = e_data.get("is_sub_emitter", False)
+    
+    em.sub_emitters = []
+    for sub_data in e_data.get("sub_emitters", []):
+        sub_em = deserialize_emitter(sub_data)
+        em.sub_emitters.append(sub_em)
+    return em
+
+
+def serialize_keyframe(kf):
+    return {
+        "tile_map":   kf.tile.TileMap,
+        "x":          kf.tile.x,
+        "y":          kf.tile.y,
+        "layer":      kf.layer,
+        "time":       kf.time,
+        "Originalx":          kf.tile.Originalx,
+        "Originaly":          kf.tile.Originaly,
+        "rotation":   kf.tile.rotation,
+        "flipH":      kf.tile.flipHorizontal,
+        "flipV":      kf.tile.flipVertical,
+    }
+
+
+def deserialize_keyframe(name, kf):
+    tile = Tile(
+        TileMap        = kf["tile_map"],
+        x              = kf["x"],
+        y              = kf["y"],
+        Originalx      = kf["Originalx"],
+        Originaly      = kf["Originaly"],
+        rotation       = kf["rotation"],
+        flipHorizontal = kf["flipH"],
+        flipVertical   = kf["flipV"]
+    )
+    anim_tile = AnimatedTile(
+        anim_id = name,
+        tile    = tile,
+        layer   = kf["layer"],
+        time = kf["time"]
+    )
+    anim_tile.time = float(kf["time"])
+    return anim_tile
+
+
 class SaveLoadManager:
     def __init__(self, screen, nm, theme=None):
         self.screen = screen
@@ -57,7 +238,7 @@ class SaveLoadManager:
 
 
 
-    def save(self,level_design,file_path=None):
+    def save(self,level_design,file_path=None,silent=False):
         # Sauvegarde des layers et de leurs tiles
         corrupted_data=False
         layers_data = []
@@ -98,14 +279,7 @@ class SaveLoadManager:
                 level_design.nm.notify('error', 'Erreur', 'Données corrompues (Collision Rect)')
                 corrupted_data=True
                 continue
-            collision_dict = {
-                "type": collision.type,
-                "name": collision.name,
-                "rect": [collision.rect.x, collision.rect.y, collision.rect.width, collision.rect.height],
-                "color": list(collision.color),
-                "id": collision.id
-            }
-            collision_rects_data.append(collision_dict)
+            collision_rects_data.append(serialize_collision(collision))
 
          # Sauvegarde des points de localisation
         location_point_data = []
@@ -115,13 +289,7 @@ class SaveLoadManager:
                 level_design.nm.notify('error', 'Erreur', 'Données corrompues (Location Point)')
                 corrupted_data=True
                 continue
-            location_dict = {
-                "type": point.type,
-                "name": point.name,
-                "rect": [point.rect.x, point.rect.y, point.rect.width, point.rect.height],
-                "color": list(point.color)
-            }
-            location_point_data.append(location_dict)
+            location_point_data.append(serialize_location_point(point))
         # Sauvegarde des lumières
         light_data = []
         for light in level_design.dataManager.lights:
@@ -130,48 +298,9 @@ class SaveLoadManager:
                 level_design.nm.notify('error', 'Erreur', 'Données corrompues (Light)')
                 corrupted_data=True
                 continue
-            light_dict = {
-                "x": light.x,
-                "y": light.y,
-                "radius": light.radius,
-                "color": list(light.color),
-                "blink": light.blink
-                
-            }
-            light_data.append(light_dict)
+            light_data.append(serialize_light(light))
 
         # Sauvegarde des émetteurs VFX
-        def serialize_emitter(em):
-            return {
-                "x": em.x,
-                "y": em.y,
-                "name": em.name,
-                "rate": em.rate,
-                "spread": em.spread,
-                "speed": em.speed,
-                "size": em.size,
-                "gravity": em.gravity,
-                "friction": em.friction,
-                "colors": [dict(c) for c in getattr(em, "colors", [])] if hasattr(em, "colors") else [{"pos": 0.0, "color": em.color_start}, {"pos": 1.0, "color": em.color_end}],
-                "lifetime": em.lifetime,
-                "active": em.active,
-                "vortex": em.vortex,
-                "color_mode": em.color_mode,
-                "spawn_mode": em.spawn_mode,
-                "particle_style": getattr(em, "particle_style", "circle"),
-                "custom_sprite": getattr(em, "custom_sprite", ""),
-                "burst_interval": getattr(em, "burst_interval", 45),
-                "chaos": getattr(em, "chaos", 0.0),
-                "size_mode": getattr(em, "size_mode", "Constant"),
-                "overall_scale": getattr(em, "overall_scale", 1.0),
-                "active_modules": [dict(m) for m in getattr(em, "active_modules", [])],
-                "emitter_type": getattr(em, "emitter_type", "Point"),
-                "spawn_width": getattr(em, "spawn_width", 100),
-                "spawn_height": getattr(em, "spawn_height", 50),
-                "direction_angle": getattr(em, "direction_angle", -1.57),
-                "is_sub_emitter": getattr(em, "is_sub_emitter", False),
-                "sub_emitters": [serialize_emitter(sub) for sub in getattr(em, "sub_emitters", [])]
-            }
         vfx_data = [serialize_emitter(emitter) for emitter in level_design.dataManager.emitters]
 
         # Sauvegarde des TileMap de la palette
@@ -206,18 +335,7 @@ class SaveLoadManager:
         for name, anim in level_design.animations.animations.items():
             kfs = []
             for kf in anim.timeline.keyframes:
-                kfs.append({
-                    "tile_map":   kf.tile.TileMap,
-                    "x":          kf.tile.x,
-                    "y":          kf.tile.y,
-                    "layer":      kf.layer,
-                    "time":       kf.time,
-                    "Originalx":          kf.tile.Originalx,
-                    "Originaly":          kf.tile.Originaly,
-                    "rotation":   kf.tile.rotation,
-                    "flipH":      kf.tile.flipHorizontal,
-                    "flipV":      kf.tile.flipVertical,
-                })
+                kfs.append(serialize_keyframe(kf))
             animations_data.append({
                 "name":      name,
                 "end":       anim.timeline.end,
@@ -307,8 +425,12 @@ class SaveLoadManager:
                 json.dump(graph_data, gf, indent=4)
             print(f"[OK] Sauvegarde graph -> {file_path}, {graph_fp}")
             print("[OK] Sauvegarde réussie !")
-            level_design.nm.notify('success', 'Success', 'Sauvegarde réussie !',duration=1.0)
+            if not silent:
+                level_design.nm.notify('success', 'Success', 'Sauvegarde réussie !',duration=1.0)
             level_design.settings.path=file_path
+            # tout est dans le fichier : le journal repart de zéro (l'ancien, même sous un autre
+            # chemin après « enregistrer sous », est supprimé pour ne pas être rejoué sur l'ancien niveau)
+            level_design.journal.reset(file_path)
         except Exception as e:
             print("Erreur lors de la sauvegarde :", e)
             level_design.nm.notify('error', 'Erreur', "Erreur lors de la sauvegarde (voir la console)")
@@ -345,6 +467,8 @@ class SaveLoadManager:
             return
 
 
+        # hôte sans interface (editor.game_engine.headless) : pas de viewport, de DrawManager ni de journal
+        headless = getattr(level_design, "headless", False)
         level_design.clear_cache()
         # Reconstruction des layers et de leurs tiles
         layers = []
@@ -362,7 +486,7 @@ class SaveLoadManager:
                     flipVertical=tile_data["flipVertical"]
                 )
                 tiles.append(tile)
-            layer = Layer(opacity=layer_data.get("opacity", 1.0), tiles=tiles)
+            layer = Layer.fromTiles(tiles, opacity=layer_data.get("opacity", 1.0))
             layers.append(layer)
         level_design.dataManager.layers = layers
 
@@ -371,92 +495,22 @@ class SaveLoadManager:
         # Reconstruction des CollisionRect
         collision_rects = []
         for collision_dict in data["collisionRects"]:
-            collision = CollisionRect(
-                type=collision_dict["type"],
-                name=collision_dict["name"],
-                rect=pygame.Rect(*collision_dict["rect"]),
-                color=tuple(collision_dict["color"]),
-                id=collision_dict.get("id", str(uuid.uuid4()))
-            )
-            collision_rects.append(collision)
+            collision_rects.append(deserialize_collision(collision_dict))
         level_design.dataManager.collisionRects = collision_rects
 
         # Reconstruction des LocationPoint
         locationPoints = []
         if data.get("locationPoint"):
             for point in data["locationPoint"]:
-                location = LocationPoint(
-                    type=point["type"],
-                    name=point["name"],
-                    rect=pygame.Rect(*point["rect"]),
-                    color=tuple(point["color"])
-                )
-                locationPoints.append(location)
+                locationPoints.append(deserialize_location_point(point))
             level_design.dataManager.locationPoints = locationPoints
 
         lights = []
         if data.get("lights"):
             for light in data["lights"]:
-                new_light = Light(
-                    x=light["x"],
-                    y=light["y"],
-                    radius=light["radius"],
-                    color=tuple(light["color"]),
-                    blink=light["blink"]
-                )
-                lights.append(new_light)
+                lights.append(deserialize_light(light))
             level_design.dataManager.lights = lights
 
-        def deserialize_emitter(e_data):
-            em = ParticleEmitter(e_data["x"], e_data["y"], e_data["name"])
-            em.rate = e_data.get("rate", 5.0)
-            em.spread = e_data.get("spread", 1.5)
-            em.speed = e_data.get("speed", 3.0)
-            em.size = e_data.get("size", 5.0)
-            em.gravity = e_data.get("gravity", 0.1)
-            em.friction = e_data.get("friction", 0.97)
-            
-            raw_colors = e_data.get("colors")
-            if raw_colors:
-                if isinstance(raw_colors[0], dict):
-                    em.colors = [dict(c) for c in raw_colors]
-                else:
-                    em.colors = []
-                    n_colors = len(raw_colors)
-                    for idx, c in enumerate(raw_colors):
-                        pos = idx / max(1, n_colors - 1)
-                        em.colors.append({"pos": pos, "color": list(c)})
-            else:
-                color_start = e_data.get("color_start", [255, 255, 255])
-                color_end = e_data.get("color_end", [200, 200, 200])
-                em.colors = [{"pos": 0.0, "color": color_start}, {"pos": 1.0, "color": color_end}]
-            
-            em.lifetime = e_data.get("lifetime", 60)
-            em.active = e_data.get("active", True)
-            em.vortex = e_data.get("vortex", 0.0)
-            em.color_mode = e_data.get("color_mode", "Lerp")
-            em.spawn_mode = e_data.get("spawn_mode", "Continuous")
-            em.particle_style = e_data.get("particle_style", "circle")
-            
-            em.custom_sprite = e_data.get("custom_sprite", "")
-            em.burst_interval = e_data.get("burst_interval", 45)
-            em.chaos = e_data.get("chaos", 0.0)
-            em.size_mode = e_data.get("size_mode", "Constant")
-            em.overall_scale = e_data.get("overall_scale", 1.0)
-            em.active_modules = [dict(m) for m in e_data.get("active_modules", [])]
-            
-            em.emitter_type = e_data.get("emitter_type", "Point")
-            em.spawn_width = e_data.get("spawn_width", 100)
-            em.spawn_height = e_data.get("spawn_height", 50)
-            em.direction_angle = e_data.get("direction_angle", -1.57)
-            em.is_sub_emitter = e_data.get("is_sub_emitter", False)
-            
-            em.sub_emitters = []
-            for sub_data in e_data.get("sub_emitters", []):
-                sub_em = deserialize_emitter(sub_data)
-                em.sub_emitters.append(sub_em)
-            return em
-
         emitters = []
         if data.get("vfx_emitters"):
             for e_data in data["vfx_emitters"]:
@@ -465,8 +519,9 @@ class SaveLoadManager:
 
         level_design.dataManager.currentTool = Tools[data["currentTool"]]
 
-        level_design.viewport.panningOffset = data["viewport"]["panningOffset"]
-        level_design.viewport.zoom = data["viewport"]["zoom"]
+        if not headless:
+            level_design.viewport.panningOffset = data["viewport"]["panningOffset"]
+            level_design.viewport.zoom = data["viewport"]["zoom"]
 
         # Reconstruction de la TilePalette et de ses TileMap
         tile_palette_data = data["tilePalette"]
@@ -474,8 +529,10 @@ class SaveLoadManager:
 
         tilemaps = []
         for tm_data in tile_palette_data.get("tileMaps", []):
-            image = pygame.image.load(tm_data["filepath"]).convert_alpha()
+            image = AssetManager().load(tm_data["filepath"])
             if tm_data["colorKey"]:
+                # la surface du cache est partagée : la couleur transparente va sur une copie
+                image = image.copy()
                 image.set_colorkey(tuple(tm_data["colorKey"]))
             tilemap = TileMap(
                 name=tm_data["name"],
@@ -489,7 +546,8 @@ class SaveLoadManager:
             )
             tilemaps.append(tilemap)
         level_design.tilePalette.Maps = tilemaps
-        level_design.DrawManager.updateLayerText(data["currentLayer"])
+        if not headless:
+            level_design.DrawManager.updateLayerText(data["currentLayer"])
         settings = data.get("settings", {})
 
         bg_idx = settings.get("backgroundIndex")
@@ -498,7 +556,8 @@ class SaveLoadManager:
         gi = settings.get("globalIllumination")
         if gi is not None:
             level_design.settings.global_illum = gi
-            level_design.DrawManager.shadow_alpha = int(gi * 255)
+            if not headless:
+                level_design.DrawManager.shadow_alpha = int(gi * 255)
 
         spawnPoint = settings.get("playerSpawnPoint")
         if spawnPoint is not None:
@@ -540,25 +599,7 @@ class SaveLoadManager:
 
 
             for kf in anim_data.get("keyframes", []):
-
-                tile = Tile(
-                    TileMap        = kf["tile_map"],
-                    x              = kf["x"],
-                    y              = kf["y"],
-                    Originalx      = kf["Originalx"],
-                    Originaly      = kf["Originaly"],
-                    rotation       = kf["rotation"],
-                    flipHorizontal = kf["flipH"],
-                    flipVertical   = kf["flipV"]
-                )
-                anim_tile = AnimatedTile(
-                    anim_id = name,
-                    tile    = tile,
-                    layer   = kf["layer"],
-                    time = kf["time"]
-                )
-                anim_tile.time = float(kf["time"])
-                anim.timeline.add_keyframe(anim_tile)
+                anim.timeline.add_keyframe(deserialize_keyframe(name, kf))
 
             anim.timeline.compute_scale()
 
@@ -571,6 +612,13 @@ class SaveLoadManager:
             level_design.animations.get_current_anim().timeline.active=False
 
         level_design.settings.path=file_path
+        replayed = 0 if headless else level_design.journal.recover(
+            file_path, level_design.dataManager,
+            accept=lambda n: level_design.DialogController.ask_confirmation(
+                f"{n} modification(s) non sauvegardée(s) d'une session interrompue ont été retrouvées. Les récupérer ?", 130))
+        if replayed:
+            print(f"[Journal] {replayed} modification(s) non sauvegardée(s) récupérée(s).")
+            level_design.nm.notify('info', 'Information', f'{replayed} modification(s) non sauvegardée(s) récupérée(s).',duration=2.0)
         raw_graph_fp = data.get("levelGraph")
         graph_fp = None
         if raw_graph_fp:
@@ -655,9 +703,10 @@ class SaveLoadManager:
                 f"Pas de fichier graph trouvé : {raw_graph_fp}", duration=1.5
             )
         print("[OK] Chargement réussi !")
-        level_design.DrawManager.last_bg_index = None
         level_design.settings.load_settings()
-        level_design.DrawManager.settings=level_design.settings
+        if not headless:
+            level_design.DrawManager.last_bg_index = None
+            level_design.DrawManager.settings=level_design.settings
         level_design.nm.notify('success', 'Success', 'Chargement réussi !',duration=1)
         if not init:
             level_design.level_loaded=True
@@ -1,5 +1,6 @@
 from typing import List
 import pygame
+from editor.core.asset_manager import AssetManager
 from editor.render.tile_palette import TilePalette
 from editor.ui.Font import FontManager
 from editor.ui.TextButton import Button
@@ -130,8 +131,10 @@ class FileOpener:
     
     def validate_tileMap(self):
         #image propre (non redimensionnée)
-        self.image = pygame.image.load(self.filepath).convert_alpha()
+        self.image = AssetManager().load(self.filepath)
         if self.colorkey:
+            # la surface du cache est partagée : la couleur transparente va sur une copie
+            self.image = self.image.copy()
             self.image.set_colorkey(self.colorkey)
         total_tiles = ((self.image.get_width()+1) // self.grid_cell_size) * ((self.image.get_height()+1) // self.grid_cell_size)
         self.tilePalette.AddMap(self.name,self.filepath,self.tileSize,self.image,self.colorkey)
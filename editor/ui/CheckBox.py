@@ -1,6 +1,7 @@
 
 
 import pygame
+from editor.core.asset_manager import AssetManager
 
 
 class Checkbox:
@@ -19,7 +20,7 @@ class Checkbox:
         self.action = action
 
     def _load_image(self, path):
-        image = pygame.image.load(path).convert_alpha()
+        image = AssetManager().load(path)
         return pygame.transform.scale(image, (self.rect.width, self.rect.height))
 
     def handle_event(self, event):
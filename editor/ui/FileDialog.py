@@ -4,6 +4,7 @@ import pygame
 import os
 import platform
 from pathlib import Path
+from editor.core.asset_manager import AssetManager
 from editor.ui.DialogSystem import DialogBox
 from editor.ui.Font import FontManager
 from editor.ui.Notifications import NotificationManager
@@ -218,20 +219,20 @@ class FileDialog:
         self.root_icons = {}
 
         # charge une icône générique de drive
-        drive_img = pygame.image.load("Assets/ui/icones/fileDialog/application-x-cd-image.png").convert_alpha()
+        drive_img = AssetManager().load("Assets/ui/icones/fileDialog/application-x-cd-image.png")
         self.root_icons['drive'] = pygame.transform.scale(drive_img, (16,16))
 
         # charge une icône “user folder”
-        user_img = pygame.image.load("Assets/ui/icones/fileDialog/user.png").convert_alpha()
+        user_img = AssetManager().load("Assets/ui/icones/fileDialog/user.png")
         self.root_icons['user'] = pygame.transform.scale(user_img, (16,16))
 
         # Desktop, Downloads, Documents, etc.
         for name in ('Desktop','Downloads','Documents','Pictures','Music','Videos'):
-            p = pygame.image.load(f"Assets/ui/icones/fileDialog/{name.lower()}.png").convert_alpha()
+            p = AssetManager().load(f"Assets/ui/icones/fileDialog/{name.lower()}.png")
             self.root_icons[name.lower()] = pygame.transform.scale(p, (16,16))
 
         # icône par défaut
-        default_img = pygame.image.load("Assets/ui/icones/fileDialog/folder.png").convert_alpha()
+        default_img = AssetManager().load("Assets/ui/icones/fileDialog/folder.png")
         self.root_icons['default'] = pygame.transform.scale(default_img, (16,16))
 
 
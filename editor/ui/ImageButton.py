@@ -1,7 +1,11 @@
 import pygame
+from editor.core.asset_manager import AssetManager
 
 
 class ImageButton:
+    # (image, survol, taille, teinte) -> surfaces prêtes : aucune lecture disque après le premier chargement
+    _image_cache = {}
+
     def __init__(self, rect, image_path, action, hover_image_path=None, tint_color=None):
         """
         :param rect: Tuple (x, y, largeur, hauteur) définissant la zone du bouton.
@@ -17,23 +21,33 @@ class ImageButton:
         self.is_hovered = False
 
     def init_image(self,image_path,hover_image_path=None):
-        self.image = self._load_image(image_path)
-        self.image_path=image_path
-        
-        if hover_image_path is None:
-            self.hover_image = self._create_hover_image(self.image)
-        else:
-            self.hover_image = self._load_image(hover_image_path)
+        key = (image_path, hover_image_path, self.rect.size, self.tint_color)
+        images = ImageButton._image_cache.get(key)
+        if images is None:
+            image = self._load_image(image_path)
+            if hover_image_path is None:
+                hover_image = self._create_hover_image(image)
+            else:
+                hover_image = self._load_image(hover_image_path)
 
-        if self.tint_color is not None:
-            self.tinted_image = self._create_tinted_image(self.image, self.tint_color)
-            self.tinted_hover_image = self._create_tinted_image(self.hover_image, self.tint_color)
-        else:
-            self.tinted_image = None
-            self.tinted_hover_image = None
+            if self.tint_color is not None:
+                images = (image, hover_image,
+                          self._create_tinted_image(image, self.tint_color),
+                          self._create_tinted_image(hover_image, self.tint_color))
+            else:
+                images = (image, hover_image, None, None)
+            ImageButton._image_cache[key] = images
+        self.image, self.hover_image, self.tinted_image, self.tinted_hover_image = images
+        self.image_path = image_path
+        self.hover_image_path = hover_image_path
+
+    def set_image(self, image_path, hover_image_path=None):
+        """Change l'icône (état du bouton) ; sans effet si elle est déjà affichée."""
+        if image_path != self.image_path or hover_image_path != self.hover_image_path:
+            self.init_image(image_path, hover_image_path)
 
     def _load_image(self, path):
-        image = pygame.image.load(path).convert_alpha()
+        image = AssetManager().load(path)
         image = pygame.transform.scale(image, (self.rect.width, self.rect.height))
         return image
 
@@ -0,0 +1,37 @@
+import pygame
+
+from editor.ui.Font import FontManager
+
+
+class Label:
+    def __init__(self, text="", font=None, color=(255, 255, 255), size=26):
+        """
+        Texte retenu : la surface n'est rastérisée qu'à la création et quand le texte ou la couleur changent.
+        :param text: Texte affiché.
+        :param font: Objet pygame.font.Font (police par défaut de la taille `size` si None).
+        :param color: Couleur du texte.
+        """
+        self.font = font if font else FontManager().get(size=size)
+        self.text = None
+        self.color = color
+        self.surface: pygame.Surface | None = None
+        self.set(text)
+
+    def set(self, text, color=None) -> bool:
+        """Change le texte ; retourne True si la surface a dû être recalculée."""
+        text = str(text)
+        color = self.color if color is None else color
+        if text == self.text and color == self.color and self.surface is not None:
+            return False
+        self.text, self.color = text, color
+        self.surface = self.font.render(text, True, color)
+        return True
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    def get_height(self):
+        return self.surface.get_height()
+
+    def draw(self, surface, pos) -> pygame.Rect:
+        return surface.blit(self.surface, pos)
@@ -170,6 +170,14 @@ class NotificationManager:
         for n in self.notifications:
             n.draw(surface)
 
+    def mark_dirty(self, dirty):
+        """Signale à `dirty` la zone des notifications tant qu'elles glissent, s'effacent ou disparaissent."""
+        area = None
+        for n in self.notifications:
+            rect = pygame.Rect(n.x, n.y, n.width, n.height)
+            area = rect if area is None else area.union(rect)
+        dirty.track("notifications", area, tuple((n.x, n.y, n.alpha) for n in self.notifications))
+
 if __name__ == '__main__':
     pygame.init()
     screen = pygame.display.set_mode((800, 600), pygame.RESIZABLE)
@@ -3,6 +3,7 @@ import random
 import math
 import time
 from pathlib import Path
+from editor.core.asset_manager import AssetManager
 
 SPRITE_SHEET_CACHE = {}
 
@@ -15,7 +16,8 @@ class AnimatedSpriteSheet:
         self.frame_w = self.meta.get("frameSize", {}).get("w", 32)
         self.frame_h = self.meta.get("frameSize", {}).get("h", 32)
         self.frames = []
-        img = pygame.image.load(str(image_path)).convert()
+        # surface partagée du cache : on ne fait qu'y lire les frames
+        img = AssetManager().load(str(image_path), alpha=False)
         frames_dict = data.get("frames", {})
         keys = sorted(frames_dict.keys())
         for k in keys:
@@ -1,22 +1,25 @@
 from typing import Dict
 from editor.animations.animation import AnimationManager
 from editor.blueprint_editor.system import BlueprintEditor
+from editor.core.asset_manager import AssetManager
 from editor.core.data_manager import *
 from editor.core.event_handler import EventHandlerManager
+from editor.core.frame_scheduler import FrameScheduler
 from editor.game_engine.game_manager import Game
 from editor.services.dialog_controller import DialogController
 from editor.core.history_manager import HistoryManager
+from editor.render.dirty_regions import DirtyRegions
 from editor.render.draw_manager import DrawManager
 from editor.render.tile_palette import TilePalette
 from editor.services.documentation import DocServer
 from editor.ui.Notifications import NotificationManager
+from editor.services.journal import EditJournal
 from editor.services.save_loader import SaveLoadManager
 from editor.core.settings import Section, SettingsManager
 from editor.services.tilemap_opener import FileOpener
 from editor.core.utils import Colors, open_github
 from editor.render.viewport import ViewPort
 from editor.services.update_handler import UpdateAndCrashHandler
-from editor.game_engine.core.level import Level
 import threading
 import traceback
 import pygame
@@ -31,6 +34,8 @@ class LevelDesign:
         self.running = True
         self.version=1.4
         self.screen = screen
+        self.dirty = DirtyRegions(self.screen)
+        AssetManager().preload()
         self.zoom_sensitivity = 0.25
         self.move_sensitivity = 1
         self.level_loaded=False
@@ -38,13 +43,15 @@ class LevelDesign:
         self.nm = NotificationManager()
         self.doc = DocServer(self.nm)
         self.settings = SettingsManager(self.screen,"./Assets/ui/settings_ui.json",self.nm)
-        self.HistoryManager = HistoryManager()
+        self.journal = EditJournal()
+        self.HistoryManager = HistoryManager(self.settings,self.journal)
         self.animations = AnimationManager(self.screen,self.nm,self.timelineClick) 
         self.dataManager = DataManager(self.HistoryManager,self.settings,self.animations)
         self.settings.dataManager=self.dataManager
         self.tilePalette = TilePalette(self.screen, self.move_sensitivity, self.zoom_sensitivity)
         self.viewport = ViewPort(self.screen, self.move_sensitivity, self.zoom_sensitivity,self.animations)
         self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(self.clock)
         self.saveLoadManager=SaveLoadManager(self.screen,self.nm)
         self.updateChecker = UpdateAndCrashHandler(
             repo_owner="zerosh0",
@@ -69,6 +76,7 @@ class LevelDesign:
             "rubber": lambda: self.setTool(Tools.Rubber),
             "selection": lambda: self.setTool(Tools.Selection),
             "fill": lambda: self.setTool(Tools.Fill),
+            "bucket": lambda: self.setTool(Tools.Bucket),
             "random": lambda: self.setTool(Tools.Random),
             "flip_vertical": lambda: self.dataManager.flipCurrentTiles(Axis.Vertical),
             "flip_horizontal": lambda: self.dataManager.flipCurrentTiles(Axis.Horizontal),
@@ -116,7 +124,10 @@ class LevelDesign:
         self.settings._save_settings()
         self.clipboard: List[Dict] = []
         self.game_engine.running=False
-        self.HistoryManager = HistoryManager()
+        # modifications abandonnées (nouveau niveau, autre niveau ouvert) : rien à récupérer
+        self.journal.discard()
+        self.dirty.markAll()
+        self.HistoryManager = HistoryManager(self.settings,self.journal)
         self.animations = AnimationManager(self.screen,self.nm,self.timelineClick) 
         self.dataManager = DataManager(self.HistoryManager,self.settings,self.animations) 
         self.tilePalette = TilePalette(self.screen, self.move_sensitivity, self.zoom_sensitivity)
@@ -180,24 +191,45 @@ class LevelDesign:
             self.animations.update(dt,self.dataManager)
             self.game_engine.update(self.settings)
             self.DrawManager.playButton.state=self.game_engine.running
+            if self.journal.needsCompaction():
+                # repli du journal dans le fichier du niveau, seulement si l'utilisateur l'accepte
+                self.journal.compaction_asked = True
+                if self.DialogController.ask_confirmation(
+                        "Beaucoup de modifications ne sont pas sauvegardées. Sauvegarder le niveau maintenant ?"):
+                    self.saveLoadManager.save(self, self.journal.level_path)
+            if self.game_engine.running:
+                # les blueprints peuvent déplacer les éléments : index reconstruit au retour dans l'éditeur
+                self.dataManager.invalidateElementIndex()
             if self.settings.game_engine is None:
                 self.settings.game_engine=self.game_engine
     
 
     def draw(self):
-            self.DrawManager.draw(self.viewport, self.dataManager, self.tilePalette,self.animations,self.clock,self.game_engine)
+            self.DrawManager.draw(self.viewport, self.dataManager, self.tilePalette,self.animations,self.clock,self.game_engine,self.dirty)
             self.nm.draw(self.screen)
             self.popup.run(screen, version=self.version)
 
+    def present(self) -> bool:
+        """Envoie à l'écran les seules zones modifiées depuis l'image précédente ; True si quelque chose a bougé."""
+        self.DrawManager.markDirty(self.dirty)
+        self.animations.mark_dirty(self.dirty)
+        self.settings.mark_dirty(self.dirty)
+        self.nm.mark_dirty(self.dirty)
+        return self.dirty.present()
+
     def run(self):
         while self.running:
-            fps=60 if self.game_engine.running else 0
-            dt = self.clock.tick(fps) / 1000.0
+            dt = self.scheduler.tick(self.game_engine.running)
             self.eventHandler.HandleEvents()
             self.update(dt)
             self.draw()
-            pygame.display.flip()
+            active = self.present()
+            # des blocs ou des zooms voisins restent à préparer : mise en veille différée (voir FrameScheduler)
+            warming = not self.game_engine.running and not self.DrawManager.warmCaches()
+            self.scheduler.notify(active, warming)
         self.settings._save_settings()
+        # fermeture normale : le journal ne sert qu'après un crash
+        self.journal.discard()
         pygame.mixer.quit()
         pygame.quit()
 
@@ -208,39 +240,11 @@ class LevelDesign:
             self.DrawManager.playButton.state=False
             return
     
-        self.game_engine.player.audio_manager.clear_sounds()
-        self.game_engine.level=Level.from_data_manager(self.dataManager,self.tilePalette,self.animations)
-        self.game_engine.player.level=self.game_engine.level
-        self.game_engine.player.collisions.level=self.game_engine.level
-        self.game_engine.player.update_location_by_name(self.settings.player_spawn_point)
-        self.game_engine.player.last_action_time = pygame.time.get_ticks()
-        self.game_engine.level.draw_player=lambda s : self.game_engine.player.draw(s)
-        for enemy in self.game_engine.enemies:
-            enemy.level=self.game_engine.level
-            enemy.collisions.level=self.game_engine.level
-        self.game_engine.running= not self.game_engine.running
-        self.viewport.game_engine_running=self.game_engine.running
-        if self.viewport.game_engine_running:
-            self.game_engine.update_settings(self.settings)
-            self.game_engine.player.movement.clear_forces()
-            self.game_engine.player.health_system.health=self.game_engine.player.health_system.max_health
-            self.game_engine.level.shadow_alpha=self.settings.global_illum*255
-            self.game_engine.level.reset_text()
-            for Collisionrect in self.game_engine.level.scaled_collision_rects:
-                if Collisionrect.graph is not None:
-                            Collisionrect.graph._reset_flipflops()
-                            Collisionrect.graph._reset_once_nodes()
-                            Collisionrect.graph.clear_error()
-                            start=Collisionrect.graph.events.get("on_start")
-                            if start:
-                                Collisionrect.graph.run_logic_from_event(start)
+        if self.game_engine.running:
+            self.game_engine.stop()
         else:
-            
-            for Collisionrect in self.game_engine.level.scaled_collision_rects:
-                if Collisionrect.graph is not None:
-                            start=Collisionrect.graph.events.get("on_end")
-                            if start:
-                                Collisionrect.graph.run_logic_from_event(start)
+            self.game_engine.start(self.dataManager, self.tilePalette, self.animations, self.settings)
+        self.viewport.game_engine_running=self.game_engine.running
 
     def openGraph(self):
         self.eventHandler.discard_current_event = True
@@ -270,6 +274,7 @@ class LevelDesign:
         self.eventHandler.discard_current_event = True
         from editor.vfx.play_ground import ParticleEditor
         ParticleEditor(self.screen, self.clock, emitter, self.nm).run()
+        self.dataManager.updateElement(emitter)
         self.eventHandler.ResizeWindow()
         
 